@@ -1,9 +1,16 @@
 # API pública (estável)
+__version__ = "0.1.0"
+
 from .core.investidor import InvestidorBase
 from .core.world import MundoBase
 from .core.simulation import Simulacao
 from .core.orderbook import OrderBookIngenuo
-from .core.metrics import painel_estilizados
+from .core.metrics import painel_estilizados, painel_microestrutura
+from .core.ensemble import (
+    painel_estilizados_lote,
+    resumo_ensemble,
+    intervalos_bootstrap,
+)
 
 # compatibilidade (se alguém usar "AgenteBase")
 AgenteBase = InvestidorBase
@@ -15,4 +22,8 @@ __all__ = [
     "Simulacao",
     "OrderBookIngenuo",
     "painel_estilizados",
+    "painel_microestrutura",
+    "painel_estilizados_lote",
+    "resumo_ensemble",
+    "intervalos_bootstrap",
 ]
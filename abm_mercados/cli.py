@@ -1,6 +1,8 @@
 import argparse
+import copy
 import yaml
 import importlib
+from . import __version__
 from .plugins import listar_plugins
 from .core.simulation import Simulacao
 
@@ -11,56 +13,172 @@ def _cls_from_str(path: str):
     return getattr(importlib.import_module(mod), cls)
 
 
-def run_config(cfg_path: str):
+def _resolver_cls(nome: str):
+    if ":" in nome:  # caminho explícito
+        return _cls_from_str(nome)
+    return listar_plugins()[nome]  # plugin name
+
+
+def _caminho_cls(cls) -> str:
+    return f"{cls.__module__}:{cls.__qualname__}"
+
+
+def config_resolvida(cfg: dict) -> dict:
+    """
+    Config que determina o resultado: nomes de plugin viram "modulo:Classe" e
+    seções que não afetam a simulação (output/cache/monitor) saem. Base da chave do cache.
+    """
+    res = copy.deepcopy(
+        {k: v for k, v in cfg.items() if k not in ("output", "cache", "monitor")}
+    )
+    res["environment"]["cls"] = _caminho_cls(_resolver_cls(res["environment"]["cls"]))
+    for spec in res.get("investors", []):
+        spec["cls"] = _caminho_cls(_resolver_cls(spec["cls"]))
+    res.setdefault("steps", 252)
+    return res
+
+
+def criar_investidores(cfg: dict) -> list:
+    """
+    Instancia a seção ``investors``. Entradas com ``count`` geram uma coorte via
+    ``gerar_populacao`` (ids a partir de ``id_inicial`` ou do maior id já usado
+    + 1; seed da entrada ou derivada da seed do ambiente e da posição na lista).
+    """
+    from .investidores.populacao import gerar_populacao
+
+    seed_env = (cfg["environment"].get("params") or {}).get("seed")
+    invs: list = []
+    proximo_id = 0
+    for i, spec in enumerate(cfg.get("investors", [])):
+        Inv = _resolver_cls(spec["cls"])
+        params = spec.get("params") or {}
+        if "count" in spec:
+            seed = spec.get("seed")
+            if seed is None:  # determinística: a chave do cache depende disso
+                seed = [int(seed_env or 0), i]
+            inicio = int(spec.get("id_inicial", proximo_id))
+            coorte = gerar_populacao(Inv, spec["count"], params, inicio, seed)
+            invs.extend(coorte)
+            proximo_id = max(proximo_id, inicio + len(coorte))
+        else:
+            inv = Inv(**params)
+            invs.append(inv)
+            proximo_id = max(proximo_id, int(inv.id) + 1)
+    return invs
+
+
+def run_config(cfg_path: str, cache_dir: str | None = None):
     with open(cfg_path, "r", encoding="utf-8") as f:
         cfg = yaml.safe_load(f)
 
+    # 0) cache (opcional): mesma config + versão + seed => reaproveita o resultado
+    cache = dict(cfg.get("cache") or {})
+    if cache_dir:
+        cache["dir"] = cache_dir
+    out = cfg.get("output")
+    armazem = chave = None
+    if cache.get("dir") and out:
+        from .utils.store import ArmazemResultados, chave_execucao
+
+        armazem = ArmazemResultados(cache["dir"])
+        seed = (cfg["environment"].get("params") or {}).get("seed")
+        chave = chave_execucao(config_resolvida(cfg), __version__, seed)
+        achado = armazem.buscar(chave)
+        if achado is not None:
+            met, pasta = achado
+            print("Saída (cache):", pasta)
+            print("Métricas:", met)
+            armazem.fechar()
+            return met, pasta
+
     # 1) ambiente
     env_spec = cfg["environment"]
     env_cls = env_spec["cls"]
-    if isinstance(env_cls, str):
-        if ":" in env_cls:  # caminho explícito
-            Env = _cls_from_str(env_cls)
-        else:  # plugin name
-            Env = listar_plugins()[env_cls]
-    else:
+    if not isinstance(env_cls, str):
         raise ValueError("environment.cls deve ser string")
+    Env = _resolver_cls(env_cls)
 
     env = Env(**(env_spec.get("params") or {}))
 
-    # 2) investidores
-    for spec in cfg.get("investors", []):
-        cls_str = spec["cls"]
-        if ":" in cls_str:
-            Inv = _cls_from_str(cls_str)
-        else:
-            Inv = listar_plugins()[cls_str]
-        env.adicionar_investidor(Inv(**(spec.get("params") or {})))
+    # 2) investidores (entradas com "count" viram coortes sorteadas em lote)
+    env.adicionar_investidores(criar_investidores(cfg))
 
-    # 3) simulação
+    # 3) simulação (com métricas ao vivo em /metrics, se pedido)
     steps = int(cfg.get("steps", 252))
-    sim = Simulacao(env)
-    sim.executar(steps)
+    sim = Simulacao(env, **(cfg.get("simulation") or {}))
+    monitor = None
+    if cfg.get("monitor"):
+        from .utils.monitor import MonitorMetricas
+
+        mon = cfg["monitor"] if isinstance(cfg["monitor"], dict) else {}
+        monitor = MonitorMetricas(env, **mon).ligar()
+        if monitor.endereco:
+            print("Métricas em http://%s:%d/metrics" % monitor.endereco)
+    try:
+        sim.executar(steps)
+    finally:
+        if monitor is not None:
+            monitor.parar()
 
     # 4) saída (opcional)
-    out = cfg.get("output")
     if out:
         from .utils.io import ensure_dir, save_run
         from .utils.plotting import plot_series
 
-        met, pasta = save_run(
-            out.get("tag", "RUN"),
-            ensure_dir(out.get("dir", "./outputs/run")),
-            env.h_preco,
-            getattr(env, "h_deseq", []),
+        series_micro = getattr(env, "series_microestrutura", None)
+        kw = dict(
             extras=out.get("extras"),
+            fluxo=series_micro() if callable(series_micro) else None,
+            formato=out.get("formato", "binario"),
+            precisao=out.get("precisao", "float64"),
+            compressao=out.get("compressao"),
         )
+        if armazem is not None:
+            met, pasta = armazem.gravar(
+                chave,
+                config_resolvida(cfg),
+                out.get("tag", "RUN"),
+                env.h_preco,
+                getattr(env, "h_deseq", []),
+                **kw,
+            )
+        else:
+            met, pasta = save_run(
+                out.get("tag", "RUN"),
+                ensure_dir(out.get("dir", "./outputs/run")),
+                env.h_preco,
+                getattr(env, "h_deseq", []),
+                **kw,
+            )
         print("Saída:", pasta)
         print("Métricas:", met)
         if out.get("plot", True):
             plot_series(
-                env.h_preco, getattr(env, "h_deseq", []), titulo=out.get("tag", "RUN")
+                env.h_preco,
+                getattr(env, "h_deseq", []),
+                titulo=out.get("tag", "RUN"),
+                pasta=pasta,
+            )
+        if armazem is not None:
+            # depois dos gráficos: o tamanho inclui os PNGs e a execução atual fica
+            armazem.atualizar_tamanho(chave)
+            max_mb, max_dias = cache.get("max_mb"), cache.get("max_dias")
+            armazem.evictar(
+                max_bytes=int(max_mb * 1e6) if max_mb else None,
+                max_idade_s=max_dias * 86_400 if max_dias else None,
+                manter=chave,
             )
+            armazem.fechar()
+        return met, pasta
+
+
+def _filtro(expr: str):
+    # "curtose>3" -> ("curtose", (">", 3.0))
+    for op in ("<=", ">=", "!=", "<", ">", "="):
+        if op in expr:
+            nome, valor = expr.split(op, 1)
+            return nome.strip(), (op, float(valor))
+    raise argparse.ArgumentTypeError(f"filtro inválido: {expr!r}")
 
 
 def main():
@@ -69,7 +187,28 @@ def main():
 
     r = sub.add_parser("run", help="Executa a simulação a partir de um arquivo YAML")
     r.add_argument("config", help="Caminho para config.yaml")
+    r.add_argument("--cache", help="Diretório do armazém de resultados (cache)")
+
+    c = sub.add_parser("runs", help="Lista execuções do cache filtrando por métricas")
+    c.add_argument("cache", help="Diretório do armazém de resultados")
+    c.add_argument("filtros", nargs="*", type=_filtro, help='ex.: "curtose>3"')
+
+    x = sub.add_parser("csv", help="Converte um run.abm em CSVs (um por coluna)")
+    x.add_argument("arquivo", help="Caminho para run.abm")
+    x.add_argument("destino", nargs="?", help="Diretório de saída (padrão: o do arquivo)")
 
     args = ap.parse_args()
     if args.cmd == "run":
-        run_config(args.config)
+        run_config(args.config, cache_dir=args.cache)
+    elif args.cmd == "runs":
+        from .utils.store import ArmazemResultados
+
+        armazem = ArmazemResultados(args.cache)
+        for ex in armazem.consultar(**dict(args.filtros)):
+            print(ex["chave"][:12], ex["tag"], ex["pasta"], ex["metricas"])
+        armazem.fechar()
+    elif args.cmd == "csv":
+        from .utils.colunar import exportar_csv
+
+        for arq in exportar_csv(args.arquivo, args.destino):
+            print(arq)
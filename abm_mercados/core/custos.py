@@ -0,0 +1,104 @@
+"""
+Modelos de custo de transação aplicados na liquidação (livro-razão).
+
+Cada modelo recebe os arrays das ordens do ciclo (``qtd`` com sinal) e devolve
+o custo (>= 0) de cada ordem numa operação vetorizada; o mundo soma os modelos
+e debita o total por investidor em ``LivroRazao.liquidar``. A série de cada
+modelo leva o nome da classe (``nomes_custos``), com sufixo ``_1``, ``_2``...
+quando a mesma classe aparece mais de uma vez.
+"""
+from __future__ import annotations
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+
+
+@dataclass
+class ModeloCusto:
+    def calcular(self, qtd: np.ndarray, preco: float, mundo: Any) -> np.ndarray:
+        raise NotImplementedError
+
+
+@dataclass
+class TaxaFixa(ModeloCusto):
+    """Valor fixo por ordem executada."""
+
+    valor: float = 1.0
+
+    def calcular(self, qtd, preco, mundo):
+        return np.full(qtd.shape, self.valor)
+
+
+@dataclass
+class Corretagem(ModeloCusto):
+    """Proporcional ao financeiro, com mínimo por ordem."""
+
+    taxa: float = 0.0005
+    minimo: float = 0.0
+
+    def calcular(self, qtd, preco, mundo):
+        return np.maximum(self.taxa * np.abs(qtd) * preco, self.minimo)
+
+
+@dataclass
+class Emolumentos(ModeloCusto):
+    """Taxas de bolsa (estilo B3: negociação + liquidação) sobre o financeiro."""
+
+    negociacao: float = 0.00005
+    liquidacao: float = 0.00025
+
+    def calcular(self, qtd, preco, mundo):
+        return (self.negociacao + self.liquidacao) * np.abs(qtd) * preco
+
+
+@dataclass
+class SlippageRaiz(ModeloCusto):
+    """
+    Impacto em raiz quadrada: ``coef * preco * |q| * sqrt(|q| / depth)``, com a
+    profundidade do mundo (``mundo.depth``) se ``depth`` não for dado.
+    """
+
+    coef: float = 0.1
+    depth: Optional[float] = None
+
+    def calcular(self, qtd, preco, mundo):
+        d = self.depth if self.depth is not None else getattr(mundo, "depth", 1.0)
+        a = np.abs(qtd)
+        return self.coef * preco * a * np.sqrt(a / max(1.0, d))
+
+
+MODELOS: Dict[str, type] = {
+    "fixa": TaxaFixa,
+    "corretagem": Corretagem,
+    "emolumentos": Emolumentos,
+    "slippage": SlippageRaiz,
+}
+
+
+def criar_custos(specs: Sequence[Any]) -> List[ModeloCusto]:
+    """Modelos a partir da config: instâncias ou dicts ``{tipo, ...parâmetros}``."""
+    out = []
+    for spec in specs or []:
+        if isinstance(spec, ModeloCusto):
+            out.append(spec)
+            continue
+        spec = dict(spec)
+        tipo = spec.pop("tipo", None)
+        if tipo not in MODELOS:
+            raise ValueError(f"custo desconhecido: {tipo!r} (use um de {tuple(MODELOS)})")
+        out.append(MODELOS[tipo](**spec))
+    return out
+
+
+def nomes_custos(modelos: Sequence[ModeloCusto]) -> List[str]:
+    """Um nome por modelo, na ordem: a classe, numerada se repetida."""
+    classes = [type(m).__name__ for m in modelos]
+    vistos: Dict[str, int] = {}
+    out = []
+    for c in classes:
+        if classes.count(c) > 1:
+            vistos[c] = vistos.get(c, 0) + 1
+            c = f"{c}_{vistos[c]}"
+        out.append(c)
+    return out
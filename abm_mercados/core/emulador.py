@@ -0,0 +1,343 @@
+"""
+Emulador (processo gaussiano) do painel de fatos estilizados.
+
+Um GP por saída (kernel RBF com escala por parâmetro + ruído, hiperparâmetros
+pela verossimilhança marginal) mapeia os parâmetros, normalizados para o cubo
+unitário de ``limites``, às métricas do ``painel_estilizados``. Os dados de
+treino vêm de execuções já armazenadas (``ArmazemResultados``) e das que o
+próprio emulador roda; cada execução real é gravada no armazém com a chave
+``chave_execucao``, então uma segunda calibração reaproveita as anteriores.
+
+Só roda o ``Simulacao`` onde o emulador não confia na previsão: o desvio
+previsto, relativo à dispersão da saída no treino, passa de ``limiar``.
+``avaliar`` serve de avaliador para ``sensibilidade.sobol``/``morris``;
+``calibrar`` procura os parâmetros que reproduzem um painel-alvo.
+"""
+from __future__ import annotations
+from typing import Any, Callable, Dict, List, Mapping, Optional, Sequence, Tuple
+
+import numpy as np
+from scipy.linalg import cho_factor, cho_solve
+from scipy.optimize import minimize
+from scipy.stats import qmc
+
+from .. import __version__
+from .metrics import painel_estilizados
+from .sensibilidade import SAIDAS_PADRAO, mercado_referencia
+from .simulation import Simulacao
+
+
+class ProcessoGaussiano:
+    """GP de uma saída com kernel RBF-ARD; entradas no cubo unitário."""
+
+    def __init__(self, ruido_min: float = 1e-6, reinicios: int = 2, seed: Optional[int] = 0) -> None:
+        self.ruido_min = float(ruido_min)
+        self.reinicios = int(reinicios)
+        self.rng = np.random.default_rng(seed)
+        self.theta: Optional[np.ndarray] = None  # log(escalas), log(sf2), log(sn2)
+
+    def _kernel(self, A: np.ndarray, B: np.ndarray, theta: np.ndarray) -> np.ndarray:
+        ell = np.exp(theta[:-2])
+        D = ((A[:, None, :] - B[None, :, :]) / ell) ** 2
+        return np.exp(theta[-2]) * np.exp(-0.5 * D.sum(axis=-1))
+
+    def _nll(self, theta: np.ndarray, X: np.ndarray, y: np.ndarray) -> Tuple[float, np.ndarray]:
+        n = len(y)
+        ell2 = np.exp(2.0 * theta[:-2])
+        D = (X[:, None, :] - X[None, :, :]) ** 2  # (n, n, d)
+        Kf = np.exp(theta[-2]) * np.exp(-0.5 * (D / ell2).sum(axis=-1))
+        sn2 = np.exp(theta[-1]) + self.ruido_min
+        try:
+            c = cho_factor(Kf + sn2 * np.eye(n), lower=True)
+        except np.linalg.LinAlgError:
+            return 1e25, np.zeros_like(theta)
+        alpha = cho_solve(c, y)
+        nll = 0.5 * y @ alpha + np.log(np.diag(c[0])).sum() + 0.5 * n * np.log(2 * np.pi)
+        W = np.outer(alpha, alpha) - cho_solve(c, np.eye(n))
+        grad = np.empty_like(theta)
+        grad[:-2] = -0.5 * np.einsum("ij,ij,ijk->k", W, Kf, D) / ell2
+        grad[-2] = -0.5 * (W * Kf).sum()
+        grad[-1] = -0.5 * np.trace(W) * np.exp(theta[-1])
+        return float(nll), grad
+
+    def ajustar(self, X: np.ndarray, y: np.ndarray) -> "ProcessoGaussiano":
+        X = np.asarray(X, dtype=float)
+        y = np.asarray(y, dtype=float)
+        self.media, self.escala = float(y.mean()), float(y.std()) or 1.0
+        ys = (y - self.media) / self.escala
+        d = X.shape[1]
+        limites = [(np.log(1e-2), np.log(1e2))] * d + [(np.log(1e-2), np.log(1e2)), (np.log(1e-8), np.log(1.0))]
+        inicios = [np.r_[np.zeros(d) + np.log(0.3), 0.0, np.log(1e-2)] if self.theta is None else self.theta]
+        inicios += [np.r_[self.rng.uniform(-2.0, 1.0, d), 0.0, np.log(1e-2)] for _ in range(self.reinicios)]
+        melhor = None
+        for t0 in inicios:
+            r = minimize(self._nll, t0, args=(X, ys), jac=True, method="L-BFGS-B", bounds=limites)
+            if melhor is None or r.fun < melhor.fun:
+                melhor = r
+        self.theta, self.X = melhor.x, X
+        K = self._kernel(X, X, self.theta) + (np.exp(self.theta[-1]) + self.ruido_min) * np.eye(len(X))
+        self._c = cho_factor(K, lower=True)
+        self._alpha = cho_solve(self._c, ys)
+        return self
+
+    def prever(self, Xs: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Média e desvio previstos (escala original) em cada linha de ``Xs``."""
+        Ks = self._kernel(np.asarray(Xs, dtype=float), self.X, self.theta)
+        v = cho_solve(self._c, Ks.T)
+        var = np.exp(self.theta[-2]) - np.einsum("ij,ji->i", Ks, v)
+        media = self.media + self.escala * (Ks @ self._alpha)
+        return media, self.escala * np.sqrt(np.maximum(var, 0.0))
+
+
+def _simular(tarefa: Tuple[Callable, Dict[str, float], int, int]) -> Tuple[List[float], List[float]]:
+    montar, params, seed, ciclos = tarefa
+    mundo = montar(params, seed)
+    Simulacao(mundo).executar(ciclos)
+    return list(mundo.h_preco), list(getattr(mundo, "h_deseq", []))
+
+
+def _procurar(cfg: Any, caminho: str) -> Any:
+    """Valor de ``caminho`` (``a.b.c``) na config; sem ponto, a primeira chave igual."""
+    if "." in caminho:
+        for parte in caminho.split("."):
+            cfg = cfg[int(parte)] if isinstance(cfg, list) else cfg[parte]
+        return cfg
+    pilha = [cfg]
+    while pilha:
+        no = pilha.pop(0)
+        if isinstance(no, dict):
+            if caminho in no and not isinstance(no[caminho], (dict, list)):
+                return no[caminho]
+            pilha.extend(no.values())
+        elif isinstance(no, list):
+            pilha.extend(no)
+    raise KeyError(caminho)
+
+
+class Emulador:
+    """
+    Emulador das ``saidas`` do mundo de ``montar`` (ver ``sensibilidade``) em
+    função dos parâmetros de ``limites`` (``{nome: (min, max)}``). Execuções
+    reais (média sobre ``seeds``) rodam em ``processos`` e vão para ``armazem``.
+    """
+
+    def __init__(
+        self,
+        limites: Mapping[str, Tuple[float, float]],
+        saidas: Sequence[str] = SAIDAS_PADRAO,
+        montar: Callable = mercado_referencia,
+        seeds: Sequence[int] = (0,),
+        ciclos: int = 252,
+        processos: Optional[int] = None,
+        armazem: Any = None,
+        limiar: float = 0.1,
+        seed: Optional[int] = 0,
+    ) -> None:
+        self.limites = dict(limites)
+        self.nomes = list(self.limites)
+        self.lo = np.array([v[0] for v in self.limites.values()], dtype=float)
+        self.hi = np.array([v[1] for v in self.limites.values()], dtype=float)
+        self.saidas = tuple(saidas)
+        self.montar, self.seeds, self.ciclos = montar, tuple(seeds), int(ciclos)
+        self.processos = processos
+        self.armazem = armazem
+        self.limiar = float(limiar)
+        self.seed = seed
+        self.P = np.zeros((0, len(self.nomes)))  # pontos de treino (escala dos parâmetros)
+        self.X = np.zeros((0, len(self.nomes)))  # os mesmos, no cubo unitário
+        self.Y = np.zeros((0, len(self.saidas)))
+        self.n_simulacoes = 0
+        self.n_cache = 0
+        self._gps: List[ProcessoGaussiano] = []  # reaproveitados (partida quente)
+        self._ajustado = False
+
+    # --- dados ---
+    def _unit(self, P: np.ndarray) -> np.ndarray:
+        return (np.atleast_2d(np.asarray(P, dtype=float)) - self.lo) / (self.hi - self.lo)
+
+    def _escala(self, U: np.ndarray) -> np.ndarray:
+        return self.lo + U * (self.hi - self.lo)
+
+    def adicionar(self, P: np.ndarray, Y: np.ndarray) -> None:
+        """Acrescenta pontos (escala dos parâmetros) e saídas ao treino."""
+        P = np.atleast_2d(np.asarray(P, dtype=float))
+        self.P = np.vstack([self.P, P])
+        self.X = np.vstack([self.X, self._unit(P)])
+        self.Y = np.vstack([self.Y, np.atleast_2d(np.asarray(Y, dtype=float))])
+        self._ajustado = False
+
+    def _cfg(self, params: Mapping[str, float]) -> dict:
+        montar = f"{self.montar.__module__}:{self.montar.__qualname__}"
+        return {"emulador": {"montar": montar, "ciclos": self.ciclos, "params": dict(params)}}
+
+    def carregar_armazem(self, armazem: Any = None, **filtros: Tuple[str, float]) -> int:
+        """
+        Treino a partir das execuções do armazém (``consultar(**filtros)``) que
+        tenham todos os parâmetros na config e todas as saídas nas métricas;
+        devolve quantas entraram.
+        """
+        armazem = armazem if armazem is not None else self.armazem
+        P, Y = [], []
+        for ex in armazem.consultar(**filtros):
+            try:
+                p = [float(_procurar(ex["config"], n)) for n in self.nomes]
+                y = [float(ex["metricas"][s]) for s in self.saidas]
+            except (KeyError, IndexError, TypeError, ValueError):
+                continue
+            P.append(p)
+            Y.append(y)
+        if P:
+            self.adicionar(np.array(P), np.array(Y))
+        return len(P)
+
+    def simular(self, P: np.ndarray) -> np.ndarray:
+        """Saídas reais (média sobre as seeds) nos pontos ``P``; entram no treino."""
+        from ..utils.store import chave_execucao
+
+        P = np.atleast_2d(np.asarray(P, dtype=float))
+        cfgs = [self._cfg(dict(zip(self.nomes, p.tolist()))) for p in P]
+        paineis: Dict[Tuple[int, int], dict] = {}
+        tarefas, alvos = [], []
+        for i, cfg in enumerate(cfgs):
+            for seed in self.seeds:
+                achado = None
+                if self.armazem is not None:
+                    achado = self.armazem.buscar(chave_execucao(cfg, __version__, seed))
+                if achado is not None:
+                    paineis[i, seed] = achado[0]
+                    self.n_cache += 1
+                else:
+                    tarefas.append((self.montar, cfg["emulador"]["params"], seed, self.ciclos))
+                    alvos.append((i, seed))
+        if self.processos == 1 or len(tarefas) <= 1:
+            series = list(map(_simular, tarefas))
+        else:
+            from concurrent.futures import ProcessPoolExecutor
+
+            with ProcessPoolExecutor(max_workers=self.processos) as pool:
+                series = list(pool.map(_simular, tarefas))
+        self.n_simulacoes += len(set(i for i, _ in alvos))
+        for (i, seed), (precos, deseq) in zip(alvos, series):
+            if self.armazem is not None:
+                paineis[i, seed], _ = self.armazem.gravar(
+                    chave_execucao(cfgs[i], __version__, seed), cfgs[i], "EMUL", precos, deseq
+                )
+            else:
+                paineis[i, seed] = painel_estilizados(precos)
+        Y = np.array(
+            [
+                [np.mean([paineis[i, s].get(k, np.nan) for s in self.seeds]) for k in self.saidas]
+                for i in range(len(P))
+            ],
+            dtype=float,
+        )
+        self.adicionar(P, Y)
+        return Y
+
+    # --- modelo ---
+    def ajustar(self) -> "Emulador":
+        if len(self.X) < 2:
+            raise RuntimeError("o emulador precisa de pelo menos 2 pontos de treino")
+        if not self._gps:
+            self._gps = [ProcessoGaussiano(seed=self.seed) for _ in self.saidas]
+        for k, gp in enumerate(self._gps):
+            ok = np.isfinite(self.Y[:, k])
+            gp.ajustar(self.X[ok], self.Y[ok, k])
+        self._ajustado = True
+        return self
+
+    def prever(self, P: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Média e desvio previstos (pontos x saídas) nos pontos ``P``."""
+        if not self._ajustado:
+            self.ajustar()
+        U = self._unit(P)
+        prev = [gp.prever(U) for gp in self._gps]
+        return np.stack([m for m, _ in prev], axis=1), np.stack([s for _, s in prev], axis=1)
+
+    def incerteza(self, desvio: np.ndarray) -> np.ndarray:
+        """Maior desvio previsto relativo à dispersão da saída no treino, por ponto."""
+        disp = np.nanstd(self.Y, axis=0)
+        return (desvio / np.where(disp > 0, disp, 1.0)).max(axis=1)
+
+    def _iniciar(self, n_inicial: int) -> None:
+        falta = n_inicial - len(self.X)
+        if falta > 0:
+            U = qmc.LatinHypercube(len(self.nomes), seed=self.seed).random(falta)
+            self.simular(self._escala(U))
+
+    def avaliar(self, P: np.ndarray, max_simulacoes: Optional[int] = None, lote: int = 4) -> np.ndarray:
+        """
+        Saídas em ``P`` pela previsão do emulador; enquanto algum ponto passar
+        do ``limiar``, simula os ``lote`` mais incertos e reajusta.
+        """
+        P = np.atleast_2d(np.asarray(P, dtype=float))
+        self._iniciar(2 * len(self.nomes) + 2)
+        gasto = 0
+        while True:
+            media, desvio = self.prever(P)
+            inc = self.incerteza(desvio)
+            fora = np.flatnonzero(inc > self.limiar)
+            if fora.size == 0 or (max_simulacoes is not None and gasto >= max_simulacoes):
+                return media
+            n = len(fora) if max_simulacoes is None else min(len(fora), max_simulacoes - gasto)
+            escolhidos = fora[np.argsort(-inc[fora])[: min(lote, n)]]
+            self.simular(P[escolhidos])
+            gasto += len(escolhidos)
+
+    def calibrar(
+        self,
+        alvo: Mapping[str, float],
+        max_simulacoes: int = 50,
+        n_inicial: Optional[int] = None,
+        n_candidatos: int = 1024,
+        kappa: float = 2.0,
+        escala: Optional[Mapping[str, float]] = None,
+    ) -> Dict[str, Any]:
+        """
+        Parâmetros cujo painel se aproxima de ``alvo`` (``{saída: valor}``) na
+        perda ``sum(((y - alvo) / escala)**2)``. A cada passo o emulador propõe o
+        candidato de menor limite inferior de confiança da perda; se ali a
+        incerteza já está abaixo do ``limiar``, para sem simular.
+        """
+        k_alvo = [self.saidas.index(s) for s in alvo]
+        a = np.array([alvo[s] for s in alvo], dtype=float)
+        esc = np.array(
+            [(escala or {}).get(s, abs(v) or 1.0) for s, v in alvo.items()], dtype=float
+        )
+        inicio = self.n_simulacoes
+        self._iniciar(n_inicial or 2 * len(self.nomes) + 2)
+        sobol = qmc.Sobol(len(self.nomes), scramble=True, seed=self.seed)
+        rng = np.random.default_rng(self.seed)
+
+        def perda(Y: np.ndarray) -> np.ndarray:
+            return (((Y[:, k_alvo] - a) / esc) ** 2).sum(axis=1)
+
+        convergiu = False
+        while self.n_simulacoes - inicio < max_simulacoes:
+            melhor = self.X[np.nanargmin(perda(self.Y))]
+            U = np.vstack(
+                [
+                    sobol.random(n_candidatos),
+                    np.clip(melhor + 0.05 * rng.standard_normal((n_candidatos // 4, len(self.nomes))), 0.0, 1.0),
+                ]
+            )
+            media, desvio = self.prever(self._escala(U))
+            z, s = (media[:, k_alvo] - a) / esc, desvio[:, k_alvo] / esc
+            m_perda = (z**2 + s**2).sum(axis=1)
+            d_perda = np.sqrt((4.0 * z**2 * s**2 + 2.0 * s**4).sum(axis=1))
+            j = int(np.argmin(m_perda - kappa * d_perda))
+            if self.incerteza(desvio[j : j + 1])[0] <= self.limiar:
+                convergiu = True
+                break
+            self.simular(self._escala(U[j : j + 1]))
+
+        perdas = perda(self.Y)
+        i = int(np.nanargmin(perdas))
+        return {
+            "params": dict(zip(self.nomes, self.P[i].tolist())),
+            "saidas": dict(zip(self.saidas, self.Y[i].tolist())),
+            "perda": float(perdas[i]),
+            "n_simulacoes": self.n_simulacoes - inicio,
+            "n_cache": self.n_cache,
+            "convergiu": convergiu,
+        }
@@ -1,11 +1,48 @@
 from __future__ import annotations
-from dataclasses import dataclass
+from dataclasses import dataclass, field
+from typing import ClassVar, Optional
 
 from abm_mercados.core.world import MundoBase
 
-@dataclass
+def receber_dividendo_padrao(inv, d_por_cota: float) -> None:
+    """Dividendo em caixa sobre a posição comprada (o que o livro-razão faz em lote)."""
+    if inv.pos > 0:
+        inv.caixa += d_por_cota * inv.pos
+
+
+def dividendo_proprio(inv) -> bool:
+    """Tem ``receber_dividendo`` diferente do padrão (reinveste, paga imposto...)."""
+    rec = getattr(type(inv), "receber_dividendo", None)
+    return callable(rec) and rec is not receber_dividendo_padrao
+
+
+@dataclass(slots=True)
 class InvestidorBase:
+    """
+    Base dos investidores. Usa ``__slots__`` (sem ``__dict__`` por instância)
+    para que populações grandes caibam em memória.
+
+    Subclasses podem declarar ``@dataclass(slots=True)`` para manter o layout
+    compacto; subclasses comuns (sem slots) continuam funcionando e ganham um
+    ``__dict__`` próprio, aceitando atributos livres como antes.
+
+    Com ``subpassos > 1`` no mundo, investidores intradiários agem em todo
+    subpasso e os demais só no primeiro do ciclo. O padrão vem da classe
+    (``INTRADIARIO``) e pode ser trocado por instância (``intradiario=``).
+    """
+
+    INTRADIARIO: ClassVar[bool] = False
+
     id: int
+    # posição em ``mundo.investidores`` (atribuída pelo mundo ao adicionar);
+    # indexa vetores por investidor, como o ruído de observação do fundamental
+    indice: int = field(default=-1, init=False, repr=False, compare=False)
+    intradiario: Optional[bool] = field(
+        default=None, kw_only=True, repr=False, compare=False
+    )
+
+    def age_intradiario(self) -> bool:
+        return self.INTRADIARIO if self.intradiario is None else self.intradiario
 
     def reset(self, ambiente: "MundoBase") -> None:
         pass
@@ -13,3 +50,26 @@ class InvestidorBase:
     def agir(self, ambiente: "MundoBase") -> None:
         """Cada investidor decide e registra ordens no ambiente."""
         raise NotImplementedError
+
+    def _cabe(self, ambiente: "MundoBase", qtd: float) -> bool:
+        """
+        Checagem escalar padrão: compra com o caixa, venda do que tem. Com motor
+        de risco no mundo (``ambiente.risco``) a ordem passa: limites de venda a
+        descoberto e alavancagem são aplicados pelo mundo, em lote.
+        """
+        if getattr(ambiente, "risco", None) is not None:
+            return True
+        if qtd > 0:
+            return qtd * ambiente.preco <= self.caixa
+        return -qtd <= self.pos
+
+    def _enviar(self, ambiente: "MundoBase", qtd: float) -> None:
+        """
+        Envia uma ordem (``qtd`` com sinal) de quem tem ``caixa``/``pos``. Sem
+        livro-razão no mundo, liquida na hora ao preço corrente; com livro, só
+        registra: o mundo liquida ao preço do ciclo e devolve caixa/pos.
+        """
+        if getattr(ambiente, "livro", None) is None:
+            self.caixa -= qtd * ambiente.preco
+            self.pos += qtd
+        ambiente.registrar_ordem(self.id, qtd)
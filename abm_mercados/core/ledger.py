@@ -0,0 +1,195 @@
+"""
+Livro-razão central: caixa, posição e PnL de todos os investidores em arrays.
+
+O mundo liquida as ordens do ciclo de uma vez (``liquidar``) ao preço de
+formação do ciclo, em vez de cada investidor debitar/creditar a si mesmo ao
+preço anterior. Os totais externos (valor negociado, dividendos, taxas) são
+acumulados à parte, o que permite checar a conservação de caixa e de cotas com
+somas vetorizadas (``verificar``).
+"""
+from __future__ import annotations
+from typing import Any, Dict, Iterable, Optional
+
+import numpy as np
+
+from .investidor import dividendo_proprio
+
+
+class LivroRazao:
+    def __init__(self) -> None:
+        self.n = 0
+        self.caixa = np.zeros(0)
+        self.pos = np.zeros(0)
+        self.custo_medio = np.zeros(0)
+        self.pnl_realizado = np.zeros(0)
+        self.dividendos = np.zeros(0)
+        self.taxas = np.zeros(0)
+        # só estes recebem de volta caixa/pos (têm os atributos)
+        self.com_conta = np.zeros(0, dtype=bool)
+        # quem tem ``receber_dividendo`` (mesma regra do mundo sem livro) e,
+        # entre esses, quem o sobrescreve (o mundo chama o método dessas contas)
+        self.recebe_dividendo = np.zeros(0, dtype=bool)
+        self.dividendo_proprio = np.zeros(0, dtype=bool)
+        # totais para as invariantes
+        self.caixa_inicial = 0.0
+        self.pos_inicial = 0.0
+        self.valor_negociado = 0.0  # soma de qtd * preço (compras > 0)
+        self.volume_liquido = 0.0  # soma de qtd
+        self.total_dividendos = 0.0
+        self.total_taxas = 0.0
+
+    def abrir_contas(self, invs: Iterable[Any]) -> None:
+        """Acrescenta contas (na ordem de ``mundo.investidores``) com o caixa/pos atuais."""
+        invs = list(invs)
+        caixa = np.array([float(getattr(i, "caixa", 0.0)) for i in invs])
+        pos = np.array([float(getattr(i, "pos", 0.0)) for i in invs])
+        conta = np.array([hasattr(i, "caixa") and hasattr(i, "pos") for i in invs], dtype=bool)
+        recebe = np.array([callable(getattr(i, "receber_dividendo", None)) for i in invs], dtype=bool)
+        proprio = np.array([dividendo_proprio(i) for i in invs], dtype=bool)
+        k = len(invs)
+        self.caixa = np.r_[self.caixa, caixa]
+        self.pos = np.r_[self.pos, pos]
+        self.custo_medio = np.r_[self.custo_medio, np.zeros(k)]
+        self.pnl_realizado = np.r_[self.pnl_realizado, np.zeros(k)]
+        self.dividendos = np.r_[self.dividendos, np.zeros(k)]
+        self.taxas = np.r_[self.taxas, np.zeros(k)]
+        self.com_conta = np.r_[self.com_conta, conta]
+        self.recebe_dividendo = np.r_[self.recebe_dividendo, recebe & conta]
+        self.dividendo_proprio = np.r_[self.dividendo_proprio, proprio & conta]
+        self.caixa_inicial += float(caixa.sum())
+        self.pos_inicial += float(pos.sum())
+        self.n += k
+
+    def liquidar(
+        self,
+        idx: np.ndarray,
+        qtd: np.ndarray,
+        preco: float | np.ndarray,
+        taxas: Optional[np.ndarray] = None,
+    ) -> np.ndarray:
+        """
+        Liquida as ordens (``idx`` = índice do investidor, ``qtd`` com sinal) ao
+        ``preco`` (único ou um por ordem, como nas cotações dos formadores).
+        Ordens do mesmo investidor no ciclo são somadas antes (ao preço médio);
+        o custo médio e o PnL realizado seguem a posição líquida. ``taxas`` (uma
+        por ordem) saem do caixa. Devolve os índices das contas alteradas.
+        """
+        q = np.bincount(idx, weights=qtd, minlength=self.n)
+        if taxas is not None:
+            t = np.bincount(idx, weights=taxas, minlength=self.n)
+            self.caixa -= t
+            self.taxas += t
+            self.total_taxas += float(t.sum())
+        at = np.flatnonzero(q)
+        qa = q[at]
+        if np.ndim(preco) == 0:
+            px = preco
+            financeiro = qa * preco
+        else:
+            financeiro = np.bincount(idx, weights=qtd * preco, minlength=self.n)[at]
+            px = financeiro / qa
+        p0 = self.pos[at]
+        c0 = self.custo_medio[at]
+        p1 = p0 + qa
+        mesmo_lado = (p0 == 0.0) | (np.sign(p0) == np.sign(qa))
+        # parte que reduz a posição (com o sinal da ordem)
+        fecha = np.where(mesmo_lado, 0.0, np.sign(qa) * np.minimum(np.abs(qa), np.abs(p0)))
+        self.pnl_realizado[at] -= fecha * (px - c0)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            medio = (p0 * c0 + qa * px) / p1
+        self.custo_medio[at] = np.where(
+            mesmo_lado,
+            medio,
+            np.where(np.abs(qa) < np.abs(p0), c0, np.where(p1 == 0.0, 0.0, px)),
+        )
+        self.pos[at] = p1
+        self.caixa[at] -= financeiro
+        liquido = float(qa.sum())
+        if np.ndim(preco) == 0:
+            self.valor_negociado += liquido * preco
+        else:
+            self.valor_negociado += float(financeiro.sum())
+        self.volume_liquido += liquido
+        if taxas is not None:
+            return np.flatnonzero((q != 0.0) | (t != 0.0))
+        return at
+
+    def pagar_dividendos(
+        self, d_por_cota: float, elegiveis: Optional[np.ndarray] = None
+    ) -> np.ndarray:
+        """
+        Credita ``d_por_cota`` às posições compradas (só das contas em
+        ``elegiveis``, máscara por conta, se dada); devolve quem recebeu.
+        """
+        if d_por_cota <= 0.0:
+            return np.zeros(0, dtype=np.int64)
+        comprada = self.pos > 0.0
+        at = np.flatnonzero(comprada if elegiveis is None else comprada & elegiveis)
+        self.creditar_dividendos(at, d_por_cota * self.pos[at])
+        return at
+
+    def creditar_dividendos(self, idx: np.ndarray, valores: np.ndarray) -> None:
+        """Credita ``valores`` (um por conta de ``idx``) como dividendos."""
+        self.caixa[idx] += valores
+        self.dividendos[idx] += valores
+        self.total_dividendos += float(np.sum(valores))
+
+    def cobrar(self, valores: np.ndarray) -> np.ndarray:
+        """Debita ``valores`` (um por conta) do caixa como taxas; devolve quem pagou."""
+        at = np.flatnonzero(valores)
+        v = valores[at]
+        self.caixa[at] -= v
+        self.taxas[at] += v
+        self.total_taxas += float(v.sum())
+        return at
+
+    def pnl_nao_realizado(self, preco: float) -> np.ndarray:
+        return self.pos * (preco - self.custo_medio)
+
+    def patrimonio(self, preco: float) -> np.ndarray:
+        return self.caixa + self.pos * preco
+
+    def resumo(self, preco: float) -> Dict[str, float]:
+        return {
+            "caixa_total": float(self.caixa.sum()),
+            "pos_total": float(self.pos.sum()),
+            "patrimonio_total": float(self.patrimonio(preco).sum()),
+            "pnl_realizado": float(self.pnl_realizado.sum()),
+            "pnl_nao_realizado": float(self.pnl_nao_realizado(preco).sum()),
+            "dividendos": self.total_dividendos,
+            "taxas": self.total_taxas,
+            "caixa_negativo": int((self.caixa < 0.0).sum()),
+        }
+
+    def verificar(self, rtol: float = 1e-9) -> None:
+        """
+        Invariantes (somas vetorizadas; RuntimeError se violadas):
+          - nada NaN/inf;
+          - caixa: inicial - valor negociado + dividendos - taxas;
+          - cotas: inicial + volume líquido (a contraparte é o mercado).
+        """
+        if not (np.isfinite(self.caixa).all() and np.isfinite(self.pos).all()):
+            raise RuntimeError("livro-razão com caixa/posição não finitos")
+        esperado = (
+            self.caixa_inicial
+            - self.valor_negociado
+            + self.total_dividendos
+            - self.total_taxas
+        )
+        caixa = float(self.caixa.sum())
+        escala = max(1.0, float(np.abs(self.caixa).sum()), abs(self.valor_negociado))
+        if abs(caixa - esperado) > rtol * escala:
+            raise RuntimeError(f"caixa não conservado: {caixa} != {esperado}")
+        pos = float(self.pos.sum())
+        esperado = self.pos_inicial + self.volume_liquido
+        escala = max(1.0, float(np.abs(self.pos).sum()), abs(self.volume_liquido))
+        if abs(pos - esperado) > rtol * escala:
+            raise RuntimeError(f"cotas não conservadas: {pos} != {esperado}")
+
+    def devolver(self, investidores: list, idx: np.ndarray) -> None:
+        """Escreve caixa/pos das contas ``idx`` de volta nos investidores."""
+        idx = idx[self.com_conta[idx]]
+        for i, c, p in zip(idx.tolist(), self.caixa[idx].tolist(), self.pos[idx].tolist()):
+            inv = investidores[i]
+            inv.caixa = c
+            inv.pos = p
@@ -1,6 +1,11 @@
+from typing import Sequence
+
 import numpy as np
 import pandas as pd
-from statsmodels.tsa.stattools import acf
+
+
+# até quantos lags o produto interno direto (O(n·k)) ganha da FFT (O(n log n))
+LAGS_DIRETO = 8
 
 
 def retornos_log(precos: list[float]) -> np.ndarray:
@@ -8,18 +13,200 @@ def retornos_log(precos: list[float]) -> np.ndarray:
     return np.diff(np.log(p))
 
 
-def painel_estilizados(precos: list[float]) -> dict:
+class VolatilidadeEWMA:
+    """
+    Volatilidade incremental (EWMA estilo RiskMetrics): ``var <- lam * var +
+    (1 - lam) * r**2`` a cada retorno log, O(1) por passo, sem reler o histórico.
+    """
+
+    def __init__(self, lam: float = 0.94, sigma0: float = 0.002) -> None:
+        if not 0.0 <= lam < 1.0:
+            raise ValueError("lam deve estar em [0, 1)")
+        self.lam = float(lam)
+        self.var = float(sigma0) ** 2
+        self.n = 0
+
+    def atualizar(self, r: float) -> float:
+        self.var = self.lam * self.var + (1.0 - self.lam) * r * r
+        self.n += 1
+        return self.var
+
+    @property
+    def sigma(self) -> float:
+        return self.var**0.5
+
+
+def acf_lote(x, nlags: int) -> np.ndarray:
+    """
+    ACF (lags 0..nlags) de cada linha de ``x`` (séries x tempo) com uma única
+    FFT real 2D. Mesma definição do ``statsmodels.acf`` (média removida, sem ajuste).
+    """
+    x = np.atleast_2d(np.asarray(x, dtype=float))
+    n = x.shape[1]
+    d = x - x.mean(axis=1, keepdims=True)
+    nfft = 1 << int(2 * n - 1).bit_length()
+    f = np.fft.rfft(d, n=nfft, axis=1)
+    ac = np.fft.irfft(f.real**2 + f.imag**2, n=nfft, axis=1)[:, : nlags + 1]
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return ac / ac[:, :1]
+
+
+def acf(x, lags: int | Sequence[int] = 1, metodo: str = "auto") -> np.ndarray:
+    """
+    ACF de ``x`` (1D, ou 2D com uma série por linha) nos ``lags`` pedidos
+    (int k => 1..k). ``metodo``: "direto" (um produto interno por lag), "fft"
+    (uma FFT real para todas as linhas) ou "auto" (direto até LAGS_DIRETO lags).
+    Lags >= n dão NaN. Devolve (len(lags),) ou (séries, len(lags)).
+    """
+    x = np.asarray(x, dtype=float)
+    x2 = np.atleast_2d(x)
+    n = x2.shape[1]
+    if isinstance(lags, (int, np.integer)):
+        lags = np.arange(1, int(lags) + 1)
+    lags = np.asarray(lags, dtype=int)
+    validos = lags < n
+    out = np.full((x2.shape[0], lags.size), np.nan)
+    if metodo == "auto":
+        metodo = "direto" if lags.size <= LAGS_DIRETO else "fft"
+    if validos.any():
+        if metodo == "direto":
+            d = x2 - x2.mean(axis=1, keepdims=True)
+            c0 = np.einsum("ij,ij->i", d, d)
+            with np.errstate(invalid="ignore", divide="ignore"):
+                for j in np.flatnonzero(validos):
+                    k = lags[j]
+                    out[:, j] = np.einsum("ij,ij->i", d[:, : n - k], d[:, k:]) / c0
+        elif metodo == "fft":
+            out[:, validos] = acf_lote(x2, int(lags[validos].max()))[:, lags[validos]]
+        else:
+            raise ValueError(f"metodo desconhecido: {metodo!r}")
+    return out[0] if x.ndim == 1 else out
+
+
+def acf_retornos(
+    precos, lags: int | Sequence[int] = (1,), transformacoes=("r", "abs", "sq")
+) -> dict:
+    """ACF dos retornos log (``r``), absolutos (``abs``) e quadrados (``sq``): chaves ``acf_<t>_<lag>``."""
+    r = retornos_log(precos)
+    series = {"r": r, "abs": np.abs(r), "sq": r * r}
+    if isinstance(lags, (int, np.integer)):
+        lags = range(1, int(lags) + 1)
+    lags = list(lags)
+    # todas as transformações numa matriz só => uma chamada do kernel
+    valores = acf(np.stack([series[t] for t in transformacoes]), lags)
+    return {
+        f"acf_{t}_{k}": float(valores[i, j])
+        for i, t in enumerate(transformacoes)
+        for j, k in enumerate(lags)
+    }
+
+
+def painel_estilizados(
+    precos: list[float],
+    fluxo: dict | None = None,
+    lags_acf: Sequence[int] | None = None,
+    backend: str = "nativo",
+) -> dict:
+    """
+    Fatos estilizados dos retornos log. ``lags_acf`` acrescenta ``acf_{r,abs,sq}_<lag>``;
+    ``backend="statsmodels"`` usa o ``acf`` do statsmodels (referência antiga).
+    """
     r = retornos_log(precos)
     if r.size == 0:
         return {}
-    acf_r = acf(r, fft=True, nlags=min(50, len(r) - 1), missing="drop")
-    acf_abs = acf(np.abs(r), fft=True, nlags=min(50, len(r) - 1), missing="drop")
-    return {
+    if backend == "statsmodels":
+        from statsmodels.tsa.stattools import acf as acf_sm
+
+        nl = min(50, len(r) - 1)
+        acf_r = acf_sm(r, fft=True, nlags=nl, missing="drop")
+        acf_abs = acf_sm(np.abs(r), fft=True, nlags=nl, missing="drop")
+        acf_r_1 = float(acf_r[1]) if len(acf_r) > 1 else np.nan
+        acf_abs_1 = float(acf_abs[1]) if len(acf_abs) > 1 else np.nan
+    elif backend == "nativo":
+        acf_r_1, acf_abs_1 = (float(v) for v in acf(np.stack([r, np.abs(r)]), [1])[:, 0])
+    else:
+        raise ValueError(f"backend desconhecido: {backend!r}")
+    out = {
         "n": int(len(precos)),
         "ret_medio": float(np.mean(r)),
         "vol_diaria": float(np.std(r, ddof=1)),
-        "curtose": float(pd.Series(r).kurtosis(fisher=False)),
+        # convenção de Pearson (normal = 3)
+        "curtose": float(pd.Series(r).kurtosis()) + 3.0,
         "assimetria": float(pd.Series(r).skew()),
-        "acf_r_1": float(acf_r[1]) if len(acf_r) > 1 else np.nan,
-        "acf_abs_1": float(acf_abs[1]) if len(acf_abs) > 1 else np.nan,
+        "acf_r_1": acf_r_1,
+        "acf_abs_1": acf_abs_1,
+    }
+    if lags_acf:
+        out.update(acf_retornos(precos, lags_acf))
+    if fluxo:
+        out.update(painel_microestrutura(precos, fluxo))
+    return out
+
+
+def _corr(a: np.ndarray, b: np.ndarray) -> float:
+    if a.size < 2 or np.std(a) == 0.0 or np.std(b) == 0.0:
+        return np.nan
+    return float(np.corrcoef(a, b)[0, 1])
+
+
+def painel_microestrutura(precos: list[float], fluxo: dict) -> dict:
+    """
+    Métricas de microestrutura a partir das séries por ciclo do fluxo de ordens
+    (ver ``MercadoSimples.series_microestrutura``). Tudo vetorizado sobre os arrays.
+
+      - lambda_kyle: inclinação MQO do retorno contra o desequilíbrio líquido
+      - corr_vol_absret: correlação volume bruto x |retorno|
+      - acf_fluxo_1 / acf_sinal_1: autocorrelação lag 1 do fluxo líquido e do seu sinal
+      - part_<Tipo>: fração do volume bruto negociada por cada classe de investidor
+      - ordens_<Tipo>: ordens por ciclo de cada classe (séries ``n_ordens_<Tipo>``)
+      - custo_<Modelo> / custo_bps: custos totais por modelo e custo total em
+        pontos-base do financeiro negociado (se houver séries ``custo_*``)
+    """
+    r = retornos_log(precos)
+    x = np.asarray(fluxo["desequilibrio"], dtype=float)
+    n = min(r.size, x.size)
+    if n == 0:
+        return {}
+    # alinha pelo fim: o retorno do ciclo t é causado pelo fluxo do ciclo t
+    r, x = r[-n:], x[-n:]
+    volume = (
+        np.asarray(fluxo["vol_compra"], dtype=float)[-n:]
+        + np.asarray(fluxo["vol_venda"], dtype=float)[-n:]
+    )
+
+    xc = x - x.mean()
+    sxx = float(xc @ xc)
+    lam = float(xc @ (r - r.mean()) / sxx) if sxx > 0 else np.nan
+    r2 = _corr(x, r) ** 2
+
+    out = {
+        "lambda_kyle": lam,
+        "lambda_kyle_r2": float(r2),
+        "volume_medio": float(volume.mean()),
+        "ordens_por_ciclo": float(np.mean(np.asarray(fluxo["n_ordens"])[-n:]))
+        if "n_ordens" in fluxo
+        else np.nan,
+        "corr_vol_absret": _corr(volume, np.abs(r)),
+        "acf_fluxo_1": _corr(x[:-1], x[1:]) if n > 2 else np.nan,
+        "acf_sinal_1": _corr(np.sign(x[:-1]), np.sign(x[1:])) if n > 2 else np.nan,
     }
+    total = float(volume.sum())
+    for chave, serie in fluxo.items():
+        if chave.startswith("vol_") and chave not in ("vol_compra", "vol_venda"):
+            tipo = chave[len("vol_") :]
+            v = float(np.sum(np.asarray(serie, dtype=float)[-n:]))
+            out[f"part_{tipo}"] = v / total if total > 0 else np.nan
+        elif chave.startswith("n_ordens_"):
+            tipo = chave[len("n_ordens_") :]
+            out[f"ordens_{tipo}"] = float(np.mean(np.asarray(serie, dtype=float)[-n:]))
+    custos = {k: v for k, v in fluxo.items() if k.startswith("custo_")}
+    if custos:
+        p = np.asarray(precos, dtype=float)[-n:]  # preço de liquidação de cada ciclo
+        financeiro = float(volume @ p)
+        soma = 0.0
+        for chave, serie in custos.items():
+            c = float(np.sum(np.asarray(serie, dtype=float)[-n:]))
+            out[chave] = c
+            soma += c
+        out["custo_bps"] = 1e4 * soma / financeiro if financeiro > 0 else np.nan
+    return out
@@ -12,3 +12,7 @@ class OrderBookIngenuo:
 
     def agregar(self, ordens):
         return sum(o["qtd"] for o in (ordens or []))
+
+    def agregar_qtd(self, qtd):
+        """Mesma soma (na mesma ordem) a partir de um array de quantidades."""
+        return sum(qtd.tolist())
@@ -0,0 +1,118 @@
+"""
+Motor de risco do mundo: venda a descoberto, alavancagem, margem e liquidação.
+
+Tudo roda sobre os arrays do livro-razão, uma passada NumPy por ciclo:
+
+  - ``filtrar`` (antes da formação do preço): corta a quantidade líquida de
+    cada conta no ciclo para que ``|pos| * preço <= alavancagem_max * PL``
+    (e ``pos >= 0`` sem ``vendido``); ordens que reduzem a exposição passam;
+  - ``fechar_ciclo`` (no fechamento): cobra aluguel das posições vendidas,
+    juros do caixa negativo e o dividendo devido pelos vendidos, marca as
+    contas abaixo da margem de manutenção e, passado ``prazo_chamada`` ciclos
+    em chamada, devolve ordens de liquidação que trazem a conta de volta à
+    margem inicial. O mundo as coloca no fluxo do ciclo seguinte, onde movem
+    o preço como qualquer ordem (e podem disparar novas chamadas: cascata).
+
+Custos e dividendos pagos saem do caixa como taxas (``LivroRazao.cobrar``),
+mantendo as invariantes de conservação do livro.
+"""
+from __future__ import annotations
+from dataclasses import dataclass, field
+from typing import Any, Dict, Optional, Tuple
+
+import numpy as np
+
+
+@dataclass
+class MotorRisco:
+    vendido: bool = True  # permite posição negativa
+    alavancagem_max: float = 2.0  # exposição bruta / patrimônio na entrada
+    margem_manutencao: float = 0.25  # PL mínimo / exposição antes da chamada
+    margem_inicial: Optional[float] = None  # alvo da liquidação (padrão 1 / alavancagem_max)
+    prazo_chamada: int = 0  # ciclos em chamada antes da liquidação forçada
+    taxa_aluguel: float = 0.02  # ao ano, sobre o valor vendido
+    taxa_financiamento: float = 0.0  # ao ano, sobre o caixa negativo
+    _em_chamada: np.ndarray = field(default_factory=lambda: np.zeros(0, dtype=np.int64), init=False, repr=False)
+
+    def __post_init__(self) -> None:
+        if self.alavancagem_max <= 0.0:
+            raise ValueError("alavancagem_max deve ser > 0")
+        if not 0.0 <= self.margem_manutencao < 1.0:
+            raise ValueError("margem_manutencao deve estar em [0, 1)")
+        if self.margem_inicial is None:
+            self.margem_inicial = 1.0 / self.alavancagem_max
+        if self.margem_inicial < self.margem_manutencao:
+            raise ValueError("margem_inicial deve ser >= margem_manutencao")
+
+    def _sujeitas(self, livro: Any, isentos: Optional[np.ndarray]) -> np.ndarray:
+        ok = livro.com_conta.copy()
+        if isentos is not None and isentos.size:
+            ok[isentos] = False
+        return ok
+
+    def filtrar(
+        self, livro: Any, idx: np.ndarray, qtd: np.ndarray, preco: float,
+        isentos: Optional[np.ndarray] = None,
+    ) -> Tuple[np.ndarray, float]:
+        """Quantidades ajustadas aos limites (por ordem) e o volume cortado."""
+        if qtd.size == 0:
+            return qtd, 0.0
+        q = np.bincount(idx, weights=qtd, minlength=livro.n)
+        pos = livro.pos
+        pl = np.maximum(livro.caixa + pos * preco, 0.0)
+        teto = self.alavancagem_max * pl / preco
+        piso = -teto if self.vendido else np.zeros_like(teto)
+        # corta só o que aumenta a exposição além do limite
+        permitido = np.clip(q, np.minimum(0.0, piso - pos), np.maximum(0.0, teto - pos))
+        permitido = np.where(self._sujeitas(livro, isentos), permitido, q)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            fator = np.where(q != 0.0, permitido / q, 1.0)
+        nova = qtd * fator[idx]
+        return nova, float(np.abs(qtd - nova).sum())
+
+    def fechar_ciclo(
+        self, livro: Any, preco: float, dividendo: float, ciclos_por_ano: int,
+        isentos: Optional[np.ndarray] = None,
+    ) -> Tuple[np.ndarray, np.ndarray, np.ndarray, Dict[str, float]]:
+        """
+        Custos do ciclo e checagem de margem. Devolve (índices, quantidades) das
+        liquidações forçadas, as contas cobradas e as estatísticas do ciclo.
+        """
+        ok = self._sujeitas(livro, isentos)
+        pos, caixa = livro.pos, livro.caixa
+        vendida = np.where(ok & (pos < 0.0), -pos, 0.0)
+        custo = vendida * (preco * self.taxa_aluguel / ciclos_por_ano + max(dividendo, 0.0))
+        if self.taxa_financiamento > 0.0:
+            custo += np.where(ok & (caixa < 0.0), -caixa, 0.0) * (self.taxa_financiamento / ciclos_por_ano)
+        cobrados = livro.cobrar(custo)
+
+        if self._em_chamada.size < livro.n:
+            self._em_chamada = np.r_[self._em_chamada, np.zeros(livro.n - self._em_chamada.size, dtype=np.int64)]
+        exposicao = np.abs(livro.pos) * preco
+        pl = livro.caixa + livro.pos * preco
+        chamada = ok & (exposicao > 0.0) & (pl < self.margem_manutencao * exposicao)
+        self._em_chamada = np.where(chamada, self._em_chamada + 1, 0)
+        liquidar = np.flatnonzero(self._em_chamada > self.prazo_chamada)
+        # reduz |pos| até PL = margem_inicial * exposição (tudo se PL <= 0)
+        alvo = np.maximum(pl[liquidar], 0.0) / (self.margem_inicial * preco)
+        p = livro.pos[liquidar]
+        q = -np.sign(p) * np.maximum(np.abs(p) - alvo, 0.0)
+        self._em_chamada[liquidar] = 0
+        stats = {
+            "risco_custo": float(custo.sum()),
+            "chamadas": float(chamada.sum()),
+            "liquidado": float(np.abs(q).sum()),
+            "alavancagem": float(exposicao[ok].sum() / max(1e-12, np.maximum(pl[ok], 0.0).sum())),
+        }
+        return liquidar, q, cobrados, stats
+
+
+def criar_risco(spec: Any) -> Optional[MotorRisco]:
+    """Motor a partir da config: instância, dict de parâmetros, True (padrão) ou None."""
+    if spec is None or spec is False:
+        return None
+    if isinstance(spec, MotorRisco):
+        return spec
+    if spec is True:
+        return MotorRisco()
+    return MotorRisco(**dict(spec))
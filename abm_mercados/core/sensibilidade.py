@@ -0,0 +1,244 @@
+"""
+Análise de sensibilidade global (Sobol e Morris) dos parâmetros da simulação.
+
+Os pontos vêm de sequências quase-aleatórias (``scipy.stats.qmc``) no cubo
+unitário, escalados para ``limites`` e aplicados ao mundo montado por
+``montar`` (padrão: o mercado FII de referência). Cada ponto é uma execução
+independente do ``MercadoSimples``; pontos repetidos são avaliados uma vez só
+e as execuções rodam num pool de processos. Os estimadores saem de uma vez
+para todas as saídas (arrays pontos x saídas):
+
+  - Sobol (esquema de Saltelli, N * (d + 2) execuções: as matrizes A e B
+    servem a todos os índices): 1ª ordem de Saltelli (2010) e total de
+    Jansen, com intervalos por bootstrap vetorizado;
+  - Morris: r trajetórias de d + 1 pontos (cada ponto serve a dois efeitos
+    elementares), com mu, mu* e sigma.
+
+``avaliador`` troca as execuções por outra função pontos -> saídas (ex.:
+``Emulador.avaliar``, que só simula onde a previsão é incerta).
+
+O resultado é um dict plano (``S1_<saída>_<parâmetro>``, ``ST_...``,
+``mu_estrela_...``) como os de ``painel_estilizados``; ``tabela_sensibilidade``
+o pivota num DataFrame.
+"""
+from __future__ import annotations
+import inspect
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Callable, Dict, List, Mapping, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+from scipy.stats import norm, qmc
+
+from .metrics import painel_estilizados
+from .simulation import Simulacao
+
+SAIDAS_PADRAO = ("curtose", "vol_diaria")
+
+
+def mercado_referencia(params: Mapping[str, float], seed: int) -> Any:
+    """
+    Mercado FII de referência (15 fundamentalistas, 10 ruído, 5 tendência) com
+    ``params`` aplicados: argumentos do ``MercadoSimples`` vão para o mundo, os
+    demais para todo investidor que tiver o atributo (inteiros são arredondados).
+    """
+    from ..mercados.environments import MercadoSimples
+    from ..investidores.fundamentalista import InvestidorFundamentalista
+    from ..investidores.ruido import InvestidorRuido
+    from ..investidores.tecnico import InvestidorTendencia
+
+    aceitos = inspect.signature(MercadoSimples).parameters
+    mundo_kw = {"dy_anual": 0.10, **{k: v for k, v in params.items() if k in aceitos}}
+    mundo = MercadoSimples(seed=seed, **mundo_kw)
+    base_vals = [95, 105, 115, 125, 135]
+    invs: List[Any] = [
+        InvestidorFundamentalista(i, valor_intrinseco=base_vals[i % 5]) for i in range(15)
+    ]
+    invs += [InvestidorRuido(100 + j) for j in range(10)]
+    invs += [InvestidorTendencia(200 + j, janela=5) for j in range(5)]
+    for nome, v in params.items():
+        if nome in aceitos:
+            continue
+        for inv in invs:
+            atual = getattr(inv, nome, None)
+            if atual is not None:
+                setattr(inv, nome, int(round(v)) if isinstance(atual, int) else float(v))
+    mundo.adicionar_investidores(invs)
+    return mundo
+
+
+def _avaliar(tarefa: Tuple[Callable, Dict[str, float], Sequence[int], int, Sequence[str]]) -> List[float]:
+    montar, params, seeds, ciclos, saidas = tarefa
+    valores = np.zeros(len(saidas))
+    for seed in seeds:  # média entre seeds (mesmas seeds em todo ponto)
+        mundo = montar(params, seed)
+        Simulacao(mundo).executar(ciclos)
+        painel = painel_estilizados(mundo.h_preco)
+        valores += [painel.get(s, np.nan) for s in saidas]
+    return (valores / len(seeds)).tolist()
+
+
+def avaliar_pontos(
+    X: np.ndarray,
+    nomes: Sequence[str],
+    montar: Callable = mercado_referencia,
+    seeds: Sequence[int] = (0,),
+    ciclos: int = 252,
+    saidas: Sequence[str] = SAIDAS_PADRAO,
+    processos: Optional[int] = None,
+) -> np.ndarray:
+    """
+    Saídas (pontos x saídas) das execuções em cada linha de ``X`` (já na escala
+    dos parâmetros). Linhas repetidas rodam uma vez; ``processos=1`` é serial.
+    """
+    X = np.asarray(X, dtype=float)
+    unicos, inverso = np.unique(X, axis=0, return_inverse=True)
+    tarefas = [
+        (montar, dict(zip(nomes, linha.tolist())), tuple(seeds), int(ciclos), tuple(saidas))
+        for linha in unicos
+    ]
+    if processos == 1:
+        res = list(map(_avaliar, tarefas))
+    else:
+        with ProcessPoolExecutor(max_workers=processos) as pool:
+            res = list(pool.map(_avaliar, tarefas, chunksize=max(1, len(tarefas) // 64)))
+    return np.asarray(res, dtype=float)[inverso.ravel()]
+
+
+def _escalar(U: np.ndarray, limites: Mapping[str, Tuple[float, float]]) -> np.ndarray:
+    lo = np.array([v[0] for v in limites.values()], dtype=float)
+    hi = np.array([v[1] for v in limites.values()], dtype=float)
+    return lo + U * (hi - lo)
+
+
+def _indices_sobol(fA, fB, fAB):
+    """S1 (Saltelli 2010) e ST (Jansen) para (d, ..., saídas), sobre o eixo dos pontos."""
+    var = np.var(np.concatenate([fA, fB], axis=-2), axis=-2, ddof=1)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        s1 = np.mean(fB * (fAB - fA), axis=-2) / var
+        st = 0.5 * np.mean((fA - fAB) ** 2, axis=-2) / var
+    return s1, st
+
+
+def sobol(
+    limites: Mapping[str, Tuple[float, float]],
+    n: int = 256,
+    montar: Callable = mercado_referencia,
+    seeds: Sequence[int] = (0,),
+    ciclos: int = 252,
+    saidas: Sequence[str] = SAIDAS_PADRAO,
+    processos: Optional[int] = None,
+    n_boot: int = 200,
+    nivel: float = 0.95,
+    seed: Optional[int] = 0,
+    avaliador: Optional[Callable[[np.ndarray], np.ndarray]] = None,
+) -> Dict[str, float]:
+    """
+    Índices de Sobol de 1ª ordem e totais de cada parâmetro de ``limites``
+    (``{nome: (min, max)}``) para cada saída do painel. ``n`` (potência de 2)
+    pontos base; ``n * (d + 2)`` execuções.
+    """
+    if not 0.0 < nivel < 1.0:
+        raise ValueError("nivel deve estar em (0, 1)")
+    nomes = list(limites)
+    d = len(nomes)
+    U = qmc.Sobol(2 * d, scramble=True, seed=seed).random(n)
+    A, B = U[:, :d], U[:, d:]
+    AB = np.repeat(A[None], d, axis=0)
+    AB[np.arange(d), :, np.arange(d)] = B[:, np.arange(d)].T  # coluna i de B em A
+    X = _escalar(np.concatenate([A, B, AB.reshape(-1, d)]), limites)
+    if avaliador is not None:
+        f = np.asarray(avaliador(X), dtype=float)
+    else:
+        f = avaliar_pontos(X, nomes, montar, seeds, ciclos, saidas, processos)
+    fA, fB, fAB = f[:n], f[n : 2 * n], f[2 * n :].reshape(d, n, -1)
+    s1, st = _indices_sobol(fA, fB, fAB)
+
+    # bootstrap: todas as reamostragens de uma vez (n_boot, n) índices
+    idx = np.random.default_rng(seed).integers(0, n, size=(n_boot, n))
+    b1, bt = _indices_sobol(fA[idx][None], fB[idx][None], fAB[:, idx])
+    z = norm.ppf(0.5 + nivel / 2.0)
+    c1, ct = z * np.nanstd(b1, axis=1), z * np.nanstd(bt, axis=1)
+
+    out: Dict[str, float] = {"n_avaliacoes": float(len(X)), "n_base": float(n)}
+    for k, s in enumerate(saidas):
+        for i, p in enumerate(nomes):
+            out[f"S1_{s}_{p}"] = float(s1[i, k])
+            out[f"S1_conf_{s}_{p}"] = float(c1[i, k])
+            out[f"ST_{s}_{p}"] = float(st[i, k])
+            out[f"ST_conf_{s}_{p}"] = float(ct[i, k])
+    return out
+
+
+def trajetorias_morris(d: int, r: int, niveis: int = 4, seed: Optional[int] = 0):
+    """
+    ``r`` trajetórias (r, d + 1, d) no cubo unitário com passo
+    ``delta = niveis / (2 (niveis - 1))``; devolve também a ordem dos fatores
+    e o sinal de cada passo (r, d).
+    """
+    rng = np.random.default_rng(seed)
+    delta = niveis / (2.0 * (niveis - 1))
+    grade = np.arange(niveis) / (niveis - 1)
+    base = rng.choice(grade[grade <= 1.0 - delta + 1e-12], size=(r, d))
+    sinal = rng.choice([-1.0, 1.0], size=(r, d))
+    base = np.where(sinal < 0, base + delta, base)  # descer a partir de base + delta
+    ordem = np.argsort(rng.random((r, d)), axis=1)
+    passos = np.zeros((r, d + 1, d))
+    passos[np.arange(r)[:, None], np.arange(1, d + 1)[None], ordem] = sinal[
+        np.arange(r)[:, None], ordem
+    ] * delta
+    return base[:, None, :] + np.cumsum(passos, axis=1), ordem, sinal, delta
+
+
+def morris(
+    limites: Mapping[str, Tuple[float, float]],
+    r: int = 20,
+    niveis: int = 4,
+    montar: Callable = mercado_referencia,
+    seeds: Sequence[int] = (0,),
+    ciclos: int = 252,
+    saidas: Sequence[str] = SAIDAS_PADRAO,
+    processos: Optional[int] = None,
+    seed: Optional[int] = 0,
+    avaliador: Optional[Callable[[np.ndarray], np.ndarray]] = None,
+) -> Dict[str, float]:
+    """Efeitos elementares de Morris (``r * (d + 1)`` execuções): mu, mu* e sigma."""
+    nomes = list(limites)
+    d = len(nomes)
+    T, ordem, sinal, delta = trajetorias_morris(d, r, niveis, seed)
+    X = _escalar(T.reshape(-1, d), limites)
+    if avaliador is not None:
+        f = np.asarray(avaliador(X), dtype=float)
+    else:
+        f = avaliar_pontos(X, nomes, montar, seeds, ciclos, saidas, processos)
+    f = f.reshape(r, d + 1, -1)
+    ee_passo = np.diff(f, axis=1) / (sinal[np.arange(r)[:, None], ordem] * delta)[..., None]
+    ee = np.empty_like(ee_passo)  # (r, fator, saída)
+    ee[np.arange(r)[:, None], ordem] = ee_passo
+    mu, mu_est = ee.mean(axis=0), np.abs(ee).mean(axis=0)
+    sigma = ee.std(axis=0, ddof=1) if r > 1 else np.full_like(mu, np.nan)
+    out: Dict[str, float] = {"n_avaliacoes": float(r * (d + 1)), "r": float(r)}
+    for k, s in enumerate(saidas):
+        for i, p in enumerate(nomes):
+            out[f"mu_{s}_{p}"] = float(mu[i, k])
+            out[f"mu_estrela_{s}_{p}"] = float(mu_est[i, k])
+            out[f"sigma_{s}_{p}"] = float(sigma[i, k])
+    return out
+
+
+def tabela_sensibilidade(res: Mapping[str, float], nomes: Sequence[str]) -> pd.DataFrame:
+    """Pivota o dict de ``sobol``/``morris``: linhas (saída, parâmetro), colunas índices."""
+    linhas: Dict[Tuple[str, str], Dict[str, float]] = {}
+    indices = ("S1_conf", "ST_conf", "S1", "ST", "mu_estrela", "mu", "sigma")
+    for chave, v in res.items():
+        for ind in indices:
+            if not chave.startswith(ind + "_"):
+                continue
+            resto = chave[len(ind) + 1 :]
+            p = next((n for n in nomes if resto.endswith("_" + n)), None)
+            if p is not None:
+                linhas.setdefault((resto[: -len(p) - 1], p), {})[ind] = v
+            break
+    df = pd.DataFrame.from_dict(linhas, orient="index")
+    df.index = pd.MultiIndex.from_tuples(df.index, names=["saida", "parametro"])
+    return df
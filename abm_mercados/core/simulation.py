@@ -1,19 +1,189 @@
 from __future__ import annotations
-from typing import Optional
+import asyncio
+import inspect
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, List, Optional, Sequence, Tuple
 
 from abm_mercados.core.world import MundoBase
 
 
-class Simulacao:
+MODOS = ("serial", "async", "threads")
+
+
+class _VisaoMundo:
+    """
+    Visão do mundo entregue aos investidores de um lote no modo "threads".
+    Leituras vão direto ao mundo (congelado durante a fase de decisão) e
+    ``registrar_ordem`` grava num buffer local, sem lock compartilhado.
+    """
+
+    __slots__ = ("_mundo", "ordens")
+
     def __init__(self, mundo: "MundoBase") -> None:
+        object.__setattr__(self, "_mundo", mundo)
+        object.__setattr__(self, "ordens", [])
+
+    def __getattr__(self, nome: str) -> Any:
+        return getattr(self._mundo, nome)
+
+    def __setattr__(self, nome: str, valor: Any) -> None:
+        raise AttributeError("o mundo é somente leitura durante agir (modo threads)")
+
+    def registrar_ordem(self, investidor_id: int, qtd: float) -> None:
+        # reaproveita a regra do mundo (inclusive sobrescritas), com self = visão
+        type(self._mundo).registrar_ordem(self, investidor_id, qtd)
+
+
+class Simulacao:
+    """
+    Orquestra os ciclos: _step_start -> agir (investidores) -> atualizar_ambiente -> _step_end.
+
+    Modos de execução:
+      - "serial": cada investidor age em sequência (padrão).
+      - "async": investidores com ``async def agir_async(ambiente)`` são aguardados
+        concorrentemente (no máximo ``max_concorrencia`` ao mesmo tempo, com
+        ``timeout_ciclo`` segundos por ciclo); os demais usam ``agir`` como sempre.
+        As ordens do ciclo são ordenadas por id do investidor antes do
+        ``atualizar_ambiente``, então o resultado não depende de quem terminou antes.
+      - "threads": investidores são divididos em lotes contíguos e cada lote roda
+        ``agir`` numa thread (útil quando a decisão é NumPy/torch e libera a GIL).
+        Cada lote grava num buffer próprio e os buffers são concatenados na ordem
+        dos investidores, reproduzindo o modo serial. Investidores que sorteiam do
+        ``random`` global compartilhado perdem o determinismo nesse modo; prefira
+        um gerador próprio por investidor.
+
+    Se o mundo tem ``subpassos > 1`` (relógio intradiário), cada ciclo roda
+    ``subpassos`` rodadas: todos agem na primeira e só os intradiários
+    (``age_intradiario()``) nas seguintes, com ``mundo.subpasso()`` formando o
+    preço entre elas e ``atualizar_ambiente`` fechando o ciclo.
+    """
+
+    def __init__(
+        self,
+        mundo: "MundoBase",
+        modo: str = "serial",
+        max_concorrencia: int = 64,
+        timeout_ciclo: Optional[float] = None,
+        n_threads: Optional[int] = None,
+        tamanho_lote: Optional[int] = None,
+    ) -> None:
+        if modo not in MODOS:
+            raise ValueError(f"modo desconhecido: {modo!r} (use um de {MODOS})")
         self.mundo = mundo
+        self.modo = modo
+        self.max_concorrencia = int(max_concorrencia)
+        self.timeout_ciclo = timeout_ciclo
+        self.n_threads = int(n_threads or os.cpu_count() or 1)
+        self.tamanho_lote = tamanho_lote
+        # (ciclo, ids) dos investidores assíncronos cancelados por timeout
+        self.estouros: List[Tuple[int, List[int]]] = []
+        self._rapidos: Optional[Tuple[int, List[Any]]] = None
 
     def executar(self, n_ciclos: Optional[int] = None) -> None:
         if n_ciclos is None:
             n_ciclos = 1
+        if self.modo == "async":
+            asyncio.run(self.executar_async(n_ciclos))
+            return
+        if self.modo == "threads":
+            with ThreadPoolExecutor(max_workers=self.n_threads) as pool:
+                for _ in range(n_ciclos):
+                    self._ciclo(lambda invs: self._agir_threads(pool, invs))
+            return
         for _ in range(n_ciclos):
-            self.mundo._step_start()
-            for inv in self.mundo.investidores:
-                inv.agir(self.mundo)
-            self.mundo.atualizar_ambiente()
-            self.mundo._step_end()
+            self._ciclo(self._agir_serial)
+
+    def _ciclo(self, agir: Callable[[Sequence[Any]], None]) -> None:
+        mundo = self.mundo
+        mundo._step_start()
+        k = int(getattr(mundo, "subpassos", 1))
+        if k <= 1:
+            agir(mundo.investidores)
+        else:
+            agir(mundo.investidores)  # todos no primeiro subpasso
+            rapidos = self._intradiarios()
+            for _ in range(k - 1):
+                mundo.subpasso()
+                agir(rapidos)
+        mundo.atualizar_ambiente()
+        mundo._step_end()
+
+    def _intradiarios(self) -> List[Any]:
+        """Investidores que agem em todo subpasso (recalculado se a população muda)."""
+        invs = self.mundo.investidores
+        if self._rapidos is None or self._rapidos[0] != len(invs):
+            rapidos = [
+                inv
+                for inv in invs
+                if getattr(inv, "age_intradiario", None) is not None and inv.age_intradiario()
+            ]
+            self._rapidos = (len(invs), rapidos)
+        return self._rapidos[1]
+
+    def _agir_serial(self, invs: Sequence[Any]) -> None:
+        mundo = self.mundo
+        for inv in invs:
+            inv.agir(mundo)
+
+    async def executar_async(self, n_ciclos: Optional[int] = None) -> None:
+        """Versão corrotina de ``executar`` (útil quando já existe um event loop)."""
+        if n_ciclos is None:
+            n_ciclos = 1
+        sem = asyncio.Semaphore(self.max_concorrencia)
+        mundo = self.mundo
+        for _ in range(n_ciclos):
+            mundo._step_start()
+            await self._agir_async(sem, mundo.investidores)
+            for _ in range(int(getattr(mundo, "subpassos", 1)) - 1):
+                mundo.subpasso()
+                await self._agir_async(sem, self._intradiarios())
+            mundo.atualizar_ambiente()
+            mundo._step_end()
+
+    async def _agir_async(self, sem: asyncio.Semaphore, invs: Sequence[Any]) -> None:
+        mundo = self.mundo
+
+        async def _limitado(inv):
+            async with sem:
+                await inv.agir_async(mundo)
+
+        tarefas = {}
+        for inv in invs:
+            if inspect.iscoroutinefunction(getattr(inv, "agir_async", None)):
+                tarefas[asyncio.ensure_future(_limitado(inv))] = inv
+            else:
+                inv.agir(mundo)
+
+        if tarefas:
+            feitas, pendentes = await asyncio.wait(
+                tarefas, timeout=self.timeout_ciclo
+            )
+            for t in pendentes:
+                t.cancel()
+            if pendentes:
+                await asyncio.gather(*pendentes, return_exceptions=True)
+                self.estouros.append(
+                    (mundo.ciclo, sorted(tarefas[t].id for t in pendentes))
+                )
+            for t in feitas:
+                t.result()  # propaga exceções dos investidores
+
+        # ordenação estável: preserva a sequência de cada investidor
+        mundo.ordens.sort(key=lambda o: o["investidor_id"])
+
+    def _lotes(self, invs: Sequence[Any]) -> List[Sequence[Any]]:
+        tam = self.tamanho_lote or -(-len(invs) // (4 * self.n_threads))
+        tam = max(1, int(tam))
+        return [invs[i : i + tam] for i in range(0, len(invs), tam)]
+
+    def _agir_lote(self, lote: Sequence[Any]) -> List[dict]:
+        visao = _VisaoMundo(self.mundo)
+        for inv in lote:
+            inv.agir(visao)
+        return visao.ordens
+
+    def _agir_threads(self, pool: ThreadPoolExecutor, invs: Sequence[Any]) -> None:
+        # map devolve na ordem de submissão => mesma ordem do modo serial
+        for ordens in pool.map(self._agir_lote, self._lotes(invs)):
+            self.mundo.ordens.extend(ordens)
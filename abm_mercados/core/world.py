@@ -29,8 +29,14 @@ class MundoBase:
         self._on_step_end.append(cb)
 
     def adicionar_investidor(self, inv: Any) -> None:
+        inv.indice = len(self.investidores)
         self.investidores.append(inv)
 
+    def adicionar_investidores(self, invs: List[Any]) -> None:
+        """Em lote (ex.: coortes de ``gerar_populacao``); subclasses podem otimizar."""
+        for inv in invs:
+            self.adicionar_investidor(inv)
+
     def registrar_ordem(self, investidor_id: int, qtd: float) -> None:
         if not qtd:
             return
@@ -39,6 +45,15 @@ class MundoBase:
     def atualizar_ambiente(self) -> None:
         raise NotImplementedError
 
+    # informação privada entregue aos investidores (padrão: nenhuma)
+    def valor_observado(self, inv: Any) -> Optional[float]:
+        """Valor fundamental como ``inv`` o observa no ciclo; None = sem processo."""
+        return None
+
+    def sentimento(self, inv: Any) -> float:
+        """Sentimento social que chega a ``inv`` (em [-1, 1]); 0 = sem rede."""
+        return 0.0
+
     # ganchos do loop
     def _step_start(self):  # interno
         for cb in self._on_step_start:
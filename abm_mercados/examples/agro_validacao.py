@@ -1,6 +1,7 @@
 # -*- coding: utf-8 -*-
 from abm import AgenteBase, MundoBase, Simulacao
 import random, math
+from abm_mercados.mercados.precos import Sazonal
 
 try:
     from .validation_utils import save_all_outputs, ensure_dir
@@ -23,22 +24,21 @@ class MundoAgro(MundoBase):
         self.h_preco = []
         self.h_demanda = []
         self.ciclo = 0
+        # componente senoidal simples (colheitas/entressafra) + impacto linear
+        self.regra = Sazonal(amplitude=self.saz_amp, periodo=252)
 
     def enviar_ordem(self, agente_id: int, qtd: float):
         if not isinstance(qtd, (int, float)) or qtd == 0.0:
             return
         self._ordens.append((agente_id, float(qtd)))
 
-    def _sazonal(self):
-        # componente senoidal simples (colheitas/entressafra)
-        return self.saz_amp * math.sin(2 * math.pi * (self.ciclo % 252) / 252.0)
-
     def step(self):
         desequilibrio = sum(q for _, q in self._ordens) if self._ordens else 0.0
-        impacto = self.k * (desequilibrio / max(1.0, self.depth))
-        saz = self._sazonal()
+        r = self.regra.impacto(
+            desequilibrio, self.preco, max(1.0, self.depth), self.k, self.ciclo
+        )
         ruido = random.gauss(0, 0.003)
-        self.preco *= math.exp(impacto + saz + ruido)
+        self.preco *= math.exp(r + ruido)
         self.h_preco.append(self.preco)
         self.h_demanda.append(desequilibrio)
         self._ordens.clear()
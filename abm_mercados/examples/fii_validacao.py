@@ -1,6 +1,7 @@
 # -*- coding: utf-8 -*-
 from abm_mercados import AgenteBase, MundoBase, Simulacao
 import random, math
+from abm_mercados.mercados.precos import ImpactoLinear
 
 # utilitários (compatível: python -m examples.fii_validacao)
 try:
@@ -43,6 +44,7 @@ class MundoFII(MundoBase):
         self.h_dividendo = []
 
         self.ciclo = 0
+        self.regra = ImpactoLinear()
 
     def registrar_ordem(self, agent_id: int, qtd: float) -> None:
         """Chamado pelos agentes em .agir(ambiente). Apenas acumula ordens."""
@@ -64,7 +66,9 @@ class MundoFII(MundoBase):
         desequilibrio = sum(o["qtd"] for o in self.ordens) if self.ordens else 0.0
         # 2) impacto (linear) + ruído pequeno
         ruido = random.gauss(0.0, 0.002)
-        impacto = self.k * (desequilibrio / max(1.0, self.depth))
+        impacto = self.regra.impacto(
+            desequilibrio, self.preco, max(1.0, self.depth), self.k, self.ciclo
+        )
         self.preco *= math.exp(impacto + ruido)
 
         # 3) paga dividendo proporcional ao preço atual
@@ -1,6 +1,7 @@
 # -*- coding: utf-8 -*-
 from abm_mercados import AgenteBase, MundoBase, Simulacao
 import random, math
+from abm_mercados.mercados.precos import ReversaoDrift
 
 try:
     from .validation_utils import save_all_outputs, ensure_dir
@@ -23,7 +24,8 @@ class MundoGeral(MundoBase):
         self.h_preco = []
         self.h_flow = []
         self.ciclo = 0
-        self._media = self.preco
+        # média móvel simples (alpha=0.02) + drift + impacto: kernel embutido
+        self.regra = ReversaoDrift(drift=self.drift, kappa=self.k_mr, alpha=0.02)
 
     def enviar_ordem(self, agente_id: int, qtd: float):
         if not isinstance(qtd, (int, float)) or qtd == 0.0:
@@ -31,17 +33,14 @@ class MundoGeral(MundoBase):
         self._ordens.append((agente_id, float(qtd)))
 
     def step(self):
-        # média móvel simples
-        alpha = 0.02
-        self._media = (1 - alpha) * self._media + alpha * self.preco
-
         desequilibrio = sum(q for _, q in self._ordens) if self._ordens else 0.0
-        impacto = desequilibrio / max(1.0, self.depth)
-        mr = self.k_mr * (self._media - self.preco) / max(1e-9, self._media)
         ruido = random.gauss(0, 0.003)
 
         # log-preço: drift + mean-reversion + impacto + ruído
-        self.preco *= math.exp(self.drift + mr + 0.02 * impacto + ruido)
+        r = self.regra.impacto(
+            desequilibrio, self.preco, max(1.0, self.depth), 0.02, self.ciclo
+        )
+        self.preco *= math.exp(r + ruido)
 
         self.h_preco.append(self.preco)
         self.h_flow.append(desequilibrio)
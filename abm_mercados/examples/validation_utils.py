@@ -5,7 +5,7 @@ Funciona com séries de preço (list/np.array/pd.Series) e demanda_liquida (opci
 """
 
 # -*- coding: utf-8 -*-
-import os, json, csv
+import os, json
 from datetime import datetime
 
 
@@ -19,11 +19,19 @@ def _timestamp() -> str:
 
 
 def save_series_csv(filepath: str, series, header="valor"):
-    with open(filepath, "w", newline="", encoding="utf-8") as f:
-        w = csv.writer(f)
-        w.writerow(["idx", header])
-        for i, v in enumerate(series):
-            w.writerow([i, v])
+    import numpy as np
+
+    # uma escrita só (sem csv.writer linha a linha)
+    v = np.asarray(series, dtype=float)
+    np.savetxt(
+        filepath,
+        np.column_stack([np.arange(v.size), v]),
+        fmt=["%d", "%.17g"],
+        delimiter=",",
+        header=f"idx,{header}",
+        comments="",
+        encoding="utf-8",
+    )
 
 
 def save_json(filepath: str, data: dict):
@@ -33,16 +41,10 @@ def save_json(filepath: str, data: dict):
 
 def plot_series(filepath: str, series, title="", ylabel=""):
     try:
-        import matplotlib.pyplot as plt
-
-        fig = plt.figure()
-        plt.plot(series)
-        plt.title(title)
-        plt.xlabel("ciclo")
-        plt.ylabel(ylabel)
-        plt.tight_layout()
-        fig.savefig(filepath, dpi=150)
-        plt.close(fig)
+        from abm_mercados.utils.plotting import salvar_serie
+
+        # Agg direto (sem pyplot) e série decimada: barato mesmo com milhões de pontos
+        salvar_serie(filepath, series, titulo=title, ylabel=ylabel, dpi=150)
     except Exception as e:
         # Sem matplotlib? Apenas ignore o gráfico.
         pass
@@ -1,6 +1,7 @@
 # Só use se instalar torch; caso contrário, ignore este arquivo.
 from __future__ import annotations
-from dataclasses import dataclass
+from dataclasses import dataclass, field
+from typing import Any, Optional
 import math
 import numpy as np
 
@@ -9,10 +10,10 @@ try:
     import torch.nn as nn
 except Exception:
     torch = None
-from ..core.investidor import AgenteBase
+from ..core.investidor import InvestidorBase
 
 
-class _MLP(nn.Module):
+class _MLP(nn.Module if torch is not None else object):
     def __init__(self, dim_in, dim_out):
         super().__init__()
         self.net = nn.Sequential(
@@ -27,16 +28,27 @@ class _MLP(nn.Module):
         return self.net(x)
 
 
-@dataclass
-class AgenteDRL(AgenteBase):
+@dataclass(slots=True)
+class AgenteDRL(InvestidorBase):
     caixa: float = 2_000.0
     pos: float = 0.0
     tamanho_max: float = 5.0
+    # passe o mesmo modelo a vários agentes para não alocar uma rede por agente
+    model: Optional[Any] = field(default=None, repr=False, compare=False)
 
     def __post_init__(self):
         if torch is None:
             raise RuntimeError("Instale torch para usar AgenteDRL (pip install torch).")
-        self.model = _MLP(4, 1).eval()  # estado mínimo: [p_t, ret_1, ret_5, pos_norm]
+        if self.model is None:
+            self.model = _MLP(4, 1).eval()  # estado mínimo: [p_t, ret_1, ret_5, pos_norm]
+
+    @classmethod
+    def coorte(cls, ids, **params) -> list["AgenteDRL"]:
+        """Cria vários agentes compartilhando uma única rede (somente inferência)."""
+        if torch is None:
+            raise RuntimeError("Instale torch para usar AgenteDRL (pip install torch).")
+        modelo = params.pop("model", None) or _MLP(4, 1).eval()
+        return [cls(i, model=modelo, **params) for i in ids]
 
     def _estado(self, ambiente) -> np.ndarray:
         p = ambiente.preco
@@ -54,12 +66,7 @@ class AgenteDRL(AgenteBase):
         qtd = a * self.tamanho_max
 
         if qtd > 0:
-            custo = qtd * ambiente.preco
-            if custo <= self.caixa:
-                self.caixa -= custo
-                self.pos += qtd
-                ambiente.registrar_ordem(self.id, +qtd)
+            if qtd * ambiente.preco <= self.caixa:
+                self._enviar(ambiente, qtd)
         elif qtd < 0 and abs(qtd) <= self.pos:
-            self.caixa += abs(qtd) * ambiente.preco
-            self.pos -= abs(qtd)
-            ambiente.registrar_ordem(self.id, qtd)
+            self._enviar(ambiente, qtd)
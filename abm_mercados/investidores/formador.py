@@ -0,0 +1,89 @@
+"""
+Formador de mercado com cotações de Avellaneda–Stoikov.
+
+Em log-preço, com estoque ``q``, volatilidade por passo ``sigma`` e horizonte
+``tau`` (em passos):
+
+  - preço de reserva: ``r = s - q * gama * sigma**2 * tau``
+  - meio spread:      ``delta = gama * sigma**2 * tau / 2 + ln(1 + gama / kappa) / gama``
+
+A liquidez que cada lado oferece segue a intensidade de execução do modelo,
+``tamanho * exp(-kappa * distância ao meio)``, limitada pelo estoque máximo.
+O mercado soma essa liquidez à profundidade base (profundidade efetiva) e
+executa contra os formadores a parte proporcional do desequilíbrio, ao preço
+das cotações. Tudo é feito em bloco pela ``CoorteFormadores``: o ``agir`` do
+investidor não faz nada.
+"""
+from __future__ import annotations
+from dataclasses import dataclass
+from typing import Any, ClassVar, List, Sequence, Tuple
+
+import numpy as np
+
+from ..core.investidor import InvestidorBase
+
+
+@dataclass(slots=True)
+class InvestidorFormador(InvestidorBase):
+    # cota em todo subpasso pelo mercado; o agir (vazio) não precisa rodar neles
+    INTRADIARIO: ClassVar[bool] = False
+
+    caixa: float = 10_000.0
+    pos: float = 0.0
+    gama: float = 0.1  # aversão a risco (inclina as cotações pelo estoque)
+    kappa: float = 150.0  # decaimento da execução com a distância (1/log-preço)
+    tamanho: float = 20.0  # lote cotado em cada lado
+    horizonte: float = 50.0  # passos até "zerar" o estoque
+    pos_max: float = 200.0  # |estoque| máximo
+
+    def agir(self, ambiente) -> None:
+        """Cotações calculadas em bloco pelo mercado (``CoorteFormadores``)."""
+
+
+class CoorteFormadores:
+    """Parâmetros de todos os formadores do mundo em arrays (cotação vetorizada)."""
+
+    def __init__(self, invs: Sequence[Any], indices: Sequence[int]) -> None:
+        self.idx = np.asarray(indices, dtype=np.int64)
+        self.gama = np.array([i.gama for i in invs], dtype=float)
+        self.kappa = np.array([i.kappa for i in invs], dtype=float)
+        self.tamanho = np.array([i.tamanho for i in invs], dtype=float)
+        self.horizonte = np.array([i.horizonte for i in invs], dtype=float)
+        self.pos_max = np.array([i.pos_max for i in invs], dtype=float)
+        if (self.gama <= 0.0).any() or (self.kappa <= 0.0).any():
+            raise ValueError("gama e kappa dos formadores devem ser > 0")
+
+    @classmethod
+    def do_mundo(cls, investidores: List[Any]) -> "CoorteFormadores | None":
+        idx = [i for i, inv in enumerate(investidores) if isinstance(inv, InvestidorFormador)]
+        if not idx:
+            return None
+        return cls([investidores[i] for i in idx], idx)
+
+    def __len__(self) -> int:
+        return self.idx.size
+
+    def cotar(self, q: np.ndarray, sigma: float) -> Tuple[np.ndarray, np.ndarray]:
+        """Distâncias (log) do bid abaixo e do ask acima do meio, por formador."""
+        s2t = sigma * sigma * self.horizonte
+        reserva = -q * self.gama * s2t
+        meio = 0.5 * self.gama * s2t + np.log1p(self.gama / self.kappa) / self.gama
+        return np.maximum(meio - reserva, 0.0), np.maximum(meio + reserva, 0.0)
+
+    def absorver(
+        self, desequilibrio: float, preco: float, sigma: float, depth: float, pos: np.ndarray
+    ) -> Tuple[float, np.ndarray, np.ndarray]:
+        """
+        Profundidade efetiva para o lado do desequilíbrio, execuções dos
+        formadores (qtd com sinal, contrária ao fluxo) e o preço de cada uma.
+        """
+        q = pos[self.idx]
+        d_bid, d_ask = self.cotar(q, sigma)
+        if desequilibrio >= 0.0:  # compradores agridem o ask: formadores vendem
+            lado, d, cap = -1.0, d_ask, q + self.pos_max
+        else:
+            lado, d, cap = 1.0, d_bid, self.pos_max - q
+        prof = np.minimum(self.tamanho * np.exp(-self.kappa * d), np.maximum(cap, 0.0))
+        efetiva = max(1.0, depth + float(prof.sum()))
+        frac = min(1.0, abs(desequilibrio) / efetiva)
+        return efetiva, lado * frac * prof, preco * np.exp(-lado * d)
@@ -1,9 +1,9 @@
 from __future__ import annotations
 from dataclasses import dataclass
-from ..core.investidor import InvestidorBase
+from ..core.investidor import InvestidorBase, receber_dividendo_padrao
 
 
-@dataclass
+@dataclass(slots=True)
 class InvestidorFundamentalista(InvestidorBase):
     caixa: float = 2_000.0
     pos: float = 0.0
@@ -11,25 +11,28 @@ class InvestidorFundamentalista(InvestidorBase):
     toler: float = 0.03
     prop: float = 0.15
 
-    def receber_dividendo(self, d_por_cota: float) -> None:
-        if self.pos > 0:
-            self.caixa += d_por_cota * self.pos
+    receber_dividendo = receber_dividendo_padrao
 
     def agir(self, ambiente) -> None:
-        v, p = self.valor_intrinseco, ambiente.preco
+        # com processo fundamental no mundo, ancora no valor observado (com ruído
+        # privado); sem ele, no valor intrínseco fixo
+        v = ambiente.valor_observado(self)
+        if v is None:
+            v = self.valor_intrinseco
+        p = ambiente.preco
         diff = (v - p) / max(1e-9, v)
 
         if diff > self.toler and self.caixa > 0:
             qtd = max(1.0, self.prop * self.caixa / p)
-            custo = qtd * p
-            if custo <= self.caixa:
-                self.caixa -= custo
-                self.pos += qtd
-                ambiente.registrar_ordem(self.id, +qtd)
+            if self._cabe(ambiente, qtd):
+                self._enviar(ambiente, +qtd)
 
         elif diff < -self.toler and self.pos > 0:
             qtd = max(1.0, self.prop * self.pos)
             qtd = min(qtd, self.pos)
-            self.caixa += qtd * p
-            self.pos -= qtd
-            ambiente.registrar_ordem(self.id, -qtd)
+            self._enviar(ambiente, -qtd)
+
+        elif diff < -self.toler and getattr(ambiente, "risco", None) is not None:
+            # sem posição comprada: vende a descoberto (limites do motor de risco)
+            qtd = max(1.0, self.prop * (self.caixa + self.pos * p) / p)
+            self._enviar(ambiente, -qtd)
@@ -0,0 +1,122 @@
+"""
+Populações heterogêneas de investidores geradas a partir de distribuições.
+
+Uma coorte é descrita por ``count`` e por ``params`` em que cada valor é uma
+constante ou uma distribuição, ex.:
+
+    valor_intrinseco: {dist: normal, media: 115, dp: 10, min: 50}
+    toler: {dist: uniforme, min: 0.01, max: 0.05}
+    janela: {dist: inteiro, min: 5, max: 30}
+    prob_compra: {dist: escolha, valores: [0.45, 0.55], probs: [0.3, 0.7]}
+
+Cada parâmetro é sorteado de uma vez para a coorte inteira (uma chamada ao
+gerador do NumPy por coluna) e os investidores são construídos direto das
+colunas, por posição, sem dicionário de kwargs por instância. Para adicionar a
+coorte ao mundo de uma vez, use ``MundoBase.adicionar_investidores``.
+"""
+from __future__ import annotations
+import dataclasses
+import gc
+from itertools import repeat
+from typing import Any, Dict, List, Optional, Union
+
+import numpy as np
+
+DISTRIBUICOES = ("normal", "lognormal", "uniforme", "inteiro", "escolha")
+
+
+def amostrar(spec: Any, n: int, rng: np.random.Generator) -> Union[np.ndarray, Any]:
+    """
+    ``n`` sorteios de ``spec``; constantes voltam como estão (não viram array).
+    ``min``/``max`` cortam as caudas de normal/lognormal.
+    """
+    if not isinstance(spec, dict):
+        return spec
+    dist = spec.get("dist")
+    if dist == "normal":
+        x = rng.normal(spec.get("media", 0.0), spec.get("dp", 1.0), n)
+    elif dist == "lognormal":
+        x = rng.lognormal(spec.get("media", 0.0), spec.get("sigma", 1.0), n)
+    elif dist == "uniforme":
+        return rng.uniform(spec.get("min", 0.0), spec.get("max", 1.0), n)
+    elif dist == "inteiro":  # inclusivo nos dois extremos
+        return rng.integers(spec["min"], spec["max"], n, endpoint=True)
+    elif dist == "escolha":
+        return rng.choice(np.asarray(spec["valores"]), n, p=spec.get("probs"))
+    else:
+        raise ValueError(
+            f"distribuição desconhecida: {dist!r} (use uma de {DISTRIBUICOES})"
+        )
+    if "min" in spec or "max" in spec:
+        x = np.clip(x, spec.get("min"), spec.get("max"))
+    return x
+
+
+def gerar_colunas(
+    params: Dict[str, Any], n: int, rng: np.random.Generator
+) -> Dict[str, Union[np.ndarray, Any]]:
+    """Sorteia todos os parâmetros da coorte (nome -> array de tamanho ``n`` ou constante)."""
+    return {nome: amostrar(spec, n, rng) for nome, spec in params.items()}
+
+
+def gerar_populacao(
+    cls: type,
+    count: int,
+    params: Optional[Dict[str, Any]] = None,
+    id_inicial: int = 0,
+    seed: Any = None,
+) -> List[Any]:
+    """
+    Cria ``count`` instâncias de ``cls`` (dataclass) com ids consecutivos a
+    partir de ``id_inicial`` e parâmetros sorteados de ``params``.
+    """
+    count = int(count)
+    params = dict(params or {})
+    if "id" in params:
+        raise ValueError("numa coorte o id é atribuído (use id_inicial)")
+    if not dataclasses.is_dataclass(cls):
+        raise ValueError(f"{cls.__name__} não é dataclass; gere com um laço comum")
+    campos = [f for f in dataclasses.fields(cls) if f.init]
+    nomes = {f.name for f in campos}
+    sobra = set(params) - nomes
+    if sobra:
+        raise ValueError(f"parâmetros desconhecidos para {cls.__name__}: {sorted(sobra)}")
+
+    rng = np.random.default_rng(seed)
+    colunas = gerar_colunas(params, count, rng)
+    colunas["id"] = range(id_inicial, id_inicial + count)
+
+    # campos com default_factory ou só-nomeados (kw_only) não sorteados ficam
+    # de fora e usam o padrão
+    usados = [
+        f
+        for f in campos
+        if f.name in colunas
+        or (f.default_factory is dataclasses.MISSING and not f.kw_only)
+    ]
+    iteraveis = []
+    for f in usados:
+        if f.name in colunas:
+            v = colunas[f.name]
+            if isinstance(v, np.ndarray):
+                iteraveis.append(v.tolist())
+            elif isinstance(v, range):
+                iteraveis.append(v)
+            else:
+                iteraveis.append(repeat(v))
+        elif f.default is not dataclasses.MISSING:
+            iteraveis.append(repeat(f.default))
+        else:
+            raise ValueError(f"{cls.__name__}.{f.name} é obrigatório")
+    # milhões de objetos novos disparam o coletor cíclico várias vezes sem
+    # nada a coletar: pausado durante a construção em lote
+    gc_ativo = gc.isenabled()
+    gc.disable()
+    try:
+        if usados == [f for f in campos if not f.kw_only]:  # caminho rápido: posicional
+            return list(map(cls, *iteraveis))
+        nomes_usados = [f.name for f in usados]
+        return [cls(**dict(zip(nomes_usados, vals))) for vals in zip(*iteraveis)]
+    finally:
+        if gc_ativo:
+            gc.enable()
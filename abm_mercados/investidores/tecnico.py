@@ -4,19 +4,23 @@ import numpy as np
 from ..core.investidor import InvestidorBase
 
 
-@dataclass
+@dataclass(slots=True)
 class InvestidorTendencia(InvestidorBase):
     caixa: float = 1_500.0
     pos: float = 0.0
     janela: int = 15
     alav: float = 0.2
+    sensib_rede: float = 0.0  # peso do sentimento dos vizinhos no sinal
 
     def agir(self, ambiente) -> None:
         h = ambiente.h_preco
         if len(h) <= self.janela:
             return
         r = np.diff(np.log(np.asarray(h[-self.janela - 1 :])))
-        sinal = np.sign(np.sum(r))
+        forca = np.sum(r)
+        if self.sensib_rede:
+            forca += self.sensib_rede * ambiente.sentimento(self)
+        sinal = np.sign(forca)
         qtd = (
             max(
                 1.0,
@@ -25,13 +29,5 @@ class InvestidorTendencia(InvestidorBase):
             * sinal
         )
 
-        if qtd > 0:
-            custo = qtd * ambiente.preco
-            if custo <= self.caixa:
-                self.caixa -= custo
-                self.pos += qtd
-                ambiente.registrar_ordem(self.id, +qtd)
-        elif qtd < 0 and abs(qtd) <= self.pos:
-            self.caixa += abs(qtd) * ambiente.preco
-            self.pos -= abs(qtd)
-            ambiente.registrar_ordem(self.id, qtd)
+        if qtd != 0 and self._cabe(ambiente, qtd):
+            self._enviar(ambiente, qtd)
@@ -1,12 +1,67 @@
 from __future__ import annotations
 import math, random
-from typing import Optional, List
+from operator import attrgetter
+from typing import Any, Dict, Optional, List, Tuple
+import numpy as np
 from ..core.world import MundoBase
+from ..core.custos import ModeloCusto, criar_custos, nomes_custos
+from ..core.ledger import LivroRazao
+from ..core.metrics import VolatilidadeEWMA
+from ..core.risco import MotorRisco, criar_risco
 from ..core.orderbook import OrderBookIngenuo
+from ..investidores.formador import CoorteFormadores
+from ..utils.diario import DiarioOrdens
+from .fundamental import ProcessoFundamental
+from .precos import RegraPreco, criar_regra
+from .rede import RedeSocial
 
 
 class MercadoSimples(MundoBase):
-    """Mercado de um ativo com ajuste por desequilíbrio + ruído + (opcional) dividendo."""
+    """
+    Mercado de um ativo com ajuste por desequilíbrio + ruído + (opcional) dividendo.
+
+    ``regra_preco`` (``RegraPreco``, nome ou dict ``{tipo, ...}``; ver
+    ``mercados.precos``) troca o impacto linear ``k * D / depth`` por outro
+    kernel (raiz, reversão + drift, sazonal, walrasiano).
+
+    ``fundamental`` (``ProcessoFundamental`` ou dict com seus parâmetros) liga um
+    valor fundamental estocástico; cada investidor o observa via
+    ``valor_observado`` com ruído privado lognormal de dp ``ruido_obs``,
+    sorteado de uma vez para todos no início do ciclo.
+
+    ``rede`` (``RedeSocial`` ou dict ``{tipo, memoria, ...}``, construída sobre
+    os investidores no primeiro ciclo) difunde o sinal das ordens de cada ciclo
+    entre vizinhos; investidores o leem via ``sentimento``.
+
+    ``livro=True`` liga o livro-razão: as ordens do ciclo são liquidadas em lote
+    ao preço formado no ciclo (não ao anterior), dividendos/PnL ficam em arrays
+    e ``checar_livro`` roda as invariantes de conservação a cada ciclo.
+    Dividendos seguem a regra sem livro: só quem tem ``receber_dividendo``
+    recebe, e um ``receber_dividendo`` sobrescrito continua sendo chamado.
+    ``custos`` (lista de ``ModeloCusto`` ou dicts ``{tipo, ...}``) são cobrados
+    nessa liquidação e implicam ``livro=True``.
+
+    ``diario`` (caminho) grava ordens, preço e ruído de cada ciclo num diário
+    binário; ``utils.diario.reproduzir`` refaz a execução a partir dele.
+
+    ``subpassos > 1`` liga o relógio intradiário: cada ciclo (dia) tem
+    ``subpassos`` formações de preço (``subpasso``), com investidores
+    intradiários agindo em todas e os demais só na primeira; dividendos e
+    históricos continuam diários e os subpassos viram barras OHLCV
+    (``barras_ohlcv``).
+
+    Formadores de mercado (``InvestidorFormador``) entre os investidores
+    cotam em bloco a cada formação de preço (Avellaneda–Stoikov, com a
+    volatilidade incremental ``vol``); sua liquidez soma-se a ``depth``
+    (profundidade efetiva) e eles executam contra o fluxo ao preço cotado.
+    Implicam o livro-razão, criado no primeiro ciclo em que aparecem.
+
+    ``risco`` (``MotorRisco``, dict com seus parâmetros ou True) troca as
+    checagens escalares de caixa/posição dos investidores por limites do mundo
+    checados em lote: venda a descoberto com aluguel, teto de alavancagem na
+    entrada, chamada de margem e liquidação forçada, cujas ordens entram no
+    fluxo do ciclo seguinte. Implica ``livro=True``.
+    """
 
     def __init__(
         self,
@@ -17,6 +72,17 @@ class MercadoSimples(MundoBase):
         seed: int = 7,
         dy_anual: float = 0.0,  # FII => >0
         choques: Optional[List[float]] = None,  # ex.: sazonais no Agro
+        fundamental: Optional[ProcessoFundamental | dict] = None,
+        ruido_obs: float = 0.0,
+        rede: Optional[RedeSocial | dict] = None,
+        livro: bool = False,
+        checar_livro: bool = True,
+        custos: Optional[List[ModeloCusto | dict]] = None,
+        diario: Optional[str] = None,
+        subpassos: int = 1,
+        lambda_vol: float = 0.94,
+        regra_preco: Optional[RegraPreco | dict | str] = None,
+        risco: Optional[MotorRisco | dict | bool] = None,
     ) -> None:
         super().__init__()
         random.seed(seed)
@@ -26,32 +92,431 @@ class MercadoSimples(MundoBase):
         self.depth = float(depth)
         self.dy_anual = float(dy_anual)
         self.choques = choques or []
+        if int(subpassos) < 1:
+            raise ValueError("subpassos deve ser >= 1")
+        self.subpassos = int(subpassos)
         self.book = OrderBookIngenuo()
+        self.regra = criar_regra(regra_preco)
+        # volatilidade por passo mantida a cada formação de preço
+        self.vol = VolatilidadeEWMA(lambda_vol, sigma0=0.002 / math.sqrt(self.subpassos))
+        self._formadores: Optional[CoorteFormadores] = None
+        self._n_pop = -1  # tamanho da população quando a coorte foi montada
+        self.rng = np.random.default_rng(seed)
+        if isinstance(fundamental, dict):
+            fundamental = ProcessoFundamental(**{"seed": [seed, 1], **fundamental})
+        self.fundamental = fundamental
+        self.ruido_obs = float(ruido_obs)
+        self.valor_fundamental: Optional[float] = None
+        self._obs: Optional[List[float]] = None
+        self.rede = rede
+        self._seed = seed
+        self._sent: Optional[List[float]] = None
+        self.diario: Optional[DiarioOrdens] = None
+        if diario:
+            self.diario = DiarioOrdens(
+                diario,
+                meta={
+                    "cls": f"{type(self).__module__}:{type(self).__qualname__}",
+                    "params": {
+                        "preco_inicial": self.preco,
+                        "ciclos_por_ano": self.ciclos_por_ano,
+                        "k_impacto": self.k,
+                        "depth": self.depth,
+                        "seed": seed,
+                        "dy_anual": self.dy_anual,
+                        "choques": list(self.choques),
+                        "subpassos": self.subpassos,
+                        "regra_preco": self.regra.spec(),
+                    },
+                },
+            )
+        self.custos = criar_custos(custos)
+        self.risco = criar_risco(risco)
+        self.livro: Optional[LivroRazao] = (
+            LivroRazao() if livro or self.custos or self.risco else None
+        )
+        self.checar_livro = bool(checar_livro)
 
         self.h_preco = [self.preco]  # loga o inicial
         self.h_deseq = []
         self.h_div = []
+        self.h_fundamental: List[float] = []
+        # uma série por modelo (na ordem de ``custos``), mesmo com classes repetidas
+        self.h_custos: Dict[str, List[float]] = {
+            nome: [] for nome in nomes_custos(self.custos)
+        }
+        self._custos_dia = [0.0] * len(self.custos)
+        # barras OHLC por ciclo e acumuladores do ciclo corrente (subpassos)
+        self.h_abertura: List[float] = []
+        self.h_maxima: List[float] = []
+        self.h_minima: List[float] = []
+        self._dia: List[Tuple[np.ndarray, np.ndarray, float]] = []
+        self._max_dia = self._min_dia = self.preco
+        self._passo = 0
+        # formadores: profundidade efetiva média e volume executado por ciclo
+        self.h_profundidade: List[float] = []
+        self.h_exec_formadores: List[float] = []
+        self._prof_dia: List[float] = []
+        self._exec_dia = 0.0
+        # motor de risco: volume cortado na entrada, custos, chamadas e liquidações
+        self.h_risco: Dict[str, List[float]] = {
+            k: [] for k in ("cortado", "risco_custo", "chamadas", "liquidado", "alavancagem")
+        }
+        self._cortado_dia = 0.0
+        # fluxo de ordens bruto por ciclo (microestrutura)
+        self.h_vol_compra: List[float] = []
+        self.h_vol_venda: List[float] = []
+        self.h_n_ordens: List[int] = []
+        self.h_vol_tipo: Dict[str, List[float]] = {}
+        self.h_n_ordens_tipo: Dict[str, List[int]] = {}
+        self._tipos: List[str] = []
+        # id -> posição em investidores; código do tipo por posição
+        self._indice_por_id: Dict[int, int] = {}
+        self._cod_tipo: List[int] = []
+        self._cod_arr = np.zeros(0, dtype=np.int64)
+
+    def _codigo_tipo(self, tipo: str) -> int:
+        if tipo not in self.h_vol_tipo:
+            self._tipos.append(tipo)
+            self.h_vol_tipo[tipo] = [0.0] * len(self.h_deseq)
+            self.h_n_ordens_tipo[tipo] = [0] * len(self.h_deseq)
+        return self._tipos.index(tipo)
+
+    def adicionar_investidor(self, inv: Any) -> None:
+        super().adicionar_investidor(inv)
+        self._indice_por_id[int(inv.id)] = len(self.investidores) - 1
+        self._cod_tipo.append(self._codigo_tipo(type(inv).__name__))
+
+    def adicionar_investidores(self, invs: List[Any]) -> None:
+        # coortes costumam ser de um tipo só: um código por classe, não por investidor
+        ini = len(self.investidores)
+        for i, inv in enumerate(invs, ini):
+            inv.indice = i
+        self.investidores.extend(invs)
+        self._indice_por_id.update(
+            zip(map(attrgetter("id"), invs), range(ini, ini + len(invs)))
+        )
+        classes = set(map(type, invs))
+        if len(classes) != 1:
+            self._cod_tipo.extend(self._codigo_tipo(type(inv).__name__) for inv in invs)
+            return
+        self._cod_tipo.extend([self._codigo_tipo(classes.pop().__name__)] * len(invs))
+
+    def _step_start(self) -> None:
+        if len(self.investidores) != self._n_pop:
+            self._preparar_formadores()
+        if self.rede is not None and self._sent is None:
+            self._preparar_rede()
+        if self.fundamental is not None:
+            self.valor_fundamental = self.fundamental.valor(self.ciclo)
+            if self.ruido_obs > 0.0:
+                z = self.rng.standard_normal(len(self.investidores))
+                self._obs = np.exp(self.ruido_obs * z).tolist()
+        super()._step_start()
+
+    def _preparar_formadores(self) -> None:
+        self._n_pop = len(self.investidores)
+        self._formadores = CoorteFormadores.do_mundo(self.investidores)
+        if self._formadores is not None and self.livro is None:
+            self.livro = LivroRazao()
+
+    def valor_observado(self, inv: Any) -> Optional[float]:
+        if self.valor_fundamental is None:
+            return None
+        if self._obs is None:
+            return self.valor_fundamental
+        return self.valor_fundamental * self._obs[inv.indice]
+
+    def _preparar_rede(self) -> None:
+        n = len(self.investidores)
+        if isinstance(self.rede, dict):
+            self.rede = RedeSocial.criar(self.rede, n, seed=[self._seed, 2])
+        if self.rede.n != n:
+            raise ValueError(f"rede tem {self.rede.n} nós para {n} investidores")
+        self._sent = self.rede.estado.tolist()
+
+    def sentimento(self, inv: Any) -> float:
+        if self._sent is None:
+            return 0.0
+        return self._sent[inv.indice]
+
+    def _ordens_em_arrays(self):
+        """(ids, índice do investidor, qtd) das ordens do ciclo; índice -1 = fora do mundo."""
+        n = len(self.ordens)
+        ids = np.fromiter((o["investidor_id"] for o in self.ordens), dtype=np.int64, count=n)
+        qtd = np.fromiter((o["qtd"] for o in self.ordens), dtype=float, count=n)
+        return ids, self._indices(ids), qtd
+
+    def _indices(self, ids: np.ndarray) -> np.ndarray:
+        ind = self._indice_por_id
+        if not ind:
+            return np.full(ids.size, -1, dtype=np.int64)
+        return np.fromiter(
+            (ind.get(i, -1) for i in ids.tolist()), dtype=np.int64, count=ids.size
+        )
+
+    def _ruido(self) -> float:
+        # variância diária preservada: dp por subpasso escala com 1/sqrt(subpassos)
+        return random.gauss(0.0, 0.002 / math.sqrt(self.subpassos))
+
+    def _difundir(self, idx: np.ndarray, qtd: np.ndarray) -> None:
+        ok = idx >= 0
+        idx, qtd = idx[ok], qtd[ok]
+        acao = np.zeros(self.rede.n)
+        np.add.at(acao, idx, np.sign(qtd))
+        self._sent = self.rede.propagar(np.clip(acao, -1.0, 1.0)).tolist()
+
+    def _registrar_fluxo(self, idx: np.ndarray, qtd: np.ndarray) -> None:
+        n = idx.size
+        if self._cod_arr.size != len(self._cod_tipo):
+            self._cod_arr = np.asarray(self._cod_tipo, dtype=np.int64)
+        cod = np.full(n, -1, dtype=np.int64)
+        ok = idx >= 0
+        cod[ok] = self._cod_arr[idx[ok]]
+        self.h_vol_compra.append(float(qtd[qtd > 0].sum()))
+        self.h_vol_venda.append(float(-qtd[qtd < 0].sum()))
+        self.h_n_ordens.append(n)
+        vol = np.bincount(
+            cod[cod >= 0], weights=np.abs(qtd[cod >= 0]), minlength=len(self._tipos)
+        )
+        cont = np.bincount(cod[cod >= 0], minlength=len(self._tipos))
+        for tipo, v, c in zip(self._tipos, vol.tolist(), cont.tolist()):
+            self.h_vol_tipo[tipo].append(v)
+            self.h_n_ordens_tipo[tipo].append(c)
+
+    def series_microestrutura(self) -> Dict[str, np.ndarray]:
+        """Séries por ciclo do fluxo de ordens (para painel_microestrutura/save_run)."""
+        out = {
+            "desequilibrio": np.asarray(self.h_deseq, dtype=float),
+            "vol_compra": np.asarray(self.h_vol_compra, dtype=float),
+            "vol_venda": np.asarray(self.h_vol_venda, dtype=float),
+            "n_ordens": np.asarray(self.h_n_ordens, dtype=float),
+        }
+        for tipo, h in self.h_vol_tipo.items():
+            out[f"vol_{tipo}"] = np.asarray(h, dtype=float)
+            out[f"n_ordens_{tipo}"] = np.asarray(self.h_n_ordens_tipo[tipo], dtype=float)
+        for nome, h in self.h_custos.items():
+            out[f"custo_{nome}"] = np.asarray(h, dtype=float)
+        if self.subpassos > 1:
+            barras = self.barras_ohlcv()
+            for k in ("abertura", "maxima", "minima"):
+                out[k] = barras[k]
+        if self.h_profundidade:
+            out["profundidade"] = np.asarray(self.h_profundidade, dtype=float)
+            out["exec_formadores"] = np.asarray(self.h_exec_formadores, dtype=float)
+        if self.h_fundamental:
+            out["fundamental"] = np.asarray(self.h_fundamental, dtype=float)
+        if self.risco is not None:
+            for k, h in self.h_risco.items():
+                out[k] = np.asarray(h, dtype=float)
+        return out
+
+    def _abrir_contas(self) -> LivroRazao:
+        livro = self.livro
+        if livro.n < len(self.investidores):  # contas de quem entrou depois
+            livro.abrir_contas(self.investidores[livro.n :])
+        return livro
+
+    def _liquidar(self, idx: np.ndarray, qtd: np.ndarray) -> None:
+        livro = self._abrir_contas()
+        if (idx < 0).any():
+            raise ValueError("ordem de investidor que não está no mundo")
+        taxas = None
+        if self.custos:
+            taxas = np.zeros(qtd.size)
+            for j, m in enumerate(self.custos):
+                c = m.calcular(qtd, self.preco, self)
+                self._custos_dia[j] += float(c.sum())
+                taxas += c
+        livro.devolver(self.investidores, livro.liquidar(idx, qtd, self.preco, taxas))
+
+    def _dividendo_proprio(self, livro: LivroRazao, d: float) -> np.ndarray:
+        """
+        Chama ``receber_dividendo`` sobrescrito (reinvestimento, imposto...) das
+        contas compradas e leva a variação de caixa ao livro como dividendo
+        (mudança de posição feita pelo método é descartada: cotas só por ordens).
+        """
+        idx = np.flatnonzero(livro.dividendo_proprio & (livro.pos > 0.0))
+        valores = np.zeros(idx.size)
+        for k, i in enumerate(idx.tolist()):
+            inv = self.investidores[i]
+            inv.caixa, inv.pos = float(livro.caixa[i]), float(livro.pos[i])
+            inv.receber_dividendo(d)
+            valores[k] = inv.caixa - livro.caixa[i]
+        livro.creditar_dividendos(idx, valores)
+        return idx
+
+    def _agregar_qtd(self, qtd: np.ndarray) -> float:
+        agregar_qtd = getattr(self.book, "agregar_qtd", None)
+        if callable(agregar_qtd):
+            return agregar_qtd(qtd)
+        return self.book.agregar([{"qtd": q} for q in qtd.tolist()])
+
+    def _isentos_risco(self) -> Optional[np.ndarray]:
+        # formadores têm o próprio limite de estoque (pos_max)
+        return None if self._formadores is None else self._formadores.idx
+
+    def _filtrar_risco(self, ids: np.ndarray, idx: np.ndarray, qtd: np.ndarray):
+        """Ordens do subpasso cortadas aos limites do motor de risco (sem as zeradas)."""
+        livro = self._abrir_contas()
+        if (idx < 0).any():
+            raise ValueError("ordem de investidor que não está no mundo")
+        qtd, cortado = self.risco.filtrar(livro, idx, qtd, self.preco, self._isentos_risco())
+        self._cortado_dia += cortado
+        ok = qtd != 0.0
+        return ids[ok], idx[ok], qtd[ok]
+
+    def _fechar_risco(self, livro: LivroRazao, d: float, pagos: np.ndarray) -> np.ndarray:
+        liq, q, cobrados, stats = self.risco.fechar_ciclo(
+            livro, self.preco, d, self.ciclos_por_ano, self._isentos_risco()
+        )
+        stats["cortado"] = self._cortado_dia
+        self._cortado_dia = 0.0
+        for k, h in self.h_risco.items():
+            h.append(stats[k])
+        # liquidações forçadas: ordens a mercado no fluxo do próximo ciclo
+        for i, qi in zip(liq.tolist(), q.tolist()):
+            self.registrar_ordem(self.investidores[i].id, qi)
+        marca = np.zeros(livro.n, dtype=bool)
+        marca[pagos] = True
+        marca[cobrados] = True
+        return np.flatnonzero(marca)
 
     def _dividendo(self) -> float:
         if self.dy_anual <= 0.0:
             return 0.0
         return self.preco * (self.dy_anual / self.ciclos_por_ano)
 
-    def atualizar_ambiente(self) -> None:
-        desequilibrio = self.book.agregar(self.ordens)
-        ruido = random.gauss(0.0, 0.002)
-        choque = self.choques[self.ciclo] if self.ciclo < len(self.choques) else 0.0
-        impacto = self.k * (desequilibrio / max(1.0, self.depth)) + choque
+    def subpasso(
+        self,
+        fluxo: Optional[Tuple[np.ndarray, np.ndarray]] = None,
+        ruido: Optional[float] = None,
+        profundidade: Optional[float] = None,
+    ) -> None:
+        """
+        Forma o preço com as ordens acumuladas (um subpasso intradiário) e as
+        liquida; o ciclo só fecha em ``atualizar_ambiente``. ``fluxo=(ids, qtd)``
+        substitui ``self.ordens``, ``ruido`` o sorteio e ``profundidade`` a
+        profundidade efetiva dos formadores (usados pela reprodução do diário).
+        """
+        if fluxo is None:
+            desequilibrio = self.book.agregar(self.ordens)
+            ids, idx, qtd = self._ordens_em_arrays()
+            if self.risco is not None:
+                ids, idx, qtd = self._filtrar_risco(ids, idx, qtd)
+                desequilibrio = self._agregar_qtd(qtd)
+        else:
+            ids = np.asarray(fluxo[0], dtype=np.int64)
+            qtd = np.asarray(fluxo[1], dtype=float)
+            idx = self._indices(ids)
+            desequilibrio = self._agregar_qtd(qtd)
+        if ruido is None:
+            ruido = self._ruido()
+        choque = 0.0
+        if not self._dia and self.ciclo < len(self.choques):  # choque no 1º subpasso
+            choque = self.choques[self.ciclo]
+        execucao = None
+        if profundidade is None and self._formadores is not None:
+            profundidade, q_mm, p_mm = self._formadores.absorver(
+                desequilibrio, self.preco, self.vol.sigma, self.depth,
+                self._abrir_contas().pos,
+            )
+            execucao = (self._formadores.idx, q_mm, p_mm)
+        prof = max(1.0, self.depth) if profundidade is None else profundidade
+        impacto = (
+            self.regra.impacto(
+                desequilibrio, self.preco, prof, self.k, self.ciclo, 1.0 / self.subpassos
+            )
+            + choque
+        )
         self.preco *= math.exp(impacto + ruido)
+        self.vol.atualizar(impacto + ruido)
+        if self.diario is not None:
+            self.diario.gravar_ciclo(
+                self._passo, ids, qtd, self.preco, ruido, profundidade=profundidade
+            )
+        if self.livro is not None:
+            self._liquidar(idx, qtd)
+        if execucao is not None:
+            self.livro.liquidar(*execucao)
+            self._exec_dia += float(np.abs(execucao[1]).sum())
+        if profundidade is not None:
+            self._prof_dia.append(profundidade)
+
+        self._dia.append((idx, qtd, desequilibrio))
+        self._max_dia = max(self._max_dia, self.preco)
+        self._min_dia = min(self._min_dia, self.preco)
+        self.ordens.clear()
+        self._passo += 1
+
+    def atualizar_ambiente(
+        self,
+        fluxo: Optional[Tuple[np.ndarray, np.ndarray]] = None,
+        ruido: Optional[float] = None,
+        profundidade: Optional[float] = None,
+    ) -> None:
+        """Último subpasso do ciclo + fechamento (dividendos, históricos, barra)."""
+        self.subpasso(fluxo, ruido, profundidade)
+        if len(self._dia) == 1:
+            idx, qtd, desequilibrio = self._dia[0]
+        else:
+            idx = np.concatenate([x[0] for x in self._dia])
+            qtd = np.concatenate([x[1] for x in self._dia])
+            desequilibrio = sum(x[2] for x in self._dia)
 
         d = self._dividendo()
         self.h_div.append(d)
-        for inv in self.investidores:
-            rec = getattr(inv, "receber_dividendo", None)
-            if callable(rec) and getattr(inv, "pos", 0.0) > 0.0:
-                inv.receber_dividendo(d)
+        if self.livro is not None:
+            livro = self.livro
+            # mesma regra do caminho sem livro: só quem tem receber_dividendo
+            pagos = livro.pagar_dividendos(d, livro.recebe_dividendo & ~livro.dividendo_proprio)
+            if d > 0.0 and livro.dividendo_proprio.any():
+                pagos = np.union1d(pagos, self._dividendo_proprio(livro, d))
+            if self._formadores is not None:  # execuções do dia, uma vez por ciclo
+                marca = np.zeros(livro.n, dtype=bool)
+                marca[pagos] = True
+                marca[self._formadores.idx] = True
+                pagos = np.flatnonzero(marca)
+            if self.risco is not None:
+                pagos = self._fechar_risco(livro, d, pagos)
+            livro.devolver(self.investidores, pagos)
+            for j, h in enumerate(self.h_custos.values()):
+                h.append(self._custos_dia[j])
+                self._custos_dia[j] = 0.0
+            if self.checar_livro:
+                livro.verificar()
+        else:
+            for inv in self.investidores:
+                rec = getattr(inv, "receber_dividendo", None)
+                if callable(rec) and getattr(inv, "pos", 0.0) > 0.0:
+                    inv.receber_dividendo(d)
 
+        self._registrar_fluxo(idx, qtd)
+        if self._sent is not None:
+            self._difundir(idx, qtd)
+        if self.valor_fundamental is not None:
+            self.h_fundamental.append(self.valor_fundamental)
         self.h_deseq.append(desequilibrio)
+        if self._prof_dia:
+            self.h_profundidade.append(sum(self._prof_dia) / len(self._prof_dia))
+            self.h_exec_formadores.append(self._exec_dia)
+            self._prof_dia = []
+            self._exec_dia = 0.0
+        self.h_abertura.append(self.h_preco[-1])
+        self.h_maxima.append(self._max_dia)
+        self.h_minima.append(self._min_dia)
         self.h_preco.append(self.preco)
-        self.ordens.clear()
+        self._dia = []
+        self._max_dia = self._min_dia = self.preco
         self.ciclo += 1
+
+    def barras_ohlcv(self) -> Dict[str, np.ndarray]:
+        """Barras por ciclo agregadas dos subpassos (fechamento = ``h_preco[1:]``)."""
+        return {
+            "abertura": np.asarray(self.h_abertura, dtype=float),
+            "maxima": np.asarray(self.h_maxima, dtype=float),
+            "minima": np.asarray(self.h_minima, dtype=float),
+            "fechamento": np.asarray(self.h_preco[1:], dtype=float),
+            "volume": np.asarray(self.h_vol_compra, dtype=float)
+            + np.asarray(self.h_vol_venda, dtype=float),
+        }
@@ -0,0 +1,106 @@
+"""
+Processo estocástico do valor fundamental (nível do mundo).
+
+A trajetória é gerada em blocos vetorizados (``bloco`` ciclos por vez, em
+log): passeio aleatório, reversão à média (AR(1)/OU discreto via
+``lfilter``) ou passeio com saltos (Poisson x normal). Eventos ``Choque``
+somam ``magnitude`` ao log do fundamental no ciclo ``t``. Cada componente
+aleatório tem seu próprio gerador (``SeedSequence.spawn``), então o tamanho
+do bloco não muda a trajetória.
+"""
+from __future__ import annotations
+from dataclasses import dataclass, field
+from typing import Any, List, Optional, Sequence
+
+import numpy as np
+from scipy.signal import lfilter
+
+from ..core.events import Choque
+
+MODELOS = ("passeio", "reversao", "saltos")
+
+
+@dataclass
+class ProcessoFundamental:
+    v0: float = 110.0
+    modelo: str = "passeio"
+    sigma: float = 0.01  # dp por ciclo do log
+    drift: float = 0.0  # tendência por ciclo do log (passeio/saltos)
+    kappa: float = 0.02  # velocidade de reversão por ciclo (reversao)
+    media: Optional[float] = None  # nível de longo prazo (reversao); padrão v0
+    intensidade_saltos: float = 0.0  # saltos esperados por ciclo
+    media_saltos: float = 0.0
+    dp_saltos: float = 0.05
+    choques: Sequence[Any] = ()  # Choque ou dicts {t, magnitude[, tipo]}
+    seed: Any = None
+    bloco: int = 4096
+
+    _x: float = field(init=False, repr=False)
+    _t: int = field(init=False, repr=False)
+    _buf: np.ndarray = field(init=False, repr=False)
+    _ini: int = field(init=False, repr=False)
+    _saltos_choque: dict = field(init=False, repr=False)
+
+    def __post_init__(self) -> None:
+        if self.modelo not in MODELOS:
+            raise ValueError(f"modelo desconhecido: {self.modelo!r} (use um de {MODELOS})")
+        if self.v0 <= 0 or (self.media is not None and self.media <= 0):
+            raise ValueError("v0 e media devem ser positivos")
+        if self.modelo == "reversao" and not 0.0 < self.kappa <= 1.0:
+            raise ValueError("kappa deve estar em (0, 1]")
+        if self.modelo == "saltos" and self.intensidade_saltos <= 0:
+            raise ValueError("modelo 'saltos' requer intensidade_saltos > 0")
+        choques: List[Choque] = [
+            c if isinstance(c, Choque) else Choque(**c) for c in self.choques
+        ]
+        self._saltos_choque = {}
+        for c in choques:
+            self._saltos_choque[int(c.t)] = self._saltos_choque.get(int(c.t), 0.0) + float(
+                c.magnitude
+            )
+        ss = np.random.SeedSequence(self.seed)
+        self._rng_dif, self._rng_n, self._rng_j = (
+            np.random.default_rng(s) for s in ss.spawn(3)
+        )
+        self._x = float(np.log(self.v0))
+        self._t = 0  # ciclos já gerados
+        self._buf = np.array([self.v0])
+        self._ini = 0  # ciclo do primeiro valor em _buf
+
+    def _gerar(self, n: int) -> np.ndarray:
+        """Próximos ``n`` valores (ciclos _t+1 .. _t+n) a partir do estado atual."""
+        e = self.sigma * self._rng_dif.standard_normal(n)
+        if self.intensidade_saltos > 0:
+            k = self._rng_n.poisson(self.intensidade_saltos, n)
+            z = self._rng_j.standard_normal(n)
+            e += self.media_saltos * k + self.dp_saltos * np.sqrt(k) * z
+        for tc, mag in self._saltos_choque.items():
+            if self._t < tc <= self._t + n:
+                e[tc - self._t - 1] += mag
+        if self.modelo == "reversao":
+            m = np.log(self.media if self.media is not None else self.v0)
+            phi = 1.0 - self.kappa
+            y, _ = lfilter([1.0], [1.0, -phi], e, zi=[phi * (self._x - m)])
+            x = m + y
+        else:
+            x = self._x + np.cumsum(e + self.drift)
+        self._x = float(x[-1])
+        self._t += n
+        return np.exp(x)
+
+    def valor(self, t: int) -> float:
+        """Valor fundamental no ciclo ``t`` (0 = v0); gera blocos conforme preciso."""
+        if t < self._ini:
+            raise ValueError("ciclos anteriores ao bloco corrente já foram descartados")
+        while t > self._t:
+            ult = self._buf[-1]
+            self._ini = self._t
+            self._buf = np.concatenate([[ult], self._gerar(self.bloco)])
+        return float(self._buf[t - self._ini])
+
+    def trajetoria(self, n: int) -> np.ndarray:
+        """Trajetória completa de ``n`` ciclos (n+1 valores, começando em v0) de uma vez."""
+        novo = ProcessoFundamental(
+            **{k: getattr(self, k) for k in self.__dataclass_fields__ if not k.startswith("_")}
+        )
+        return np.concatenate([[self.v0], novo._gerar(int(n))])
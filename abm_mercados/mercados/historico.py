@@ -0,0 +1,249 @@
+"""
+Séries históricas (OHLCV + dividendos) como ambiente de backtest.
+
+``FonteHistorica`` lê um ticker de forma preguiçosa: CSV em blocos
+(``pandas.read_csv(chunksize=...)``), Parquet em lotes do ``pyarrow`` (opcional)
+ou ``.abm`` mapeado em memória (``utils.colunar``; ``converter_abm`` gera um a
+partir de CSV/Parquet). Só o bloco corrente fica em memória, então o custo por
+ticker ativo é constante; ``CatalogoHistorico`` lista uma pasta com um arquivo
+por ticker sem abrir nenhum.
+
+``MercadoHistorico`` é um ``MercadoSimples`` cujo componente exógeno do passo
+(o que seria o ruído) leva o preço ao fechamento histórico; o impacto das
+ordens (``regra_preco``/``k_impacto``) desvia o preço da série e o desvio
+decai com ``reversao`` por ciclo. Com ``k_impacto=0`` (padrão) o preço é a
+série histórica. Como o componente exógeno passa por ``_ruido``,
+``utils.diario.reproduzir`` refaz o caminho de preços sem a fonte; os
+dividendos da coluna ``dividendo`` não vão para o diário e não são refeitos.
+"""
+from __future__ import annotations
+import math
+import os
+from typing import Any, Dict, Iterator, List, Mapping, Optional
+
+import numpy as np
+import pandas as pd
+
+from .environments import MercadoSimples
+
+COLUNAS = ("data", "abertura", "maxima", "minima", "fechamento", "volume", "dividendo")
+_APELIDOS = {
+    "date": "data",
+    "open": "abertura",
+    "high": "maxima",
+    "low": "minima",
+    "close": "fechamento",
+    "preco": "fechamento",
+    "dividend": "dividendo",
+    "dividends": "dividendo",
+    "máxima": "maxima",
+    "mínima": "minima",
+}
+
+
+def _normalizar(
+    df: pd.DataFrame, colunas: Mapping[str, str], ticker: Optional[str], coluna_ticker: str
+) -> Dict[str, np.ndarray]:
+    nomes = {c: colunas.get(c, _APELIDOS.get(str(c).strip().lower(), str(c).strip().lower())) for c in df.columns}
+    df = df.rename(columns=nomes)
+    if ticker is not None:
+        df = df[df[coluna_ticker] == ticker]
+    if "fechamento" not in df.columns:
+        raise ValueError(f"série histórica sem coluna de fechamento (colunas: {list(df.columns)})")
+    out = {}
+    for c in COLUNAS:
+        if c not in df.columns:
+            continue
+        if c == "data":
+            out[c] = pd.to_datetime(df[c]).to_numpy().astype("datetime64[D]")
+        else:
+            out[c] = df[c].to_numpy(dtype=float)
+    return out
+
+
+class FonteHistorica:
+    """
+    Barras de um ticker em ordem, lidas em blocos de ``bloco`` linhas. Arquivo
+    longo (vários tickers) é filtrado por ``ticker`` na ``coluna_ticker``;
+    ``colunas`` renomeia colunas fora do padrão (``{"Adj Close": "fechamento"}``).
+    """
+
+    def __init__(
+        self,
+        caminho: str,
+        ticker: Optional[str] = None,
+        coluna_ticker: str = "ticker",
+        colunas: Optional[Mapping[str, str]] = None,
+        bloco: int = 4096,
+    ) -> None:
+        if not os.path.exists(caminho):
+            raise FileNotFoundError(caminho)
+        self.caminho = caminho
+        self.ticker = ticker
+        self.coluna_ticker = coluna_ticker
+        self.colunas = dict(colunas or {})
+        self.bloco = int(bloco)
+        self._blocos: Optional[Iterator[Dict[str, np.ndarray]]] = None
+        self._buf: Dict[str, np.ndarray] = {}
+        self._i = self._n = 0
+        self.lidas = 0
+
+    def _gerar(self) -> Iterator[Dict[str, np.ndarray]]:
+        nome = self.caminho.lower()
+
+        def norm(df: pd.DataFrame) -> Dict[str, np.ndarray]:
+            return _normalizar(df, self.colunas, self.ticker, self.coluna_ticker)
+
+        if nome.endswith(".abm"):
+            from ..utils.colunar import ler_colunas
+
+            dados, _ = ler_colunas(self.caminho, mmap=True)  # nada lido até fatiar
+            dados = {self.colunas.get(k, _APELIDOS.get(k, k)): v for k, v in dados.items()}
+            if "fechamento" not in dados:
+                raise ValueError(f"série histórica sem coluna de fechamento: {self.caminho}")
+            n = len(dados["fechamento"])
+            for i in range(0, n, self.bloco):
+                yield {k: v[i : i + self.bloco] for k, v in dados.items() if k in COLUNAS}
+        elif nome.endswith(".parquet"):
+            try:
+                import pyarrow.parquet as pq
+            except ImportError as e:
+                raise ImportError("ler Parquet requer o pyarrow (pip install abm_mercado[parquet])") from e
+            for lote in pq.ParquetFile(self.caminho).iter_batches(batch_size=self.bloco):
+                yield norm(lote.to_pandas())
+        else:
+            for df in pd.read_csv(self.caminho, chunksize=self.bloco):
+                yield norm(df)
+
+    def proxima(self) -> Optional[Dict[str, Any]]:
+        """Próxima barra (``{coluna: valor}``) ou None no fim da série."""
+        while self._i >= self._n:
+            if self._blocos is None:
+                self._blocos = self._gerar()
+            buf = next(self._blocos, None)
+            if buf is None:
+                return None
+            self._buf, self._i, self._n = buf, 0, len(buf["fechamento"])
+        i = self._i
+        self._i += 1
+        self.lidas += 1
+        return {k: v[i].item() if k != "data" else v[i] for k, v in self._buf.items()}
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        while (barra := self.proxima()) is not None:
+            yield barra
+
+    def fechar(self) -> None:
+        if self._blocos is not None:
+            self._blocos.close()
+        self._blocos, self._buf, self._i, self._n = None, {}, 0, 0
+
+
+def converter_abm(origem: str, destino: str, bloco: int = 65_536, **kw) -> str:
+    """Grava a série de ``origem`` (CSV/Parquet) como ``.abm`` mapeável em memória."""
+    from ..utils.colunar import salvar_colunas
+
+    fonte = FonteHistorica(origem, bloco=bloco, **kw)
+    partes: Dict[str, List[np.ndarray]] = {}
+    for buf in fonte._gerar():
+        for k, v in buf.items():
+            partes.setdefault(k, []).append(v)
+    colunas = {k: np.concatenate(v) for k, v in partes.items()}
+    return salvar_colunas(destino, colunas, meta={"origem": os.path.basename(origem), "ticker": kw.get("ticker")})
+
+
+class CatalogoHistorico:
+    """Pasta com um arquivo por ticker (``<ticker>.csv``, ``.csv.gz``, ``.parquet`` ou ``.abm``)."""
+
+    EXTENSOES = (".csv.gz", ".csv", ".parquet", ".abm")
+
+    def __init__(self, pasta: str, **opcoes: Any) -> None:
+        self.pasta = pasta
+        self.opcoes = opcoes
+
+    def _arquivos(self) -> Dict[str, str]:
+        out = {}
+        with os.scandir(self.pasta) as it:
+            for e in it:
+                ext = next((x for x in self.EXTENSOES if e.name.lower().endswith(x)), None)
+                if ext and e.is_file():
+                    out.setdefault(e.name[: -len(ext)], e.path)
+        return out
+
+    def tickers(self) -> List[str]:
+        return sorted(self._arquivos())
+
+    def fonte(self, ticker: str) -> FonteHistorica:
+        arquivos = self._arquivos()
+        if ticker not in arquivos:
+            raise ValueError(f"ticker {ticker!r} não está em {self.pasta}")
+        return FonteHistorica(arquivos[ticker], **self.opcoes)
+
+    def mercado(self, ticker: str, **kw: Any) -> "MercadoHistorico":
+        return MercadoHistorico(self.fonte(ticker), **kw)
+
+
+class MercadoHistorico(MercadoSimples):
+    """
+    ``fonte`` (``FonteHistorica``, caminho ou dict com seus argumentos) fornece
+    uma barra por ciclo; a primeira define o preço inicial. O fechamento da
+    barra só é usado na formação do preço: durante o ciclo os investidores
+    veem ``barra``, a última barra fechada (sem olhar o futuro). Dividendos
+    vêm da coluna ``dividendo`` (por cota, na data ex) quando existe, senão de
+    ``dy_anual``. Com ``subpassos > 1`` o alvo intradiário interpola o
+    log-preço entre fechamentos. Passar do fim da série é ``RuntimeError``.
+    """
+
+    def __init__(self, fonte: FonteHistorica | str | dict, reversao: float = 0.1, k_impacto: float = 0.0, **kw: Any) -> None:
+        if isinstance(fonte, str):
+            fonte = FonteHistorica(fonte)
+        elif isinstance(fonte, dict):
+            fonte = FonteHistorica(**fonte)
+        if not 0.0 <= float(reversao) <= 1.0:
+            raise ValueError("reversao deve estar em [0, 1]")
+        barra = fonte.proxima()
+        if barra is None:
+            raise ValueError(f"série histórica vazia: {fonte.caminho}")
+        super().__init__(preco_inicial=barra["fechamento"], k_impacto=k_impacto, **kw)
+        self.fonte = fonte
+        self.reversao = float(reversao)
+        # fração do desvio que sobrevive a cada subpasso
+        self._persistencia = (1.0 - self.reversao) ** (1.0 / self.subpassos)
+        self.barra = barra
+        self._prox: Optional[Dict[str, Any]] = None
+        self._log_ini = self._log_fim = math.log(barra["fechamento"])
+        self.h_historico: List[float] = [barra["fechamento"]]
+        self.h_data: List[Any] = [barra.get("data")]
+
+    def _step_start(self) -> None:
+        prox = self.fonte.proxima()
+        if prox is None:
+            raise RuntimeError(f"série histórica esgotada após {self.ciclo} ciclos")
+        self._prox = prox
+        self._log_ini, self._log_fim = self._log_fim, math.log(prox["fechamento"])
+        super()._step_start()
+
+    def _ruido(self) -> float:
+        # leva o log-preço ao alvo histórico do subpasso, mantendo parte do desvio
+        k = self.subpassos
+        j = len(self._dia)
+        passo = (self._log_fim - self._log_ini) / k
+        log_p = math.log(self.preco)
+        desvio = log_p - (self._log_ini + passo * j)
+        return self._log_ini + passo * (j + 1) - log_p + self._persistencia * desvio
+
+    def _dividendo(self) -> float:
+        if self._prox is None or "dividendo" not in self._prox:
+            return super()._dividendo()
+        d = self._prox["dividendo"]
+        return d if d == d else 0.0  # NaN = sem provento no dia
+
+    def atualizar_ambiente(self, *args: Any, **kw: Any) -> None:
+        super().atualizar_ambiente(*args, **kw)
+        self.barra = self._prox
+        self.h_historico.append(self.barra["fechamento"])
+        self.h_data.append(self.barra.get("data"))
+
+    def desvio(self) -> float:
+        """Log do preço simulado sobre o histórico (impacto acumulado)."""
+        return math.log(self.preco) - math.log(self.h_historico[-1])
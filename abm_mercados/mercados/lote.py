@@ -0,0 +1,303 @@
+"""
+Réplicas independentes do ``MercadoSimples`` avançando juntas num só processo.
+
+``MercadoLote`` guarda preços, históricos e caixa/posição dos investidores em
+arrays (investidor x réplica) e faz cada ciclo com algumas dezenas de
+operações NumPy sobre o lote inteiro, em vez de um ``Simulacao`` por réplica:
+o custo passa a crescer com o tamanho dos arrays, não com o número de mundos.
+
+Cada réplica reproduz bit a bit o motor escalar com a mesma seed:
+  - ``MersenneLote`` é o MT19937 do módulo ``random`` vetorizado entre
+    réplicas (mesmo estado inicial de ``random.seed(seed)``, mesmos sorteios
+    de ``random()``, ``uniform`` e ``gauss``), todas consumindo o gerador no
+    mesmo ritmo;
+  - as regras dos investidores embutidos são as mesmas contas, na mesma ordem,
+    com máscaras no lugar dos ``if``; onde o motor escalar usa ``math``, o lote
+    usa as mesmas funções da libm (``_libm``), já que as do NumPy podem diferir
+    no último bit.
+
+Suporta fundamentalistas, ruído e tendência sem rede/livro/fundamental/
+subpassos; qualquer ``regra_preco`` de ``mercados.precos`` (são kernels sobre
+arrays).
+"""
+from __future__ import annotations
+import math
+import random
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+
+from ..investidores.fundamentalista import InvestidorFundamentalista
+from ..investidores.ruido import InvestidorRuido
+from ..investidores.tecnico import InvestidorTendencia
+from .precos import RegraPreco, criar_regra
+
+_N, _M = 624, 397
+_MATRIZ_A = np.uint32(0x9908B0DF)
+_SUPERIOR = np.uint32(0x80000000)
+_INFERIOR = np.uint32(0x7FFFFFFF)
+
+
+def _libm(f, x: np.ndarray) -> np.ndarray:
+    """``f`` (de ``math``) elemento a elemento, sem laço Python por elemento."""
+    return np.fromiter(map(f, x.ravel().tolist()), dtype=float, count=x.size).reshape(
+        x.shape
+    )
+
+
+class MersenneLote:
+    """MT19937 de ``random.Random(seed)`` para cada seed, sorteando em lote."""
+
+    def __init__(self, seeds: Sequence[int]) -> None:
+        estados = [random.Random(s).getstate()[1] for s in seeds]
+        if len({e[-1] for e in estados}) != 1:
+            raise ValueError("geradores fora de sincronia")
+        # (624, réplicas): os blocos da torção ficam contíguos na memória
+        self.mt = np.array([e[:-1] for e in estados], dtype=np.uint32).T.copy()
+        self.pos = estados[0][-1]
+        self._saida = np.zeros_like(self.mt)
+        if self.pos < _N:
+            self._saida = self._temperar(self.mt)
+        self._gauss_prox: Optional[np.ndarray] = None
+
+    def _torcer(self) -> None:
+        mt = self.mt
+        # i em [0, 227) usa mt[i + 397] antigo; os dois blocos seguintes usam
+        # mt[i - 227] já atualizado no bloco anterior
+        for a, b in ((0, _N - _M), (_N - _M, 2 * (_N - _M)), (2 * (_N - _M), _N - 1)):
+            y = (mt[a:b] & _SUPERIOR) | (mt[a + 1 : b + 1] & _INFERIOR)
+            src = mt[a + _M : b + _M] if a == 0 else mt[a + _M - _N : b + _M - _N]
+            mt[a:b] = src ^ (y >> 1) ^ ((y & 1) * _MATRIZ_A)
+        y = (mt[_N - 1] & _SUPERIOR) | (mt[0] & _INFERIOR)
+        mt[_N - 1] = mt[_M - 1] ^ (y >> 1) ^ ((y & 1) * _MATRIZ_A)
+
+    @staticmethod
+    def _temperar(mt: np.ndarray) -> np.ndarray:
+        y = mt ^ (mt >> 11)
+        y ^= (y << 7) & np.uint32(0x9D2C5680)
+        y ^= (y << 15) & np.uint32(0xEFC60000)
+        return y ^ (y >> 18)
+
+    def _palavras(self, m: int) -> np.ndarray:
+        partes = []
+        while m > 0:
+            if self.pos >= _N:
+                self._torcer()
+                self._saida = self._temperar(self.mt)
+                self.pos = 0
+            k = min(m, _N - self.pos)
+            partes.append(self._saida[self.pos : self.pos + k])
+            self.pos += k
+            m -= k
+        return partes[0] if len(partes) == 1 else np.concatenate(partes)
+
+    def random(self, n: int) -> np.ndarray:
+        """(n, réplicas) sorteios de ``random.random()`` (53 bits, como o CPython)."""
+        w = self._palavras(2 * n)
+        a = (w[0::2] >> 5).astype(float)
+        b = (w[1::2] >> 6).astype(float)
+        return (a * 67108864.0 + b) * (1.0 / 9007199254740992.0)
+
+    def gauss(self, mu: float = 0.0, sigma: float = 1.0) -> np.ndarray:
+        """``random.gauss`` (Box–Muller com o par guardado para a próxima chamada)."""
+        z = self._gauss_prox
+        self._gauss_prox = None
+        if z is None:
+            u = self.random(2)
+            x2pi = u[0] * (2.0 * math.pi)
+            g2rad = np.sqrt(-2.0 * _libm(math.log, 1.0 - u[1]))
+            z = _libm(math.cos, x2pi) * g2rad
+            self._gauss_prox = _libm(math.sin, x2pi) * g2rad
+        return mu + z * sigma
+
+
+class MercadoLote:
+    """
+    ``len(seeds)`` réplicas de um ``MercadoSimples`` com os mesmos parâmetros e
+    investidores (``investidores`` é o modelo, copiado para cada réplica).
+    ``replicar(mundo, seeds)`` monta o lote a partir de um mundo já povoado.
+    """
+
+    def __init__(
+        self,
+        seeds: Sequence[int],
+        investidores: Sequence[Any],
+        preco_inicial: float = 100.0,
+        ciclos_por_ano: int = 252,
+        k_impacto: float = 0.02,
+        depth: float = 250.0,
+        dy_anual: float = 0.0,
+        choques: Optional[List[float]] = None,
+        regra_preco: Optional[RegraPreco | dict | str] = None,
+    ) -> None:
+        self.seeds = [int(s) for s in seeds]
+        self.rng = MersenneLote(self.seeds)
+        R = len(self.seeds)
+        self.ciclos_por_ano = int(ciclos_por_ano)
+        self.k = float(k_impacto)
+        self.depth = float(depth)
+        self.dy_anual = float(dy_anual)
+        self.choques = list(choques or [])
+        self.regra = criar_regra(regra_preco)
+        self.ciclo = 0
+        self.preco = np.full(R, float(preco_inicial))
+
+        grupos: Dict[type, List[int]] = {
+            InvestidorFundamentalista: [],
+            InvestidorRuido: [],
+            InvestidorTendencia: [],
+        }
+        for j, inv in enumerate(investidores):
+            if type(inv) not in grupos:
+                raise ValueError(f"investidor sem versão em lote: {type(inv).__name__}")
+            if getattr(inv, "sensib_rede", 0.0):
+                raise ValueError("sensib_rede exige rede social (não suportada no lote)")
+            grupos[type(inv)].append(j)
+        self.investidores = list(investidores)
+        self.ids = np.array([int(inv.id) for inv in investidores], dtype=np.int64)
+        A = len(self.investidores)
+        # estado em (investidor, réplica): cada investidor é uma linha contígua
+        self._caixa = np.repeat(np.array([[float(i.caixa)] for i in investidores]), R, axis=1)
+        self._pos = np.repeat(np.array([[float(i.pos)] for i in investidores]), R, axis=1)
+
+        def col(tipo, attr):
+            v = [getattr(self.investidores[j], attr) for j in grupos[tipo]]
+            return np.array(v, dtype=float)[:, None]
+
+        F = InvestidorFundamentalista
+        self._f = np.array(grupos[F], dtype=np.int64)
+        self._f_valor, self._f_toler, self._f_prop = (
+            col(F, "valor_intrinseco"), col(F, "toler"), col(F, "prop")
+        )
+        self._r = np.array(grupos[InvestidorRuido], dtype=np.int64)
+        self._r_prob = col(InvestidorRuido, "prob_compra")
+        self._r_lote = col(InvestidorRuido, "max_lote")
+        # tendência agrupada por janela (uma janela => um bloco de log-preços)
+        T = InvestidorTendencia
+        self._t: Dict[int, tuple] = {}
+        for janela in sorted({self.investidores[j].janela for j in grupos[T]}):
+            cols = [j for j in grupos[T] if self.investidores[j].janela == janela]
+            alav = np.array([[self.investidores[j].alav] for j in cols], dtype=float)
+            self._t[int(janela)] = (np.array(cols, dtype=np.int64), alav)
+        # quem recebe dividendo (tem receber_dividendo) no motor escalar
+        self._div = np.array(
+            [[callable(getattr(i, "receber_dividendo", None))] for i in investidores], dtype=bool
+        )
+        self._ordem = np.zeros((A, R))
+
+        self.h_preco: List[np.ndarray] = [self.preco.copy()]
+        self._h_log: List[np.ndarray] = []
+        self.h_deseq: List[np.ndarray] = []
+        self.h_div: List[np.ndarray] = []
+
+    @classmethod
+    def replicar(cls, mundo: Any, seeds: Sequence[int]) -> "MercadoLote":
+        """Lote com os parâmetros e investidores (estado atual) de um ``MercadoSimples`` novo."""
+        if mundo.ciclo:
+            raise ValueError("replicar exige um mundo que ainda não rodou")
+        if (
+            mundo.livro is not None
+            or mundo.rede is not None
+            or mundo.fundamental is not None
+            or mundo.subpassos != 1
+        ):
+            raise ValueError("lote só cobre o mercado sem livro/rede/fundamental/subpassos")
+        return cls(
+            seeds,
+            mundo.investidores,
+            preco_inicial=mundo.preco,
+            ciclos_por_ano=mundo.ciclos_por_ano,
+            k_impacto=mundo.k,
+            depth=mundo.depth,
+            dy_anual=mundo.dy_anual,
+            choques=mundo.choques,
+            regra_preco=criar_regra(mundo.regra.spec()),
+        )
+
+    @property
+    def caixa(self) -> np.ndarray:
+        """(réplicas, investidores)."""
+        return self._caixa.T
+
+    @property
+    def pos(self) -> np.ndarray:
+        """(réplicas, investidores)."""
+        return self._pos.T
+
+    def _enviar(self, cols: np.ndarray, q: np.ndarray, p: np.ndarray) -> None:
+        # q = 0 onde o investidor não envia: x - 0*p e x + 0 não mudam nada
+        self._caixa[cols] -= q * p
+        self._pos[cols] += q
+        self._ordem[cols] = q
+
+    def _agir(self) -> None:
+        p = self.preco
+        self._ordem[:] = 0.0
+        if self._f.size:
+            c, ps = self._caixa[self._f], self._pos[self._f]
+            v = self._f_valor
+            diff = (v - p) / np.maximum(1e-9, v)
+            compra = (diff > self._f_toler) & (c > 0)
+            qc = np.maximum(1.0, self._f_prop * c / p)
+            venda = ~compra & (diff < -self._f_toler) & (ps > 0)
+            qv = np.minimum(np.maximum(1.0, self._f_prop * ps), ps)
+            q = np.where(compra & (qc * p <= c), qc, np.where(venda, -qv, 0.0))
+            self._enviar(self._f, q, p)
+        if self._r.size:
+            u = self.rng.random(2 * self._r.size)
+            lado = np.where(u[0::2] < self._r_prob, 1.0, -1.0)
+            q = (0.0 + self._r_lote * u[1::2]) * lado
+            c, ps = self._caixa[self._r], self._pos[self._r]
+            ok = np.where(q > 0, q * p <= c, (np.abs(q) <= ps) & (np.abs(q) > 0))
+            self._enviar(self._r, np.where(ok, q, 0.0), p)
+        for janela, (cols, alav) in self._t.items():
+            if len(self.h_preco) <= janela:
+                continue
+            r = np.diff(np.stack(self._h_log[-janela - 1 :], axis=1), axis=1)
+            sinal = np.sign(r.sum(axis=1))
+            c, ps = self._caixa[cols], self._pos[cols]
+            q = np.maximum(1.0, alav * (c + ps * p) / p) * sinal
+            ok = np.where(q > 0, q * p <= c, (q < 0) & (np.abs(q) <= ps))
+            self._enviar(cols, np.where(ok, q, 0.0), p)
+
+    def passo(self) -> None:
+        """Um ciclo de todas as réplicas (investidores, preço, dividendos)."""
+        if not self._h_log:
+            self._h_log.append(np.log(self.preco))
+        self._agir()
+        deseq = np.zeros(self.preco.size)
+        for q in self._ordem:  # soma na ordem dos investidores
+            deseq += q
+        # sem subpassos no motor em lote: o desvio do ciclo é o de MercadoSimples
+        ruido = self.rng.gauss(0.0, 0.002)
+        choque = self.choques[self.ciclo] if self.ciclo < len(self.choques) else 0.0
+        impacto = (
+            self.regra.impacto(deseq, self.preco, max(1.0, self.depth), self.k, self.ciclo, 1.0)
+            + choque
+        )
+        self.preco = self.preco * _libm(math.exp, impacto + ruido)
+
+        d = (
+            self.preco * (self.dy_anual / self.ciclos_por_ano)
+            if self.dy_anual > 0.0
+            else np.zeros(self.preco.size)
+        )
+        recebe = self._div & (self._pos > 0.0)
+        self._caixa += np.where(recebe, d * self._pos, 0.0)
+
+        self.h_div.append(d)
+        self.h_deseq.append(deseq)
+        self.h_preco.append(self.preco)
+        self._h_log.append(np.log(self.preco))
+        self.ciclo += 1
+
+    def executar(self, n_ciclos: int = 1) -> None:
+        for _ in range(int(n_ciclos)):
+            self.passo()
+
+    def precos(self) -> np.ndarray:
+        """(réplicas, ciclos + 1), pronto para ``painel_estilizados_lote``."""
+        return np.stack(self.h_preco, axis=1)
+
+    def desequilibrios(self) -> np.ndarray:
+        return np.stack(self.h_deseq, axis=1)
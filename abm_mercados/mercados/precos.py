@@ -0,0 +1,137 @@
+"""
+Regras de formação de preço como kernels vetorizados.
+
+Uma regra devolve a parte determinística do retorno log do passo a partir do
+desequilíbrio, do preço e da profundidade. Os argumentos podem ser escalares
+(um mundo) ou arrays (um lote de mundos em passo único): as contas usam só
+operações do NumPy que valem para os dois. Ruído e choques ficam com o mundo.
+
+Regras com estado (média móvel, preço de referência) guardam-no na instância,
+iniciado no primeiro passo com o formato do preço recebido: use uma instância
+por mundo (ou por lote). ``criar_regra`` monta a regra a partir da config:
+nome embutido (``REGRAS``), ``"modulo:Classe"`` ou plugin do grupo
+``abm_mercado.regras_preco``.
+"""
+from __future__ import annotations
+import importlib
+from dataclasses import dataclass, field, fields
+from typing import Any, Dict, Optional
+
+import numpy as np
+
+
+@dataclass
+class RegraPreco:
+    def impacto(
+        self, desequilibrio: Any, preco: Any, depth: Any, k: float, t: int, dt: float = 1.0
+    ) -> Any:
+        """Retorno log determinístico do passo (``dt`` = fração do ciclo)."""
+        raise NotImplementedError
+
+    def spec(self) -> Dict[str, Any]:
+        """Config que recria a regra (vai para o cabeçalho do diário)."""
+        nome = _NOMES.get(type(self), f"{type(self).__module__}:{type(self).__qualname__}")
+        return {"tipo": nome, **{f.name: getattr(self, f.name) for f in fields(self) if f.init}}
+
+
+@dataclass
+class ImpactoLinear(RegraPreco):
+    """``k * D / depth`` (a regra original do ``MercadoSimples``)."""
+
+    def impacto(self, desequilibrio, preco, depth, k, t, dt=1.0):
+        return k * (desequilibrio / depth)
+
+
+@dataclass
+class ImpactoRaiz(RegraPreco):
+    """Impacto côncavo: ``k * sinal(D) * sqrt(|D| / depth)``."""
+
+    def impacto(self, desequilibrio, preco, depth, k, t, dt=1.0):
+        return k * np.sign(desequilibrio) * np.sqrt(np.abs(desequilibrio) / depth)
+
+
+@dataclass
+class ReversaoDrift(RegraPreco):
+    """
+    Drift + reversão à média móvel exponencial do preço (peso ``alpha`` por
+    ciclo) + impacto linear, como no ``MundoGeral`` dos exemplos.
+    """
+
+    drift: float = 0.0002
+    kappa: float = 0.02
+    alpha: float = 0.02
+    _media: Any = field(default=None, init=False, repr=False)
+
+    def impacto(self, desequilibrio, preco, depth, k, t, dt=1.0):
+        if self._media is None:
+            self._media = np.copy(preco) if np.ndim(preco) else float(preco)
+        a = self.alpha * dt
+        self._media = (1.0 - a) * self._media + a * preco
+        mr = self.kappa * (self._media - preco) / np.maximum(1e-9, self._media)
+        return (self.drift + mr) * dt + k * (desequilibrio / depth)
+
+
+@dataclass
+class Sazonal(RegraPreco):
+    """Impacto linear + senoide de ``periodo`` ciclos (safra/entressafra do ``MundoAgro``)."""
+
+    amplitude: float = 0.10
+    periodo: int = 252
+
+    def impacto(self, desequilibrio, preco, depth, k, t, dt=1.0):
+        saz = self.amplitude * np.sin(2.0 * np.pi * (t % self.periodo) / self.periodo)
+        return k * (desequilibrio / depth) + saz * dt
+
+
+@dataclass
+class ClearingWalras(RegraPreco):
+    """
+    Equilíbrio walrasiano contra uma oferta de elasticidade ``elasticidade *
+    depth`` em torno do preço de referência (o do primeiro passo): o preço
+    que zera o excesso de demanda é ``p_ref * exp(D / (elasticidade * depth))``,
+    sem memória do impacto dos passos anteriores.
+    """
+
+    elasticidade: float = 1.0
+    _log_ref: Any = field(default=None, init=False, repr=False)
+
+    def impacto(self, desequilibrio, preco, depth, k, t, dt=1.0):
+        if self._log_ref is None:
+            self._log_ref = np.log(preco)
+        return self._log_ref + desequilibrio / (self.elasticidade * depth) - np.log(preco)
+
+
+REGRAS: Dict[str, type] = {
+    "linear": ImpactoLinear,
+    "raiz": ImpactoRaiz,
+    "reversao": ReversaoDrift,
+    "sazonal": Sazonal,
+    "walras": ClearingWalras,
+}
+_NOMES = {cls: nome for nome, cls in REGRAS.items()}
+
+
+def _resolver_regra(tipo: str) -> type:
+    if tipo in REGRAS:
+        return REGRAS[tipo]
+    if ":" in tipo:
+        mod, cls = tipo.split(":")
+        return getattr(importlib.import_module(mod), cls)
+    from ..plugins import listar_plugins
+
+    plugins = listar_plugins("abm_mercado.regras_preco")
+    if tipo not in plugins:
+        raise ValueError(f"regra de preço desconhecida: {tipo!r} (use um de {tuple(REGRAS)})")
+    return plugins[tipo]
+
+
+def criar_regra(spec: Optional[Any] = None) -> RegraPreco:
+    """Regra a partir de instância, nome ou dict ``{tipo, ...parâmetros}`` (padrão: linear)."""
+    if spec is None:
+        return ImpactoLinear()
+    if isinstance(spec, RegraPreco):
+        return spec
+    if isinstance(spec, str):
+        spec = {"tipo": spec}
+    spec = dict(spec)
+    return _resolver_regra(spec.pop("tipo", "linear"))(**spec)
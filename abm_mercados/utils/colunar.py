@@ -0,0 +1,144 @@
+"""
+Formato binário colunar das execuções (``.abm``).
+
+Layout (little-endian):
+  - 8 bytes mágicos ``ABMRUN\\x00\\x01``
+  - uint64 com o tamanho do cabeçalho JSON
+  - cabeçalho JSON (colunas, dtype, offsets, compressão + metadados livres:
+    config, métricas, ...)
+  - blocos das colunas, cada um alinhado em 64 bytes
+
+Colunas sem compressão podem ser lidas por ``np.memmap`` (nada é carregado até
+ser usado) e qualquer subconjunto de colunas pode ser lido isoladamente.
+"""
+from __future__ import annotations
+import json
+import os
+import struct
+import zlib
+from typing import Dict, Iterable, Optional, Tuple
+
+import numpy as np
+
+MAGICO = b"ABMRUN\x00\x01"
+ALINHAMENTO = 64
+
+
+def _alinhar(n: int) -> int:
+    return -(-n // ALINHAMENTO) * ALINHAMENTO
+
+
+def salvar_colunas(
+    caminho: str,
+    colunas: Dict[str, np.ndarray],
+    meta: Optional[dict] = None,
+    precisao: str = "float64",
+    compressao: Optional[str] = None,
+    nivel: int = 6,
+) -> str:
+    """
+    Grava ``colunas`` (nome -> array 1D) em ``caminho``. ``precisao`` = "float64"
+    ou "float32" para colunas de ponto flutuante; ``compressao`` = None ou "zlib"
+    (colunas comprimidas não são mapeáveis em memória).
+    """
+    if compressao not in (None, "zlib"):
+        raise ValueError(f"compressão desconhecida: {compressao!r}")
+    blocos = []
+    info = {}
+    offset = 0
+    for nome, valores in colunas.items():
+        a = np.asarray(valores)
+        if a.dtype.kind == "f" or a.dtype == object:
+            a = a.astype(precisao)
+        a = np.ascontiguousarray(a.astype(a.dtype.newbyteorder("<")))
+        bruto = a.tobytes()
+        if compressao == "zlib":
+            bruto = zlib.compress(bruto, nivel)
+        info[nome] = {
+            "dtype": a.dtype.str,
+            "n": int(a.size),
+            "offset": offset,
+            "bytes": len(bruto),
+            "compressao": compressao,
+        }
+        blocos.append(bruto)
+        offset = _alinhar(offset + len(bruto))
+
+    cab = json.dumps(
+        {"versao": 1, "colunas": info, "meta": meta or {}},
+        ensure_ascii=False,
+        default=float,
+    ).encode("utf-8")
+    inicio = _alinhar(len(MAGICO) + 8 + len(cab))
+    with open(caminho, "wb") as f:
+        f.write(MAGICO)
+        f.write(struct.pack("<Q", len(cab)))
+        f.write(cab)
+        for nome, bruto in zip(info, blocos):
+            f.seek(inicio + info[nome]["offset"])
+            f.write(bruto)
+        f.truncate(max(f.tell(), inicio))
+    return caminho
+
+
+def _cabecalho(f) -> Tuple[dict, int]:
+    if f.read(len(MAGICO)) != MAGICO:
+        raise ValueError("arquivo não está no formato .abm")
+    (tam,) = struct.unpack("<Q", f.read(8))
+    cab = json.loads(f.read(tam).decode("utf-8"))
+    return cab, _alinhar(len(MAGICO) + 8 + tam)
+
+
+def ler_meta(caminho: str) -> dict:
+    """Só o cabeçalho: metadados e descrição das colunas (sem ler dados)."""
+    with open(caminho, "rb") as f:
+        cab, _ = _cabecalho(f)
+    return {"colunas": cab["colunas"], **cab["meta"]}
+
+
+def ler_colunas(
+    caminho: str, colunas: Optional[Iterable[str]] = None, mmap: bool = True
+) -> Tuple[Dict[str, np.ndarray], dict]:
+    """
+    Lê as ``colunas`` pedidas (todas, se None). Com ``mmap`` as colunas sem
+    compressão voltam como ``np.memmap`` somente leitura.
+    """
+    with open(caminho, "rb") as f:
+        cab, inicio = _cabecalho(f)
+        info = cab["colunas"]
+        nomes = list(info) if colunas is None else list(colunas)
+        out = {}
+        for nome in nomes:
+            c = info[nome]
+            dt = np.dtype(c["dtype"])
+            pos = inicio + c["offset"]
+            if c["compressao"] is None and mmap:
+                if c["n"] == 0:
+                    out[nome] = np.empty(0, dtype=dt)
+                else:
+                    out[nome] = np.memmap(
+                        caminho, dtype=dt, mode="r", offset=pos, shape=(c["n"],)
+                    )
+                continue
+            f.seek(pos)
+            bruto = f.read(c["bytes"])
+            if c["compressao"] == "zlib":
+                bruto = zlib.decompress(bruto)
+            out[nome] = np.frombuffer(bruto, dtype=dt).copy()
+    return out, cab["meta"]
+
+
+def exportar_csv(
+    caminho: str, destino: Optional[str] = None, colunas: Optional[Iterable[str]] = None
+) -> list[str]:
+    """Conversão para o layout antigo: um ``<coluna>.csv`` (sem cabeçalho) por coluna."""
+    destino = destino or os.path.dirname(os.path.abspath(caminho))
+    os.makedirs(destino, exist_ok=True)
+    dados, _ = ler_colunas(caminho, colunas)
+    arquivos = []
+    for nome, a in dados.items():
+        arq = os.path.join(destino, f"{nome}.csv")
+        fmt = "%.17g" if a.dtype.kind == "f" else "%d"
+        np.savetxt(arq, a, fmt=fmt)
+        arquivos.append(arq)
+    return arquivos
@@ -0,0 +1,157 @@
+"""
+Diário binário de ordens e preços, para reconstruir e reproduzir execuções.
+
+Layout: 8 bytes mágicos ``ABMJRN\\x00\\x01``, uint64 com o tamanho de um
+cabeçalho JSON (parâmetros do mundo) e, em seguida, registros de tamanho fixo
+(``REGISTRO``, 24 bytes):
+
+  - tipo 0: ordem (passo, id do investidor, qtd)
+  - tipo 1: preço formado no passo
+  - tipo 2: ruído sorteado no passo
+  - tipo 3: profundidade efetiva do passo (só com formadores de mercado)
+
+(passo = ciclo, ou o subpasso corrido quando o mundo tem ``subpassos > 1``)
+
+Os registros são acumulados em memória e anexados ao arquivo a cada
+``buffer_bytes`` (e ao fechar/coletar o diário). ``reproduzir`` reexecuta só o
+``atualizar_ambiente`` do mundo a partir do diário, sem chamar investidores:
+com os mesmos parâmetros o caminho de preços é refeito bit a bit; com outros
+(``k_impacto``, ``depth``...) vira uma análise "e se" da regra de preço, com o
+fluxo de ordens mantido fixo.
+"""
+from __future__ import annotations
+import json
+import struct
+import weakref
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+MAGICO = b"ABMJRN\x00\x01"
+REGISTRO = np.dtype(
+    [("ciclo", "<i4"), ("tipo", "<i4"), ("id", "<i8"), ("valor", "<f8")]
+)
+ORDEM, PRECO, RUIDO, PROFUNDIDADE = 0, 1, 2, 3
+
+
+def _despejar(caminho: str, buf: List[bytes]) -> None:
+    if buf:
+        with open(caminho, "ab") as f:
+            f.write(b"".join(buf))
+        buf.clear()
+
+
+class DiarioOrdens:
+    def __init__(
+        self, caminho: str, meta: Optional[dict] = None, buffer_bytes: int = 1 << 22
+    ) -> None:
+        self.caminho = caminho
+        self.buffer_bytes = int(buffer_bytes)
+        cab = json.dumps(meta or {}, ensure_ascii=False, default=float).encode("utf-8")
+        with open(caminho, "wb") as f:
+            f.write(MAGICO)
+            f.write(struct.pack("<Q", len(cab)))
+            f.write(cab)
+        self._buf: List[bytes] = []
+        self._tam = 0
+        # garante o despejo do que restar no buffer mesmo sem fechar()
+        self._fim = weakref.finalize(self, _despejar, caminho, self._buf)
+
+    def gravar_ciclo(
+        self,
+        ciclo: int,
+        ids: np.ndarray,
+        qtd: np.ndarray,
+        preco: float,
+        ruido: float,
+        profundidade: Optional[float] = None,
+    ) -> None:
+        extra = 2 if profundidade is None else 3
+        reg = np.empty(ids.size + extra, dtype=REGISTRO)
+        reg["ciclo"] = ciclo
+        reg["tipo"][:-extra] = ORDEM
+        reg["id"][:-extra] = ids
+        reg["valor"][:-extra] = qtd
+        reg["tipo"][-extra:] = (PRECO, RUIDO, PROFUNDIDADE)[:extra]
+        reg["id"][-extra:] = 0
+        reg["valor"][-extra:] = (preco, ruido, profundidade)[:extra]
+        b = reg.tobytes()
+        self._buf.append(b)
+        self._tam += len(b)
+        if self._tam >= self.buffer_bytes:
+            self.flush()
+
+    def flush(self) -> None:
+        _despejar(self.caminho, self._buf)
+        self._tam = 0
+
+    def fechar(self) -> None:
+        self._fim()
+
+
+def ler_diario(caminho: str) -> Dict[str, Any]:
+    """
+    Lê o diário inteiro (uma leitura + máscaras). Devolve ``meta``, ``ids``,
+    ``qtd`` (ordens em ordem de gravação), ``inicio`` (offset da primeira
+    ordem de cada ciclo, com sentinela final), ``precos``, ``ruidos`` e
+    ``profundidades`` (NaN nos passos sem formadores).
+    """
+    with open(caminho, "rb") as f:
+        if f.read(len(MAGICO)) != MAGICO:
+            raise ValueError("arquivo não é um diário de ordens")
+        (tam,) = struct.unpack("<Q", f.read(8))
+        meta = json.loads(f.read(tam).decode("utf-8"))
+        reg = np.frombuffer(f.read(), dtype=REGISTRO)
+    ordens = reg[reg["tipo"] == ORDEM]
+    precos = reg[reg["tipo"] == PRECO]
+    ruidos = reg[reg["tipo"] == RUIDO]
+    prof = reg[reg["tipo"] == PROFUNDIDADE]
+    n = precos.size
+    inicio = np.searchsorted(ordens["ciclo"], np.arange(n + 1) + (precos["ciclo"][0] if n else 0))
+    profundidades = np.full(n, np.nan)
+    profundidades[np.searchsorted(precos["ciclo"], prof["ciclo"])] = prof["valor"]
+    return {
+        "meta": meta,
+        "ciclos": precos["ciclo"].astype(np.int64),
+        "ids": ordens["id"].copy(),
+        "qtd": ordens["valor"].copy(),
+        "inicio": inicio,
+        "precos": precos["valor"].copy(),
+        "ruidos": ruidos["valor"].copy(),
+        "profundidades": profundidades,
+    }
+
+
+def ordens_do_ciclo(diario: Dict[str, Any], t: int) -> Tuple[np.ndarray, np.ndarray]:
+    """(ids, qtd) do t-ésimo passo gravado — quem moveu o preço naquele passo."""
+    a, b = diario["inicio"][t], diario["inicio"][t + 1]
+    return diario["ids"][a:b], diario["qtd"][a:b]
+
+
+def reproduzir(caminho_ou_diario: Any, mundo: Any = None, **params) -> Any:
+    """
+    Reaplica o diário: para cada passo chama ``mundo.atualizar_ambiente(fluxo=
+    (ids, qtd), ruido=r)`` (``mundo.subpasso`` nos passos que não fecham o
+    ciclo, quando ``subpassos > 1``). A profundidade efetiva gravada pelos
+    formadores é reaplicada, já que eles não estão no mundo reproduzido. Sem ``mundo``, cria um ``MercadoSimples`` com os
+    parâmetros gravados no diário, sobrescritos por ``params``.
+    """
+    d = caminho_ou_diario
+    if not isinstance(d, dict):
+        d = ler_diario(d)
+    if mundo is None:
+        from ..mercados.environments import MercadoSimples
+
+        mundo = MercadoSimples(**{**d["meta"].get("params", {}), **params})
+    elif params:
+        raise ValueError("params só valem quando o mundo é criado a partir do diário")
+    inicio, ids, qtd, ruidos = d["inicio"], d["ids"], d["qtd"], d["ruidos"].tolist()
+    prof = d.get("profundidades")
+    prof = [None] * len(ruidos) if prof is None or np.isnan(prof).all() else prof.tolist()
+    k = int(getattr(mundo, "subpassos", 1))
+    for t, (r, p) in enumerate(zip(ruidos, prof)):
+        a, b = inicio[t], inicio[t + 1]
+        fechar = mundo.atualizar_ambiente if (t + 1) % k == 0 else mundo.subpasso
+        extra = {} if p is None or p != p else {"profundidade": p}
+        fechar(fluxo=(ids[a:b], qtd[a:b]), ruido=r, **extra)
+    return mundo
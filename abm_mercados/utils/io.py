@@ -4,6 +4,8 @@ import pandas as pd
 from datetime import datetime
 from ..core.metrics import painel_estilizados
 
+FORMATOS = ("binario", "csv")
+
 
 def ensure_dir(path: str) -> str:
     os.makedirs(path, exist_ok=True)
@@ -16,18 +18,50 @@ def save_run(
     precos: list[float],
     desequil: list[float],
     extras: dict | None = None,
+    fluxo: dict | None = None,
+    formato: str = "binario",
+    precisao: str = "float64",
+    compressao: str | None = None,
+    meta: dict | None = None,
 ):
+    """
+    Salva séries e métricas de uma execução em ``outdir/<tag>_<timestamp>``.
+
+    ``formato="binario"`` grava tudo num único ``run.abm`` colunar (ver
+    ``utils.colunar``; ``exportar_csv`` converte para CSV); ``formato="csv"``
+    mantém o layout antigo (um CSV por série). ``metricas.json`` é sempre gravado.
+    """
+    if formato not in FORMATOS:
+        raise ValueError(f"formato desconhecido: {formato!r} (use um de {FORMATOS})")
     ts = datetime.now().strftime("%Y%m%d-%H%M%S")
     pasta = ensure_dir(os.path.join(outdir, f"{tag}_{ts}"))
-    pd.Series(precos).to_csv(
-        os.path.join(pasta, "precos.csv"), index=False, header=False
-    )
-    pd.Series(desequil).to_csv(
-        os.path.join(pasta, "desequilibrio.csv"), index=False, header=False
-    )
-    met = painel_estilizados(precos)
+    met = painel_estilizados(precos, fluxo)
     if extras:
         met.update(extras)
+    if formato == "binario":
+        from .colunar import salvar_colunas
+
+        colunas = {"precos": precos, "desequilibrio": desequil}
+        for k, v in (fluxo or {}).items():
+            colunas.setdefault(k, v)
+        salvar_colunas(
+            os.path.join(pasta, "run.abm"),
+            colunas,
+            meta={"tag": tag, "metricas": met, **(meta or {})},
+            precisao=precisao,
+            compressao=compressao,
+        )
+    else:
+        pd.Series(precos).to_csv(
+            os.path.join(pasta, "precos.csv"), index=False, header=False
+        )
+        pd.Series(desequil).to_csv(
+            os.path.join(pasta, "desequilibrio.csv"), index=False, header=False
+        )
+        if fluxo:
+            pd.DataFrame(fluxo).to_csv(
+                os.path.join(pasta, "microestrutura.csv"), index=False
+            )
     with open(os.path.join(pasta, "metricas.json"), "w", encoding="utf-8") as f:
         json.dump(met, f, ensure_ascii=False, indent=2)
     return met, pasta
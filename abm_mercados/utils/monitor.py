@@ -0,0 +1,199 @@
+"""
+Métricas ao vivo de uma simulação longa, no formato texto do Prometheus.
+
+O laço só paga um callback ``on_step_end`` que atualiza contadores próprios
+(ordens acumuladas, somas dos retornos log numa janela circular) e troca uma
+tupla imutável com eles por referência: a atribuição é atômica, sem trava.
+Uma thread de fundo lê só esse retrato a cada ``intervalo`` segundos (nunca
+as listas vivas do mundo), calcula ciclos/s, volatilidade móvel e memória do
+processo, e publica o texto pronto, que um servidor HTTP local (outra thread)
+apenas devolve em ``/metrics``.
+"""
+from __future__ import annotations
+import math
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, Optional, Tuple
+
+_METRICAS = (
+    ("abm_ciclos_total", "counter", "Ciclos simulados."),
+    ("abm_ciclos_por_segundo", "gauge", "Ciclos por segundo desde a amostra anterior."),
+    ("abm_preco", "gauge", "Preço corrente."),
+    ("abm_volatilidade", "gauge", "Desvio-padrão dos retornos log na janela móvel."),
+    ("abm_ordens_ciclo", "gauge", "Ordens no último ciclo."),
+    ("abm_ordens_total", "counter", "Ordens desde o início."),
+    ("abm_memoria_rss_bytes", "gauge", "Memória residente do processo."),
+    ("abm_memoria_pico_bytes", "gauge", "Pico de memória residente do processo."),
+)
+
+
+def _rss() -> Tuple[float, float]:
+    try:
+        import resource  # só POSIX
+    except ImportError:
+        return math.nan, math.nan
+    pico = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024.0  # KiB no Linux
+    try:
+        with open("/proc/self/statm") as f:
+            atual = int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError):
+        atual = pico
+    return float(atual), pico
+
+
+def _volatilidade(s1: float, s2: float, n: int) -> float:
+    if n < 2:
+        return math.nan
+    return math.sqrt(max(0.0, (s2 - s1 * s1 / n) / (n - 1)))
+
+
+class MonitorMetricas:
+    """
+    Exportador de métricas de ``mundo``. ``porta=0`` (padrão) escolhe uma porta
+    livre (ver ``endereco``); ``porta=None`` não sobe HTTP (só ``texto()``).
+    Use ``ligar()``/``parar()`` ou ``with MonitorMetricas(mundo): ...``.
+    """
+
+    def __init__(
+        self,
+        mundo: Any,
+        porta: Optional[int] = 0,
+        host: str = "127.0.0.1",
+        intervalo: float = 1.0,
+        janela_vol: int = 50,
+    ) -> None:
+        self.mundo = mundo
+        self.porta = porta
+        self.host = host
+        self.intervalo = float(intervalo)
+        self.janela_vol = int(janela_vol)
+        self._h_ordens = getattr(mundo, "h_n_ordens", None)
+        # estado do amostrador (só a thread da simulação escreve)
+        self._ordens_total = 0
+        self._ultimo_preco = float(getattr(mundo, "preco", math.nan))
+        self._janela = [0.0] * max(1, self.janela_vol)
+        self._pos = self._n_ret = 0
+        self._s1 = self._s2 = 0.0
+        # (ciclo, preço, ordens do ciclo, ordens acumuladas, soma r, soma r², n)
+        self._retrato: Optional[Tuple[int, float, int, int, float, float, int]] = None
+        self._texto = ""
+        self._anterior: Optional[Tuple[float, int]] = None
+        self._parar = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._servidor: Optional[ThreadingHTTPServer] = None
+
+    # --- caminho quente: só troca a referência do retrato ---
+    def _amostrar(self, mundo: Any) -> None:
+        h = self._h_ordens
+        n_ordens = h[-1] if h else 0
+        self._ordens_total += n_ordens
+        preco = mundo.preco
+        if preco > 0.0 and self._ultimo_preco > 0.0:
+            r = math.log(preco / self._ultimo_preco)
+            j = self._pos
+            velho = self._janela[j] if self._n_ret == len(self._janela) else 0.0
+            self._janela[j] = r
+            self._s1 += r - velho
+            self._s2 += r * r - velho * velho
+            self._n_ret = min(self._n_ret + 1, len(self._janela))
+            self._pos = j = (j + 1) % len(self._janela)
+            if j == 0:  # a cada volta, refaz as somas (sem deriva numérica)
+                self._s1 = sum(self._janela)
+                self._s2 = sum(x * x for x in self._janela)
+        self._ultimo_preco = preco
+        self._retrato = (
+            mundo.ciclo, preco, n_ordens, self._ordens_total, self._s1, self._s2, self._n_ret
+        )
+
+    # --- thread de fundo ---
+    def _atualizar(self) -> Dict[str, float]:
+        """Agrega o retrato atual e republica o texto (só a thread de fundo chama)."""
+        retrato = self._retrato
+        agora = time.perf_counter()
+        if retrato is None:
+            retrato = (0, math.nan, 0, 0, 0.0, 0.0, 0)
+        ciclo, preco, n_ordens, ordens_total, s1, s2, n_ret = retrato
+        taxa = math.nan
+        if self._anterior is not None and agora > self._anterior[0]:
+            t0, c0 = self._anterior
+            taxa = (ciclo - c0) / (agora - t0)
+        self._anterior = (agora, ciclo)
+        rss, pico = _rss()
+        valores = {
+            "abm_ciclos_total": float(ciclo),
+            "abm_ciclos_por_segundo": taxa,
+            "abm_preco": float(preco),
+            "abm_volatilidade": _volatilidade(s1, s2, n_ret),
+            "abm_ordens_ciclo": float(n_ordens),
+            "abm_ordens_total": float(ordens_total),
+            "abm_memoria_rss_bytes": rss,
+            "abm_memoria_pico_bytes": pico,
+        }
+        linhas = []
+        for nome, tipo, ajuda in _METRICAS:
+            linhas += [f"# HELP {nome} {ajuda}", f"# TYPE {nome} {tipo}", f"{nome} {valores[nome]!r}"]
+        self._texto = "\n".join(linhas) + "\n"
+        return valores
+
+    def texto(self) -> str:
+        return self._texto
+
+    def _laco(self) -> None:
+        self._atualizar()
+        while not self._parar.wait(self.intervalo):
+            self._atualizar()
+        self._atualizar()  # retrato final, já sem o callback
+
+    @property
+    def endereco(self) -> Optional[Tuple[str, int]]:
+        return self._servidor.server_address[:2] if self._servidor else None
+
+    def ligar(self) -> "MonitorMetricas":
+        self.mundo.on_step_end(self._amostrar)
+        self._parar.clear()
+        self._thread = threading.Thread(target=self._laco, name="abm-monitor", daemon=True)
+        self._thread.start()
+        if self.porta is not None:
+            monitor = self
+
+            class _Handler(BaseHTTPRequestHandler):
+                def do_GET(self):
+                    if self.path.split("?")[0] not in ("/", "/metrics"):
+                        self.send_error(404)
+                        return
+                    corpo = monitor.texto().encode("utf-8")
+                    self.send_response(200)
+                    self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+                    self.send_header("Content-Length", str(len(corpo)))
+                    self.end_headers()
+                    self.wfile.write(corpo)
+
+                def log_message(self, *args):  # sem log por requisição
+                    pass
+
+            self._servidor = ThreadingHTTPServer((self.host, int(self.porta)), _Handler)
+            threading.Thread(
+                target=self._servidor.serve_forever, name="abm-monitor-http", daemon=True
+            ).start()
+        return self
+
+    def parar(self) -> None:
+        try:
+            self.mundo._on_step_end.remove(self._amostrar)
+        except ValueError:
+            pass
+        self._parar.set()
+        if self._thread is not None:
+            self._thread.join()
+        if self._servidor is not None:
+            self._servidor.shutdown()
+            self._servidor.server_close()
+            self._servidor = None
+
+    def __enter__(self) -> "MonitorMetricas":
+        return self.ligar()
+
+    def __exit__(self, *exc) -> None:
+        self.parar()
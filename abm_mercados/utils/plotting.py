@@ -1,14 +1,177 @@
-import matplotlib.pyplot as plt
+"""
+Gráficos das execuções.
 
+``salvar_serie``/``plot_leque`` desenham direto num ``Figure`` com canvas Agg
+(sem pyplot, sem janela), então funcionam em workers headless e em processos
+paralelos (``renderizar_lote``). Séries longas passam antes por ``decimar``:
+por faixa de pixels só o mínimo e o máximo importam para o traço.
+"""
+from __future__ import annotations
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Iterable, Optional, Sequence, Tuple
+
+import numpy as np
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+
+
+def decimar(y, n_max: int = 4000):
+    """
+    Reduz ``y`` a no máximo ~``n_max`` pontos mantendo mínimo e máximo de cada
+    faixa (na ordem em que ocorrem). Devolve (x, y) prontos para ``plot``.
+    """
+    y = np.asarray(y, dtype=float)
+    n = y.size
+    if n <= n_max:
+        return np.arange(n), y
+    tam = -(-n // max(1, n_max // 2))
+    nb = -(-n // tam)
+    pad = nb * tam - n
+    yp = np.concatenate([y, np.full(pad, np.nan)]).reshape(nb, tam)
+    vazio = np.isnan(yp)  # preenchimento (e NaNs da série) nunca é escolhido
+    imin = np.where(vazio, np.inf, yp).argmin(axis=1)
+    imax = np.where(vazio, -np.inf, yp).argmax(axis=1)
+    base = np.arange(nb) * tam
+    idx = np.sort(np.stack([base + imin, base + imax], axis=1), axis=1).ravel()
+    return idx, y[idx]
+
+
+def _figura(largura: float = 10, altura: float = 5):
+    fig = Figure(figsize=(largura, altura))
+    FigureCanvasAgg(fig)
+    return fig, fig.add_subplot(111)
+
+
+def salvar_serie(
+    arquivo: str,
+    y,
+    titulo: str = "",
+    ylabel: str = "",
+    n_max: int = 4000,
+    dpi: int = 120,
+) -> str:
+    """Desenha uma série (decimada) e grava em ``arquivo`` sem passar por pyplot."""
+    fig, ax = _figura()
+    x, yd = decimar(y, n_max)
+    ax.plot(x, yd, lw=0.8)
+    ax.set_title(titulo)
+    ax.set_xlabel("ciclo")
+    ax.set_ylabel(ylabel)
+    fig.tight_layout()
+    fig.savefig(arquivo, dpi=dpi)
+    return arquivo
+
+
+def _decimar_leque(q: np.ndarray, n_max: int) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Reduz os percentis (k x tempo) a no máximo ``n_max`` colunas pelo envelope
+    externo de cada faixa: mínimo nas k // 2 linhas de baixo, máximo nas k // 2
+    de cima e média só na mediana (linha do meio, com k ímpar).
+    """
+    k, t = q.shape
+    if t <= n_max:
+        return np.arange(t), q
+    tam = -(-t // n_max)
+    nb = -(-t // tam)
+    pad = nb * tam - t
+    qp = np.concatenate([q, np.repeat(q[:, -1:], pad, axis=1)], axis=1)
+    qp = qp.reshape(k, nb, tam)
+    m = k // 2
+    q = np.concatenate(
+        [qp[:m].min(axis=2), qp[m : k - m].mean(axis=2), qp[k - m :].max(axis=2)]
+    )
+    return np.arange(nb) * tam, q
+
+
+def plot_leque(
+    arquivo: str,
+    precos,
+    percentis: Sequence[float] = (5, 25, 50, 75, 95),
+    titulo: str = "Ensemble",
+    ylabel: str = "preço",
+    n_max: int = 2000,
+    dpi: int = 120,
+) -> str:
+    """
+    Gráfico em leque de um ensemble (réplicas x tempo): faixas entre percentis
+    simétricos e a mediana, calculados de uma vez sobre o array empilhado.
+    """
+    P = np.atleast_2d(np.asarray(precos, dtype=float))
+    q = np.percentile(P, percentis, axis=0)  # (len(percentis), tempo)
+    x, q = _decimar_leque(q, n_max)
+
+    fig, ax = _figura()
+    k = len(percentis)
+    for i in range(k // 2):
+        ax.fill_between(
+            x,
+            q[i],
+            q[k - 1 - i],
+            alpha=0.15 + 0.2 * i,
+            color="C0",
+            lw=0,
+            label=f"p{percentis[i]:g}–p{percentis[k - 1 - i]:g}",
+        )
+    if k % 2:
+        ax.plot(x, q[k // 2], color="C0", lw=1.0, label=f"p{percentis[k // 2]:g}")
+    ax.set_title(f"{titulo} ({P.shape[0]} réplicas)")
+    ax.set_xlabel("ciclo")
+    ax.set_ylabel(ylabel)
+    ax.legend(loc="best", fontsize=8)
+    fig.tight_layout()
+    fig.savefig(arquivo, dpi=dpi)
+    return arquivo
+
+
+def _renderizar(tarefa: dict) -> str:
+    tarefa = dict(tarefa)
+    tipo = tarefa.pop("tipo", "serie")
+    if tipo == "serie":
+        return salvar_serie(**tarefa)
+    if tipo == "leque":
+        return plot_leque(**tarefa)
+    raise ValueError(f"tipo de gráfico desconhecido: {tipo!r}")
+
+
+def renderizar_lote(
+    tarefas: Iterable[dict], processos: Optional[int] = None
+) -> list[str]:
+    """
+    Renderiza muitos gráficos em paralelo. Cada tarefa é um dict com
+    ``tipo`` ("serie" ou "leque") e os argumentos da função correspondente.
+    """
+    tarefas = list(tarefas)
+    if processos == 1 or len(tarefas) <= 1:
+        return [_renderizar(t) for t in tarefas]
+    with ProcessPoolExecutor(max_workers=processos) as pool:
+        return list(pool.map(_renderizar, tarefas, chunksize=4))
+
+
+def plot_series(precos, desequil, titulo="Mercado", pasta: Optional[str] = None):
+    """
+    Com ``pasta``: grava ``precos.png`` e ``desequilibrio.png`` (headless).
+    Sem ``pasta``: abre as janelas do pyplot como antes (séries decimadas).
+    """
+    if pasta is not None:
+        return [
+            salvar_serie(os.path.join(pasta, "precos.png"), precos, f"Preços - {titulo}", "preço"),
+            salvar_serie(
+                os.path.join(pasta, "desequilibrio.png"),
+                desequil,
+                f"Desequilíbrio - {titulo}",
+                "qtd",
+            ),
+        ]
+    import matplotlib.pyplot as plt
 
-def plot_series(precos, desequil, titulo="Mercado"):
     plt.figure(figsize=(10, 5))
-    plt.plot(precos)
+    plt.plot(*decimar(precos))
     plt.title(f"Preços - {titulo}")
     plt.xlabel("ciclo")
     plt.ylabel("preço")
     plt.figure(figsize=(10, 5))
-    plt.plot(desequil)
+    plt.plot(*decimar(desequil))
     plt.title(f"Desequilíbrio - {titulo}")
     plt.xlabel("ciclo")
     plt.ylabel("qtd")
@@ -0,0 +1,198 @@
+"""
+Armazém local de execuções, endereçado pelo conteúdo.
+
+Cada execução é identificada por ``sha256(config resolvida + versão + seed)``;
+os arquivos ficam em ``<raiz>/objetos/<chave>/`` e um índice SQLite guarda as
+métricas (uma linha por métrica numérica), o que permite reaproveitar execuções
+idênticas e filtrar varreduras por valor de métrica.
+"""
+from __future__ import annotations
+import hashlib
+import json
+import os
+import shutil
+import sqlite3
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from .io import ensure_dir, save_run
+
+OPERADORES = ("<", "<=", ">", ">=", "=", "!=")
+
+
+def chave_execucao(cfg: dict, versao: str, seed: Any = None) -> str:
+    """Hash estável (ordem das chaves não importa) da configuração resolvida."""
+    bruto = json.dumps(
+        {"config": cfg, "versao": versao, "seed": seed},
+        sort_keys=True,
+        ensure_ascii=False,
+        default=str,
+    )
+    return hashlib.sha256(bruto.encode("utf-8")).hexdigest()
+
+
+def _tamanho(pasta: str) -> int:
+    total = 0
+    for raiz, _, arquivos in os.walk(pasta):
+        for a in arquivos:
+            total += os.path.getsize(os.path.join(raiz, a))
+    return total
+
+
+class ArmazemResultados:
+    def __init__(self, raiz: str = "./outputs/.armazem") -> None:
+        self.raiz = ensure_dir(raiz)
+        self.objetos = ensure_dir(os.path.join(raiz, "objetos"))
+        self.db = sqlite3.connect(os.path.join(raiz, "indice.sqlite"))
+        self.db.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS execucoes (
+                chave TEXT PRIMARY KEY, tag TEXT, caminho TEXT, config TEXT,
+                criado REAL, acessado REAL, bytes INTEGER
+            );
+            CREATE TABLE IF NOT EXISTS metricas (
+                chave TEXT, nome TEXT, valor REAL, PRIMARY KEY (chave, nome)
+            );
+            CREATE INDEX IF NOT EXISTS ix_metricas ON metricas (nome, valor);
+            """
+        )
+
+    def fechar(self) -> None:
+        self.db.close()
+
+    def buscar(self, chave: str) -> Optional[Tuple[dict, str]]:
+        """(métricas, pasta) de uma execução já armazenada, ou None."""
+        lin = self.db.execute(
+            "SELECT caminho FROM execucoes WHERE chave = ?", (chave,)
+        ).fetchone()
+        if lin is None:
+            return None
+        pasta = lin[0]
+        arq = os.path.join(pasta, "metricas.json")
+        if not os.path.exists(arq):  # removida por fora: esquece a entrada
+            self._remover(chave)
+            return None
+        with self.db:
+            self.db.execute(
+                "UPDATE execucoes SET acessado = ? WHERE chave = ?",
+                (time.time(), chave),
+            )
+        with open(arq, "r", encoding="utf-8") as f:
+            return json.load(f), pasta
+
+    def gravar(
+        self,
+        chave: str,
+        cfg: dict,
+        tag: str,
+        precos: list[float],
+        desequil: list[float],
+        **kw,
+    ) -> Tuple[dict, str]:
+        """Salva via ``save_run`` dentro do armazém e indexa as métricas."""
+        destino = os.path.join(self.objetos, chave)
+        if os.path.isdir(destino):
+            shutil.rmtree(destino)
+        kw.setdefault("meta", {"config": cfg})
+        met, pasta = save_run(tag, ensure_dir(destino), precos, desequil, **kw)
+        agora = time.time()
+        numericas = [
+            (chave, k, float(v))
+            for k, v in met.items()
+            if isinstance(v, (int, float)) and not isinstance(v, bool)
+        ]
+        with self.db:
+            self.db.execute("DELETE FROM metricas WHERE chave = ?", (chave,))
+            self.db.execute(
+                "INSERT OR REPLACE INTO execucoes VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (
+                    chave,
+                    tag,
+                    pasta,
+                    json.dumps(cfg, sort_keys=True, default=str),
+                    agora,
+                    agora,
+                    _tamanho(destino),
+                ),
+            )
+            self.db.executemany("INSERT INTO metricas VALUES (?, ?, ?)", numericas)
+        return met, pasta
+
+    def consultar(self, **filtros: Tuple[str, float]) -> List[Dict[str, Any]]:
+        """
+        Execuções cujas métricas satisfazem todos os filtros, ex.:
+        ``consultar(curtose=(">", 3.0), vol_diaria=("<=", 0.01))``.
+        """
+        sql = "SELECT e.chave, e.tag, e.caminho, e.config FROM execucoes e"
+        args: list = []
+        for i, (nome, (op, valor)) in enumerate(filtros.items()):
+            if op not in OPERADORES:
+                raise ValueError(f"operador inválido: {op!r}")
+            sql += (
+                f" JOIN metricas m{i} ON m{i}.chave = e.chave"
+                f" AND m{i}.nome = ? AND m{i}.valor {op} ?"
+            )
+            args += [nome, float(valor)]
+        sql += " ORDER BY e.criado"
+        out = []
+        for chave, tag, caminho, config in self.db.execute(sql, args).fetchall():
+            met = dict(
+                self.db.execute(
+                    "SELECT nome, valor FROM metricas WHERE chave = ?", (chave,)
+                ).fetchall()
+            )
+            out.append(
+                {
+                    "chave": chave,
+                    "tag": tag,
+                    "pasta": caminho,
+                    "config": json.loads(config),
+                    "metricas": met,
+                }
+            )
+        return out
+
+    def atualizar_tamanho(self, chave: str) -> int:
+        """Remede a pasta da execução (ex.: após gravar gráficos nela)."""
+        b = _tamanho(os.path.join(self.objetos, chave))
+        with self.db:
+            self.db.execute(
+                "UPDATE execucoes SET bytes = ? WHERE chave = ?", (b, chave)
+            )
+        return b
+
+    def evictar(
+        self,
+        max_bytes: Optional[int] = None,
+        max_idade_s: Optional[float] = None,
+        manter: Optional[str] = None,
+    ) -> int:
+        """
+        Remove execuções mais antigas que ``max_idade_s`` (pelo último acesso) e,
+        se ainda passar de ``max_bytes``, as menos acessadas recentemente. A
+        execução ``manter`` (ex.: a que acabou de ser gravada) nunca é removida,
+        mas conta no total. Devolve quantas foram removidas.
+        """
+        linhas = self.db.execute(
+            "SELECT chave, acessado, bytes FROM execucoes ORDER BY acessado"
+        ).fetchall()
+        agora = time.time()
+        total = sum(b for *_, b in linhas)
+        removidas = 0
+        for chave, acessado, b in linhas:
+            if chave == manter:
+                continue
+            velha = max_idade_s is not None and agora - acessado > max_idade_s
+            excesso = max_bytes is not None and total > max_bytes
+            if not (velha or excesso):
+                continue
+            self._remover(chave)
+            total -= b
+            removidas += 1
+        return removidas
+
+    def _remover(self, chave: str) -> None:
+        shutil.rmtree(os.path.join(self.objetos, chave), ignore_errors=True)
+        with self.db:
+            self.db.execute("DELETE FROM execucoes WHERE chave = ?", (chave,))
+            self.db.execute("DELETE FROM metricas WHERE chave = ?", (chave,))
@@ -1,6 +1,16 @@
 from __future__ import annotations
-from ..core.metrics import painel_estilizados
+from ..core.metrics import painel_estilizados, retornos_log
+from .recurrence import analise_recorrencia
 
 
-def validar_fatos(precos: list[float]) -> dict:
-    return painel_estilizados(precos)
+def validar_fatos(precos: list[float], recorrencia: bool | dict = False) -> dict:
+    """
+    Painel de fatos estilizados; com ``recorrencia`` (True ou dict de parâmetros
+    de ``analise_recorrencia``) acrescenta a RQA dos retornos como chaves ``rqa_*``.
+    """
+    met = painel_estilizados(precos)
+    if recorrencia and met:
+        params = recorrencia if isinstance(recorrencia, dict) else {}
+        rqa = analise_recorrencia(retornos_log(precos), **params)
+        met.update({f"rqa_{k}": v for k, v in rqa.items() if k != "n"})
+    return met
@@ -1,3 +1,221 @@
-# placeholder para RP (pode integrar pyunicorn/pyts no futuro)
+"""
+Gráfico de recorrência (RP) e análise quantitativa de recorrência (RQA).
+
+A matriz R[i, j] = ||x_i - x_j|| <= eps nunca é materializada: ela é varrida
+em blocos de ``bloco x bloco`` e só os comprimentos de linhas (diagonais e
+verticais) são acumulados em histogramas. A memória fica em O(bloco² + N),
+então séries de 1e5 pontos cabem facilmente (o tempo continua O(N²)).
+"""
+from __future__ import annotations
+from typing import Optional
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+
+def embutir(serie, dim: int = 1, atraso: int = 1) -> np.ndarray:
+    """Imersão por atraso temporal: linha t = (x_t, x_{t+atraso}, ..., x_{t+(dim-1)atraso})."""
+    x = np.asarray(serie, dtype=float)
+    n = x.size - (dim - 1) * atraso
+    if n <= 0:
+        raise ValueError("série curta demais para dim/atraso pedidos")
+    return np.stack([x[k * atraso : k * atraso + n] for k in range(dim)], axis=1)
+
+
+def _dist(a: np.ndarray, b: np.ndarray, norma: str) -> np.ndarray:
+    """Distância entre pontos imersos com broadcasting (última dim = coordenadas)."""
+    d = np.abs(a - b)
+    if norma == "max":
+        return d.max(axis=-1)
+    if norma == "euclidiana":
+        return np.sqrt((d * d).sum(axis=-1))
+    raise ValueError(f"norma desconhecida: {norma!r}")
+
+
+def _recorre(cols_a, cols_b, eps: float, norma: str) -> np.ndarray:
+    """R = dist <= eps, coordenada a coordenada (blocos 2D contíguos são bem mais rápidos)."""
+    acc = None
+    for a, b in zip(cols_a, cols_b):
+        t = a - b
+        if norma == "max":
+            np.abs(t, out=t)
+            acc = t if acc is None else np.maximum(acc, t, out=acc)
+        else:
+            t *= t
+            acc = t if acc is None else np.add(acc, t, out=acc)
+    return acc <= (eps if norma == "max" else eps * eps)
+
+
+def limiar_por_taxa(
+    x: np.ndarray,
+    taxa: float = 0.05,
+    theiler: int = 1,
+    norma: str = "max",
+    amostra: int = 200_000,
+    seed: int = 0,
+) -> float:
+    """Escolhe eps para uma taxa de recorrência alvo via quantil de pares sorteados."""
+    n = x.shape[0]
+    rng = np.random.default_rng(seed)
+    i = rng.integers(0, n, size=amostra)
+    j = rng.integers(0, n, size=amostra)
+    ok = np.abs(i - j) >= theiler
+    return float(np.quantile(_dist(x[i[ok]], x[j[ok]], norma), taxa))
+
+
+def _somar(hist: np.ndarray, comp: np.ndarray) -> None:
+    if comp.size:
+        b = np.bincount(comp)
+        hist[: b.size] += b
+
+
+def _corridas(R: np.ndarray, carry: np.ndarray, hist: np.ndarray) -> np.ndarray:
+    """
+    Acumula em ``hist`` as corridas de True ao longo do eixo 0 de R (B x C).
+    ``carry[c]`` é o comprimento da corrida que chega do bloco anterior na coluna c;
+    corridas que tocam a última linha não são fechadas e viram o novo carry.
+    """
+    B, C = R.shape
+    P = np.zeros((C, B + 2), dtype=bool)
+    P[:, 1:-1] = R.T
+    # cada linha começa e termina em False => transições alternam início/fim
+    trans = np.flatnonzero(P[:, 1:] != P[:, :-1])
+    ini, fim = trans[0::2], trans[1::2]
+    col = ini // (B + 1)
+    comp = fim - ini
+    comp += np.where(ini % (B + 1) == 0, carry[col], 0)
+
+    # corridas do bloco anterior que terminaram exatamente na fronteira
+    _somar(hist, carry[~R[0] & (carry > 0)])
+
+    aberta = fim % (B + 1) == B
+    novo = np.zeros_like(carry)
+    novo[col[aberta]] = comp[aberta]
+    _somar(hist, comp[~aberta])
+    return novo
+
+
+def _medidas(hist: np.ndarray, minimo: int):
+    comp = np.arange(hist.size)
+    pontos = float((comp * hist).sum())
+    longas = comp >= minimo
+    pontos_longos = float((comp[longas] * hist[longas]).sum())
+    n_longas = float(hist[longas].sum())
+    razao = pontos_longos / pontos if pontos > 0 else np.nan
+    media = pontos_longos / n_longas if n_longas > 0 else np.nan
+    maximo = int(np.flatnonzero(hist)[-1]) if hist.any() else 0
+    return pontos, razao, media, maximo
+
+
+def analise_recorrencia(
+    serie,
+    dim: int = 3,
+    atraso: int = 1,
+    eps: Optional[float] = None,
+    taxa: float = 0.05,
+    lmin: int = 2,
+    vmin: int = 2,
+    theiler: int = 1,
+    norma: str = "max",
+    bloco: int = 512,
+) -> dict:
+    """
+    RQA de uma série (tipicamente retornos de ``h_preco``).
+
+    Se ``eps`` não for dado, é escolhido para que a taxa de recorrência fique
+    perto de ``taxa``. ``theiler`` exclui pares com |i - j| < theiler (1 = só a
+    diagonal principal). Retorna:
+      rr (taxa de recorrência), det (determinismo), l_medio, l_max,
+      lam (laminaridade), tt (tempo de aprisionamento), v_max e o eps usado.
+    """
+    x = embutir(serie, dim, atraso)
+    n = x.shape[0]
+    if n <= theiler:
+        return {"n": int(n), "eps": eps, "rr": np.nan, "det": np.nan, "lam": np.nan}
+    if norma not in ("max", "euclidiana"):
+        raise ValueError(f"norma desconhecida: {norma!r}")
+    if eps is None:
+        eps = limiar_por_taxa(x, taxa, theiler, norma)
+    bloco = max(1, int(bloco))
+
+    # coordenadas contíguas; a versão estendida com +inf faz pares fora da matriz não recorrerem
+    xc = np.ascontiguousarray(x.T)
+    xe = np.hstack([xc, np.full((xc.shape[0], n + bloco), np.inf)])
+    # norma do máximo: R_dim[i, j] = AND_d R_1[i + d*atraso, j + d*atraso], então basta
+    # comparar a série escalar uma vez por bloco e deslocar (bem mais barato que dim passes)
+    escalar = norma == "max"
+    if escalar:
+        s1 = np.asarray(serie, dtype=float)
+        s1e = np.concatenate([s1, np.full(n + bloco, np.inf)])
+        desl = [k * atraso for k in range(dim)]
+        folga = desl[-1]
+
+    hist_diag = np.zeros(n + 1, dtype=np.int64)
+    hist_vert = np.zeros(n + 1, dtype=np.int64)
+    carry_diag = np.zeros(n, dtype=np.int64)  # por deslocamento k = j - i
+    carry_vert = np.zeros(n, dtype=np.int64)  # por coluna j
+
+    for a in range(0, n, bloco):
+        b = min(a + bloco, n)
+        xi = [c[a:b, None] for c in xc]
+        carry_horiz = np.zeros(b - a, dtype=np.int64)  # por linha i do bloco
+
+        # diagonais: coordenadas cisalhadas (i, k) com j = i + k; corridas ao longo de i
+        for c0 in range(theiler, n - a, bloco):
+            c1 = min(c0 + bloco, n)
+            w = c1 - c0
+            if escalar:
+                h = b - a + folga
+                jan = sliding_window_view(s1e[a + c0 : a + c0 + h + w - 1], w)
+                R1 = np.abs(jan - s1[a : a + h, None]) <= eps
+                R = R1[: b - a].copy()
+                for dd in desl[1:]:
+                    R &= R1[dd : dd + b - a]
+            else:
+                jan = [sliding_window_view(c[a + c0 : b + c1 - 1], w) for c in xe]
+                R = _recorre(xi, jan, eps, norma)
+            carry_diag[c0:c1] = _corridas(R, carry_diag[c0:c1], hist_diag)
+
+        # verticais: triângulo superior (colunas j >= i + theiler); as linhas
+        # horizontais daí são as verticais espelhadas do triângulo inferior
+        for c0 in range(a, n, bloco):
+            c1 = min(c0 + bloco, n)
+            if c1 - 1 < a + theiler:
+                continue
+            if escalar:
+                R1 = (
+                    np.abs(s1[None, c0 : c1 + folga] - s1[a : b + folga, None]) <= eps
+                )
+                R = R1[: b - a, : c1 - c0].copy()
+                for dd in desl[1:]:
+                    R &= R1[dd : dd + b - a, dd : dd + c1 - c0]
+            else:
+                R = _recorre(xi, [c[None, c0:c1] for c in xc], eps, norma)
+            if c0 < b - 1 + theiler:  # bloco encosta na janela de Theiler
+                R &= (np.arange(c0, c1)[None, :] - np.arange(a, b)[:, None]) >= theiler
+            carry_vert[c0:c1] = _corridas(R, carry_vert[c0:c1], hist_vert)
+            carry_horiz = _corridas(R.T, carry_horiz, hist_vert)
+        _somar(hist_vert, carry_horiz[carry_horiz > 0])
+
+    _somar(hist_diag, carry_diag[carry_diag > 0])
+    _somar(hist_vert, carry_vert[carry_vert > 0])
+
+    pares = (n - theiler) * (n - theiler + 1) // 2  # pares no triângulo superior
+    pontos, det, l_medio, l_max = _medidas(hist_diag, lmin)
+    _, lam, tt, v_max = _medidas(hist_vert, vmin)
+    return {
+        "n": int(n),
+        "eps": float(eps),
+        "rr": pontos / pares,
+        "det": det,
+        "l_medio": l_medio,
+        "l_max": l_max,
+        "lam": lam,
+        "tt": tt,
+        "v_max": v_max,
+    }
+
+
 def dummy_recurrence_score(series):
-    return {"rp_density": None}
+    # mantido por compatibilidade; agora devolve a densidade real do RP
+    return {"rp_density": analise_recorrencia(series, dim=1)["rr"]}
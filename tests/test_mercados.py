@@ -0,0 +1,977 @@
+import asyncio
+import os
+import shutil
+import tempfile
+import unittest
+
+import numpy as np
+
+from abm_mercados import (
+    InvestidorBase,
+    Simulacao,
+    intervalos_bootstrap,
+    painel_estilizados,
+    painel_estilizados_lote,
+)
+from abm_mercados.core.custos import Corretagem, SlippageRaiz, TaxaFixa, criar_custos
+from abm_mercados.core.ledger import LivroRazao
+from abm_mercados.core.risco import MotorRisco
+from abm_mercados.mercados.environments import MercadoSimples
+from abm_mercados.mercados.fundamental import ProcessoFundamental
+from abm_mercados.mercados.historico import (
+    CatalogoHistorico,
+    FonteHistorica,
+    MercadoHistorico,
+    converter_abm,
+)
+from abm_mercados.mercados.lote import MercadoLote, MersenneLote
+from abm_mercados.mercados.precos import REGRAS, ClearingWalras, criar_regra
+from abm_mercados.mercados.rede import RedeSocial, livre_escala, mundo_pequeno
+from abm_mercados.core.metrics import acf, acf_retornos, painel_microestrutura
+from abm_mercados.investidores.formador import CoorteFormadores, InvestidorFormador
+from abm_mercados.investidores.fundamentalista import InvestidorFundamentalista
+from abm_mercados.investidores.populacao import gerar_populacao
+from abm_mercados.investidores.ruido import InvestidorRuido
+from abm_mercados.investidores.tecnico import InvestidorTendencia
+from abm_mercados.utils.diario import ler_diario, ordens_do_ciclo, reproduzir
+from abm_mercados.utils.colunar import (
+    exportar_csv,
+    ler_colunas,
+    ler_meta,
+    salvar_colunas,
+)
+from abm_mercados.utils.io import save_run
+from abm_mercados.utils.monitor import MonitorMetricas
+from abm_mercados.core.emulador import Emulador, ProcessoGaussiano
+from abm_mercados.core.sensibilidade import morris, sobol, tabela_sensibilidade
+from abm_mercados.utils.plotting import _decimar_leque, decimar, renderizar_lote
+from abm_mercados.utils.store import ArmazemResultados, chave_execucao
+from abm_mercados.validations.facts import validar_fatos
+from abm_mercados.validations.recurrence import analise_recorrencia, embutir
+
+
+def criar_mercado(seed=7, **kw):
+    """Mercado FII de referência: 15 fundamentalistas, 10 ruído, 5 tendência."""
+    mundo = MercadoSimples(seed=seed, dy_anual=0.10, **kw)
+    base_vals = [95, 105, 115, 125, 135]
+    for i in range(15):
+        mundo.adicionar_investidor(
+            InvestidorFundamentalista(i, valor_intrinseco=base_vals[i % 5])
+        )
+    for j in range(10):
+        mundo.adicionar_investidor(InvestidorRuido(100 + j))
+    for j in range(5):
+        mundo.adicionar_investidor(InvestidorTendencia(200 + j, janela=5))
+    return mundo
+
+
+class TestInvestidores(unittest.TestCase):
+    """Testes do layout compacto dos investidores."""
+
+    def test_sem_dict_por_instancia(self):
+        """Investidores embutidos não alocam __dict__."""
+        for inv in (
+            InvestidorRuido(1),
+            InvestidorFundamentalista(2),
+            InvestidorTendencia(3),
+        ):
+            self.assertFalse(hasattr(inv, "__dict__"))
+
+    def test_subclasse_aceita_atributos(self):
+        """Subclasses sem slots continuam aceitando atributos livres."""
+
+        class Ruidoso(InvestidorRuido):
+            def agir(self, ambiente):
+                self.visto = ambiente.preco
+
+        inv = Ruidoso(1)
+        inv.agir(MercadoSimples())
+        self.assertEqual(inv.visto, 100.0)
+
+    def test_simulacao_basica(self):
+        """Executa um ano e mantém históricos coerentes."""
+        mundo = criar_mercado()
+        Simulacao(mundo).executar(252)
+        self.assertEqual(len(mundo.h_preco), 253)
+        self.assertEqual(len(mundo.h_deseq), 252)
+
+
+class InvestidorLento(InvestidorBase):
+    """Investidor assíncrono que "consulta um servidor" antes de ordenar."""
+
+    def __init__(self, id, atraso, qtd=1.0):
+        super().__init__(id)
+        self.atraso = atraso
+        self.qtd = qtd
+
+    async def agir_async(self, ambiente):
+        await asyncio.sleep(self.atraso)
+        ambiente.registrar_ordem(self.id, self.qtd)
+
+
+class TestPopulacao(unittest.TestCase):
+    def test_coorte_sorteada(self):
+        """Coorte com ids consecutivos, parâmetros sorteados e constantes repassadas."""
+        params = {
+            "valor_intrinseco": {"dist": "normal", "media": 115, "dp": 10, "min": 100},
+            "toler": {"dist": "uniforme", "min": 0.01, "max": 0.05},
+            "prop": 0.2,
+        }
+        a = gerar_populacao(InvestidorFundamentalista, 1000, params, 50, seed=3)
+        b = gerar_populacao(InvestidorFundamentalista, 1000, params, 50, seed=3)
+        self.assertEqual(a, b)
+        self.assertEqual([x.id for x in a], list(range(50, 1050)))
+        v = np.array([x.valor_intrinseco for x in a])
+        self.assertGreaterEqual(v.min(), 100)
+        self.assertTrue(all(x.prop == 0.2 and x.caixa == 2_000.0 for x in a))
+        janelas = gerar_populacao(
+            InvestidorTendencia, 500, {"janela": {"dist": "inteiro", "min": 3, "max": 5}}
+        )
+        self.assertEqual({x.janela for x in janelas}, {3, 4, 5})
+        self.assertIsInstance(janelas[0].janela, int)
+        with self.assertRaises(ValueError):
+            gerar_populacao(InvestidorRuido, 10, {"toler": 0.1})
+
+    def test_mundo_em_lote(self):
+        """adicionar_investidores registra o tipo de todos para a microestrutura."""
+        mundo = MercadoSimples()
+        mundo.adicionar_investidores(gerar_populacao(InvestidorRuido, 300, {}, 1))
+        Simulacao(mundo).executar(20)
+        self.assertIn("vol_InvestidorRuido", mundo.series_microestrutura())
+        self.assertEqual(len(mundo._indice_por_id), 300)
+
+
+class TestFundamental(unittest.TestCase):
+    def test_blocos_e_choques(self):
+        """A trajetória não depende do tamanho do bloco e o Choque entra no ciclo t."""
+        for modelo, kw in [
+            ("passeio", {}),
+            ("reversao", {"kappa": 0.05, "media": 90.0}),
+            ("saltos", {"intensidade_saltos": 0.05}),
+        ]:
+            ch = [{"t": 40, "magnitude": 0.5}]
+            p = ProcessoFundamental(modelo=modelo, seed=4, bloco=7, choques=ch, **kw)
+            v = np.array([p.valor(t) for t in range(120)])
+            q = ProcessoFundamental(modelo=modelo, seed=4, choques=ch, **kw)
+            np.testing.assert_allclose(v, q.trajetoria(119))
+            self.assertGreater(np.log(v[40] / v[39]), 0.4)
+        with self.assertRaises(ValueError):
+            ProcessoFundamental(modelo="garch")
+
+    def test_mercado_acompanha_fundamental(self):
+        """Fundamentalistas ancorados no processo levam o preço junto após o choque."""
+        mundo = MercadoSimples(
+            fundamental={"v0": 100.0, "modelo": "reversao", "kappa": 0.01, "sigma": 0.002,
+                         "choques": [{"t": 100, "magnitude": 0.2}]},
+            ruido_obs=0.05,
+        )
+        mundo.adicionar_investidores(
+            gerar_populacao(InvestidorFundamentalista, 50, {"caixa": 20_000.0}, seed=1)
+        )
+        Simulacao(mundo).executar(200)
+        f = mundo.series_microestrutura()["fundamental"]
+        self.assertEqual(f.size, 200)
+        p = np.asarray(mundo.h_preco[1:])
+        self.assertGreater(np.corrcoef(np.log(p), np.log(f))[0, 1], 0.8)
+        self.assertGreater(p[105:125].mean(), 1.1 * p[50:100].mean())
+        self.assertIsNone(criar_mercado().valor_observado(None))
+
+
+class TestRede(unittest.TestCase):
+    def test_geradores(self):
+        """Grafos simétricos, sem laços e com o grau médio pedido."""
+        for adj in (mundo_pequeno(5000, k=8, p=0.1, seed=1), livre_escala(5000, 8, seed=1)):
+            self.assertEqual((adj != adj.T).nnz, 0)
+            self.assertEqual(adj.diagonal().sum(), 0)
+            self.assertAlmostEqual(adj.nnz / 5000, 8, delta=1.0)
+        graus = np.diff(livre_escala(20_000, 8, gama=2.5, seed=2).indptr)
+        self.assertGreater(graus.max(), 20 * np.median(graus))
+
+    def test_difusao_gera_manada(self):
+        """Com sensibilidade à rede, o desequilíbrio passa a ser persistente."""
+        acfs = []
+        for sens in (0.0, 1.0):
+            mundo = MercadoSimples(depth=5000, rede={"k": 6, "p": 0.05, "memoria": 0.5})
+            params = {"sensib_rede": sens, "caixa": 1e6, "pos": 1e4, "prob_compra": 0.5}
+            mundo.adicionar_investidores(gerar_populacao(InvestidorRuido, 500, params, seed=1))
+            Simulacao(mundo).executar(150)
+            self.assertLessEqual(np.abs(mundo.rede.estado).max(), 1.0)
+            acfs.append(acf(np.asarray(mundo.h_deseq), 1))
+        self.assertLess(acfs[0], 0.3)
+        self.assertGreater(acfs[1], 0.7)
+        with self.assertRaises(ValueError):
+            RedeSocial.criar({"tipo": "aleatoria"}, 10)
+
+
+class _Conta:
+    def __init__(self, caixa=1_000.0, pos=0.0):
+        self.caixa, self.pos = caixa, pos
+
+
+class TestLivroRazao(unittest.TestCase):
+    def test_custo_medio_e_pnl(self):
+        """Ordens somadas por investidor, PnL realizado ao reduzir/virar a posição."""
+        livro = LivroRazao()
+        livro.abrir_contas([_Conta(), _Conta()])
+        livro.liquidar(np.array([0, 0, 1]), np.array([10.0, 5.0, -3.0]), 10.0)
+        np.testing.assert_array_equal(livro.pos, [15.0, -3.0])
+        np.testing.assert_array_equal(livro.caixa, [850.0, 1030.0])
+        livro.liquidar(np.array([0, 1]), np.array([-20.0, 4.0]), 12.0)
+        np.testing.assert_array_equal(livro.pnl_realizado, [30.0, -6.0])
+        np.testing.assert_array_equal(livro.custo_medio, [12.0, 12.0])
+        np.testing.assert_array_equal(livro.pos, [-5.0, 1.0])
+        livro.verificar()
+        livro.caixa[0] += 1.0
+        with self.assertRaises(RuntimeError):
+            livro.verificar()
+
+    def test_mercado_com_livro(self):
+        """Liquidação ao preço do ciclo; investidores espelham o livro e nada vaza."""
+        mundo = criar_mercado(livro=True)
+        Simulacao(mundo).executar(100)
+        livro = mundo.livro
+        for inv in mundo.investidores:
+            self.assertEqual(inv.caixa, livro.caixa[inv.indice])
+            self.assertEqual(inv.pos, livro.pos[inv.indice])
+        self.assertGreater(livro.total_dividendos, 0.0)
+        res = livro.resumo(mundo.preco)
+        self.assertAlmostEqual(
+            res["patrimonio_total"], res["caixa_total"] + res["pos_total"] * mundo.preco
+        )
+
+
+    def test_dividendos_iguais_com_e_sem_livro(self):
+        """Com ou sem livro, recebe quem tem receber_dividendo, inclusive sobrescrito."""
+
+        class Parado(InvestidorTendencia):  # sem receber_dividendo
+            def agir(self, ambiente):
+                pass
+
+        class Recebe(InvestidorRuido):
+            def agir(self, ambiente):
+                pass
+
+        class Tributado(Recebe):
+            def receber_dividendo(self, d_por_cota):
+                if self.pos > 0:
+                    self.caixa += 0.85 * d_por_cota * self.pos
+
+        caixas = []
+        for livro in (False, True):
+            mundo = MercadoSimples(seed=1, dy_anual=0.2, livro=livro)
+            mundo.adicionar_investidores(
+                [Parado(0, pos=10.0), Recebe(1, pos=10.0), Tributado(2, pos=10.0)]
+            )
+            Simulacao(mundo).executar(50)
+            caixas.append([inv.caixa for inv in mundo.investidores])
+        np.testing.assert_allclose(caixas[1], caixas[0], rtol=1e-12)
+        self.assertEqual(caixas[1][0], 1_500.0)
+        self.assertAlmostEqual(caixas[1][2] - 1_000.0, 0.85 * (caixas[1][1] - 1_000.0))
+        self.assertAlmostEqual(mundo.livro.dividendos.sum(), mundo.livro.total_dividendos)
+        mundo.livro.verificar()
+
+
+class TestCustos(unittest.TestCase):
+    def test_modelos(self):
+        """Custos por ordem vetorizados, com mínimo e profundidade do mundo."""
+        q = np.array([10.0, -40.0])
+        mundo = MercadoSimples(depth=100.0)
+        np.testing.assert_allclose(TaxaFixa(2.0).calcular(q, 10.0, mundo), [2.0, 2.0])
+        np.testing.assert_allclose(
+            Corretagem(0.001, minimo=0.2).calcular(q, 10.0, mundo), [0.2, 0.4]
+        )
+        np.testing.assert_allclose(
+            SlippageRaiz(0.1).calcular(q, 10.0, mundo),
+            [0.1 * 10 * 10 * np.sqrt(0.1), 0.1 * 10 * 40 * np.sqrt(0.4)],
+        )
+        with self.assertRaises(ValueError):
+            criar_custos([{"tipo": "imposto"}])
+
+    def test_custos_no_livro_e_metricas(self):
+        """Custos saem do caixa, fecham com o livro e aparecem nas métricas."""
+        mundo = criar_mercado(custos=[{"tipo": "fixa", "valor": 0.5}, {"tipo": "slippage"}])
+        Simulacao(mundo).executar(100)
+        fluxo = mundo.series_microestrutura()
+        total = fluxo["custo_TaxaFixa"].sum() + fluxo["custo_SlippageRaiz"].sum()
+        self.assertAlmostEqual(total, mundo.livro.total_taxas)
+        self.assertAlmostEqual(fluxo["custo_TaxaFixa"].sum(), 0.5 * fluxo["n_ordens"].sum())
+        met = painel_microestrutura(mundo.h_preco, fluxo)
+        self.assertGreater(met["custo_bps"], 0.0)
+
+    def test_modelos_da_mesma_classe(self):
+        """Duas corretagens viram duas séries, cada uma com sua taxa."""
+        mundo = criar_mercado(
+            custos=[{"tipo": "corretagem", "taxa": 0.001}, {"tipo": "corretagem", "taxa": 0.002}]
+        )
+        Simulacao(mundo).executar(60)
+        fluxo = mundo.series_microestrutura()
+        a, b = fluxo["custo_Corretagem_1"], fluxo["custo_Corretagem_2"]
+        np.testing.assert_allclose(2.0 * a, b)
+        self.assertGreater(a.sum(), 0.0)
+        self.assertAlmostEqual(a.sum() + b.sum(), mundo.livro.total_taxas)
+
+
+class TestSimulacaoAsync(unittest.TestCase):
+    """Testes do modo assíncrono da Simulacao."""
+
+    def test_ordens_ordenadas_por_id(self):
+        """Ordens saem por id, independente de quem termina primeiro."""
+        mundo = MercadoSimples()
+        mundo.adicionar_investidor(InvestidorLento(3, 0.0))
+        mundo.adicionar_investidor(InvestidorLento(1, 0.02))
+        mundo.adicionar_investidor(InvestidorRuido(2, prob_compra=1.0))
+        vistos = []
+        mundo.on_step_start(lambda m: vistos.clear())
+        original = mundo.atualizar_ambiente
+
+        def espiar():
+            vistos.extend(o["investidor_id"] for o in mundo.ordens)
+            original()
+
+        mundo.atualizar_ambiente = espiar
+        Simulacao(mundo, modo="async").executar(1)
+        self.assertEqual(vistos, [1, 2, 3])
+
+    def test_timeout_cancela_pendentes(self):
+        """Investidores acima do timeout são cancelados e registrados."""
+        mundo = MercadoSimples()
+        mundo.adicionar_investidor(InvestidorLento(1, 0.0))
+        mundo.adicionar_investidor(InvestidorLento(2, 5.0))
+        sim = Simulacao(mundo, modo="async", timeout_ciclo=0.05)
+        sim.executar(2)
+        self.assertEqual(sim.estouros, [(0, [2]), (1, [2])])
+        self.assertEqual(mundo.h_deseq, [1.0, 1.0])
+
+
+class TestSimulacaoThreads(unittest.TestCase):
+    """Testes do modo com pool de threads."""
+
+    def _mercado_deterministico(self):
+        mundo = MercadoSimples(seed=3)
+        for i in range(20):
+            mundo.adicionar_investidor(
+                InvestidorFundamentalista(i, valor_intrinseco=90 + 2 * i)
+            )
+        for j in range(7):
+            mundo.adicionar_investidor(InvestidorTendencia(100 + j, janela=3 + j))
+        return mundo
+
+    def test_igual_ao_serial(self):
+        """Lotes em threads reproduzem exatamente o modo serial."""
+        serial = self._mercado_deterministico()
+        Simulacao(serial).executar(120)
+        paralelo = self._mercado_deterministico()
+        Simulacao(paralelo, modo="threads", n_threads=4, tamanho_lote=3).executar(120)
+        self.assertEqual(serial.h_preco, paralelo.h_preco)
+        self.assertEqual(serial.h_deseq, paralelo.h_deseq)
+
+    def test_visao_somente_leitura(self):
+        """Investidores não alteram o mundo durante agir."""
+
+        class Intruso(InvestidorBase):
+            def agir(self, ambiente):
+                ambiente.preco = 0.0
+
+        mundo = MercadoSimples()
+        mundo.adicionar_investidor(Intruso(1))
+        with self.assertRaises(AttributeError):
+            Simulacao(mundo, modo="threads", n_threads=2).executar(1)
+
+
+class TestMicroestrutura(unittest.TestCase):
+    """Testes das métricas de fluxo de ordens."""
+
+    def test_painel(self):
+        """Volume bruto, lambda de Kyle e participação por classe."""
+        mundo = criar_mercado()
+        Simulacao(mundo).executar(252)
+        fluxo = mundo.series_microestrutura()
+        self.assertTrue(
+            np.allclose(fluxo["vol_compra"] - fluxo["vol_venda"], fluxo["desequilibrio"])
+        )
+        met = painel_estilizados(mundo.h_preco, fluxo)
+        self.assertGreater(met["lambda_kyle"], 0.0)
+        part = sum(v for k, v in met.items() if k.startswith("part_"))
+        self.assertAlmostEqual(part, 1.0)
+        self.assertIn("part_InvestidorRuido", met)
+        n_tipo = sum(v for k, v in fluxo.items() if k.startswith("n_ordens_"))
+        np.testing.assert_array_equal(n_tipo, fluxo["n_ordens"])
+        self.assertAlmostEqual(
+            sum(v for k, v in met.items() if k.startswith("ordens_Investidor")),
+            met["ordens_por_ciclo"],
+        )
+
+
+class TestRecorrencia(unittest.TestCase):
+    """Testes da RQA em blocos contra a matriz densa."""
+
+    def _densa(self, x, dim, atraso, eps, theiler):
+        emb = embutir(x, dim, atraso)
+        n = len(emb)
+        R = np.abs(emb[:, None, :] - emb[None, :, :]).max(-1) <= eps
+        i, j = np.indices(R.shape)
+        R &= np.abs(i - j) >= theiler
+
+        def corridas(v):
+            limites = np.diff(np.concatenate([[0], v.astype(int), [0]]))
+            return np.flatnonzero(limites == -1) - np.flatnonzero(limites == 1)
+
+        diag = np.concatenate([corridas(np.diagonal(R, k)) for k in range(theiler, n)])
+        vert = np.concatenate([corridas(R[:, k]) for k in range(n)])
+        pares = (n - theiler) * (n - theiler + 1) / 2
+        return diag.sum() / pares, diag[diag >= 2].sum() / diag.sum(), vert[
+            vert >= 2
+        ].sum() / vert.sum()
+
+    def test_blocos_igual_densa(self):
+        """RR, DET e LAM não dependem do tamanho do bloco."""
+        rng = np.random.default_rng(0)
+        x = np.cumsum(rng.standard_normal(240)) * 0.1 + np.sin(np.arange(240) / 5)
+        esperado = self._densa(x, 2, 2, 0.3, 2)
+        for norma in ("max", "euclidiana"):
+            for bloco in (7, 64, 512):
+                r = analise_recorrencia(
+                    x, dim=2, atraso=2, eps=0.3, theiler=2, bloco=bloco, norma=norma
+                )
+                if norma == "max":
+                    self.assertAlmostEqual(r["rr"], esperado[0])
+                    self.assertAlmostEqual(r["det"], esperado[1])
+                    self.assertAlmostEqual(r["lam"], esperado[2])
+                else:
+                    ref = analise_recorrencia(
+                        x, dim=2, atraso=2, eps=0.3, theiler=2, norma=norma, bloco=1000
+                    )
+                    self.assertEqual(r, ref)
+
+    def test_fatos_com_rqa(self):
+        """validar_fatos acrescenta chaves rqa_*."""
+        mundo = criar_mercado()
+        Simulacao(mundo).executar(252)
+        met = validar_fatos(mundo.h_preco, recorrencia={"dim": 2})
+        self.assertIn("rqa_det", met)
+        self.assertAlmostEqual(met["rqa_rr"], 0.05, delta=0.02)
+
+
+class TestEnsemble(unittest.TestCase):
+    """Testes do painel em lote e do bootstrap em blocos."""
+
+    def setUp(self):
+        self.precos = []
+        for seed in range(4):
+            mundo = criar_mercado(seed=seed)
+            Simulacao(mundo).executar(200)
+            self.precos.append(mundo.h_preco)
+
+    def test_lote_igual_ao_painel(self):
+        """Cada linha do lote reproduz painel_estilizados da série."""
+        lote = painel_estilizados_lote(np.array(self.precos))
+        for i, p in enumerate(self.precos):
+            ref = painel_estilizados(p)
+            for k, v in ref.items():
+                self.assertAlmostEqual(lote[k][i], v, places=12)
+
+    def test_bootstrap(self):
+        """Intervalos contêm a estimativa e são reprodutíveis com a semente."""
+        a = intervalos_bootstrap(self.precos[0], n_boot=300, seed=5, lote=64)
+        b = intervalos_bootstrap(self.precos[0], n_boot=300, seed=5)
+        self.assertEqual(a, b)
+        for k in ("vol_diaria", "curtose", "acf_abs_1"):
+            self.assertLessEqual(a[f"{k}_inf"], a[k])
+            self.assertGreaterEqual(a[f"{k}_sup"], a[k])
+
+
+class TestACF(unittest.TestCase):
+    """Testes do kernel nativo de autocorrelação."""
+
+    def test_igual_statsmodels(self):
+        """Direto e FFT reproduzem o statsmodels e o painel antigo."""
+        from statsmodels.tsa.stattools import acf as acf_sm
+
+        mundo = criar_mercado()
+        Simulacao(mundo).executar(252)
+        r = np.diff(np.log(mundo.h_preco))
+        ref = acf_sm(r, fft=True, nlags=20)[1:]
+        np.testing.assert_allclose(acf(r, 20, metodo="fft"), ref, atol=1e-12)
+        np.testing.assert_allclose(acf(r, 20, metodo="direto"), ref, atol=1e-12)
+        nativo = painel_estilizados(mundo.h_preco)
+        antigo = painel_estilizados(mundo.h_preco, backend="statsmodels")
+        for k, v in antigo.items():
+            self.assertAlmostEqual(nativo[k], v, places=12)
+
+    def test_lags_arbitrarios(self):
+        """Conjuntos de lags em 2D, com NaN além do tamanho da série."""
+        x = np.random.default_rng(1).standard_normal((3, 50))
+        out = acf(x, [1, 7, 49, 50])
+        self.assertEqual(out.shape, (3, 4))
+        self.assertTrue(np.isnan(out[:, 3]).all())
+        np.testing.assert_allclose(out[:, :3], acf(x, [1, 7, 49], metodo="fft"))
+        chaves = acf_retornos(np.exp(np.cumsum(x[0])), lags=(1, 5))
+        self.assertEqual(len(chaves), 6)
+        self.assertIn("acf_sq_5", chaves)
+
+
+class TestArmazem(unittest.TestCase):
+    """Testes do armazém de execuções endereçado pelo conteúdo."""
+
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.armazem = ArmazemResultados(os.path.join(self.tmp, "cache"))
+
+    def tearDown(self):
+        self.armazem.fechar()
+        shutil.rmtree(self.tmp)
+
+    def test_chave_estavel(self):
+        """A ordem das chaves da config não altera o hash."""
+        a = chave_execucao({"x": 1, "y": {"a": 2, "b": 3}}, "0.1.0", 7)
+        b = chave_execucao({"y": {"b": 3, "a": 2}, "x": 1}, "0.1.0", 7)
+        self.assertEqual(a, b)
+        self.assertNotEqual(a, chave_execucao({"x": 1, "y": {"a": 2, "b": 3}}, "0.1.0", 8))
+
+    def test_gravar_buscar_consultar_evictar(self):
+        """Ciclo completo: grava, reaproveita, filtra por métrica e evicta."""
+        for seed in (1, 2, 3):
+            mundo = criar_mercado(seed=seed)
+            Simulacao(mundo).executar(60)
+            chave = chave_execucao({"seed": seed}, "0.1.0", seed)
+            met, _ = self.armazem.gravar(chave, {"seed": seed}, "T", mundo.h_preco, mundo.h_deseq)
+            self.assertEqual(self.armazem.buscar(chave)[0], met)
+        todas = self.armazem.consultar()
+        self.assertEqual(len(todas), 3)
+        corte = sorted(e["metricas"]["vol_diaria"] for e in todas)[1]
+        altas = self.armazem.consultar(vol_diaria=(">=", corte), n=("=", 61))
+        self.assertEqual(len(altas), 2)
+        self.assertEqual(self.armazem.evictar(max_bytes=1, manter=chave), 2)
+        (restante,) = self.armazem.consultar()
+        self.assertEqual(restante["chave"], chave)
+        self.assertTrue(os.path.isdir(restante["pasta"]))
+        self.assertEqual(self.armazem.evictar(max_bytes=1), 1)
+        self.assertEqual(self.armazem.consultar(), [])
+
+
+class TestColunar(unittest.TestCase):
+    """Testes do formato binário colunar das execuções."""
+
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp)
+
+    def test_ida_e_volta(self):
+        """Leitura mapeada, parcial, float32 e zlib preservam as colunas."""
+        rng = np.random.default_rng(0)
+        cols = {"a": rng.standard_normal(1001), "b": np.arange(7), "c": np.array([])}
+        arq = os.path.join(self.tmp, "x.abm")
+        salvar_colunas(arq, cols, meta={"config": {"k": 1}})
+        dados, meta = ler_colunas(arq)
+        self.assertIsInstance(dados["a"], np.memmap)
+        for k, v in cols.items():
+            np.testing.assert_array_equal(dados[k], v)
+        self.assertEqual(meta["config"], {"k": 1})
+        so_b, _ = ler_colunas(arq, ["b"])
+        self.assertEqual(list(so_b), ["b"])
+
+        salvar_colunas(arq, cols, precisao="float32", compressao="zlib")
+        dados, _ = ler_colunas(arq)
+        self.assertEqual(dados["a"].dtype, np.float32)
+        np.testing.assert_allclose(dados["a"], cols["a"], rtol=1e-6)
+        self.assertEqual(ler_meta(arq)["colunas"]["a"]["compressao"], "zlib")
+
+    def test_save_run_e_csv(self):
+        """save_run binário converte para os mesmos CSVs do layout antigo."""
+        mundo = criar_mercado()
+        Simulacao(mundo).executar(50)
+        fluxo = mundo.series_microestrutura()
+        met, pasta = save_run("T", self.tmp, mundo.h_preco, mundo.h_deseq, fluxo=fluxo)
+        dados, meta = ler_colunas(os.path.join(pasta, "run.abm"))
+        np.testing.assert_array_equal(dados["precos"], mundo.h_preco)
+        self.assertEqual(meta["metricas"], met)
+        arqs = exportar_csv(os.path.join(pasta, "run.abm"), colunas=["precos"])
+        np.testing.assert_array_equal(np.loadtxt(arqs[0]), mundo.h_preco)
+
+
+class TestDiario(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp)
+
+    def test_reproducao_exata_e_e_se(self):
+        """O diário refaz o caminho de preços sem investidores e permite variar a regra."""
+        arq = os.path.join(self.tmp, "run.abmj")
+        mundo = criar_mercado(diario=arq)
+        Simulacao(mundo).executar(120)
+        mundo.diario.fechar()
+        rep = reproduzir(arq)
+        self.assertEqual(rep.h_preco, mundo.h_preco)
+        self.assertEqual(rep.h_deseq, mundo.h_deseq)
+        self.assertEqual(rep.investidores, [])
+        d = ler_diario(arq)
+        ids, qtd = ordens_do_ciclo(d, 10)
+        self.assertEqual(ids.size, mundo.h_n_ordens[10])
+        self.assertAlmostEqual(qtd.sum(), mundo.h_deseq[10])
+        mais_raso = reproduzir(d, depth=50.0)
+        self.assertNotEqual(mais_raso.h_preco[-1], mundo.h_preco[-1])
+
+
+class TestIntradiario(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp)
+
+    def test_subpassos_e_barras(self):
+        """Ruído age em todo subpasso, fundamentalista só no 1º; barras OHLC coerentes."""
+        arq = os.path.join(self.tmp, "intra.abmj")
+        mundo = criar_mercado(subpassos=4, diario=arq, livro=True)
+        Simulacao(mundo).executar(60)
+        mundo.diario.fechar()
+        self.assertEqual(len(mundo.h_preco), 61)
+        d = ler_diario(arq)
+        self.assertEqual(d["precos"].size, 240)
+        fund = ruido = 0
+        for t in range(240):
+            ids, _ = ordens_do_ciclo(d, t)
+            if t % 4:
+                self.assertTrue(np.all(ids >= 100))
+            fund += int((ids < 15).sum())
+            ruido += int(((ids >= 100) & (ids < 200)).sum())
+        self.assertGreater(ruido, fund)
+        b = mundo.barras_ohlcv()
+        fech = b["fechamento"]
+        self.assertTrue(np.all(b["minima"] <= np.minimum(b["abertura"], fech)))
+        self.assertTrue(np.all(b["maxima"] >= np.maximum(b["abertura"], fech)))
+        np.testing.assert_array_equal(b["abertura"][1:], fech[:-1])
+        rep = reproduzir(arq)
+        self.assertEqual(rep.h_preco, mundo.h_preco)
+        self.assertEqual(rep.h_maxima, mundo.h_maxima)
+
+
+class TestFormador(unittest.TestCase):
+    def test_cotacao_inclina_pelo_estoque(self):
+        """Comprado => ask mais perto do meio que o bid (e vice-versa); spread sobe com a vol."""
+        invs = [InvestidorFormador(i) for i in range(3)]
+        c = CoorteFormadores(invs, [0, 1, 2])
+        q = np.array([50.0, 0.0, -50.0])
+        d_bid, d_ask = c.cotar(q, 0.01)
+        self.assertLess(d_ask[0], d_bid[0])
+        self.assertAlmostEqual(d_ask[1], d_bid[1])
+        self.assertGreater(d_ask[2], d_bid[2])
+        d_bid2, d_ask2 = c.cotar(np.zeros(3), 0.05)
+        self.assertGreater(d_bid2[1] + d_ask2[1], d_bid[1] + d_ask[1])
+
+    def test_liquidez_no_mercado(self):
+        """Formadores aprofundam o book, executam contra o fluxo e o livro fecha."""
+        tmp = tempfile.mkdtemp()
+        try:
+            arq = os.path.join(tmp, "mm.abmj")
+            mundo = criar_mercado(diario=arq)
+            mundo.adicionar_investidores([InvestidorFormador(300 + j) for j in range(10)])
+            Simulacao(mundo).executar(200)
+            mundo.diario.fechar()
+            self.assertIsNotNone(mundo.livro)
+            self.assertTrue(np.all(np.asarray(mundo.h_profundidade) > mundo.depth))
+            self.assertGreater(sum(mundo.h_exec_formadores), 0.0)
+            self.assertTrue(np.all(np.abs(mundo.livro.pos[30:]) <= 200.0))
+            self.assertEqual(mundo.investidores[-1].pos, mundo.livro.pos[-1])
+            self.assertGreater(mundo.vol.n, 0)
+            self.assertEqual(reproduzir(arq).h_preco, mundo.h_preco)
+        finally:
+            shutil.rmtree(tmp)
+
+
+class TestRegrasPreco(unittest.TestCase):
+    def test_lote_igual_a_escalar(self):
+        """O mesmo kernel dá o mesmo passo para 1 mundo (escalares) ou um lote (arrays)."""
+        rng = np.random.default_rng(3)
+        D = rng.normal(0, 30, (60, 8))
+        for nome in REGRAS:
+            lote = criar_regra(nome)
+            escalares = [criar_regra(nome) for _ in range(8)]
+            p_lote = np.full(8, 100.0)
+            p_esc = [100.0] * 8
+            for t in range(60):
+                p_lote = p_lote * np.exp(lote.impacto(D[t], p_lote, 250.0, 0.02, t))
+                for j, regra in enumerate(escalares):
+                    p_esc[j] *= float(np.exp(regra.impacto(D[t, j], p_esc[j], 250.0, 0.02, t)))
+            np.testing.assert_allclose(p_lote, p_esc, rtol=1e-12, err_msg=nome)
+
+    def test_config_e_mercado(self):
+        """Regras vêm da config (dict/nome), voltam via spec e o diário as reproduz."""
+        r = criar_regra({"tipo": "walras", "elasticidade": 2.0})
+        self.assertIsInstance(r, ClearingWalras)
+        self.assertEqual(r.spec(), {"tipo": "walras", "elasticidade": 2.0})
+        with self.assertRaises(ValueError):
+            criar_regra("inexistente")
+        tmp = tempfile.mkdtemp()
+        try:
+            arq = os.path.join(tmp, "w.abmj")
+            mundo = criar_mercado(regra_preco={"tipo": "reversao", "drift": 0.001}, diario=arq)
+            Simulacao(mundo).executar(100)
+            mundo.diario.fechar()
+            self.assertEqual(reproduzir(arq).h_preco, mundo.h_preco)
+            base = criar_mercado()
+            Simulacao(base).executar(100)
+            self.assertNotEqual(base.h_preco[-1], mundo.h_preco[-1])
+        finally:
+            shutil.rmtree(tmp)
+
+
+class TestHistorico(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        rng = np.random.default_rng(1)
+        self.n = 300
+        self.fech = 100 * np.exp(np.cumsum(rng.normal(0.0, 0.01, self.n)))
+        self.div = np.where(np.arange(self.n) % 21 == 20, 0.8, np.nan)
+        datas = np.datetime64("2015-01-02") + np.arange(self.n)
+        linhas = ["Date,Close,Volume,Dividends"] + [
+            f"{d},{float(p)!r},1000,{'' if v != v else v}"
+            for d, p, v in zip(datas, self.fech, self.div)
+        ]
+        self.arq = os.path.join(self.tmp, "XPLG11.csv")
+        with open(self.arq, "w") as f:
+            f.write("\n".join(linhas) + "\n")
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp, ignore_errors=True)
+
+    def test_replay_em_blocos(self):
+        """Sem impacto o preço é a série do arquivo, lida em blocos; dividendos vêm da coluna."""
+        fonte = FonteHistorica(self.arq, bloco=16)
+        m = MercadoHistorico(fonte, livro=True)
+        m.adicionar_investidores([InvestidorRuido(i) for i in range(10)])
+        Simulacao(m).executar(self.n - 1)
+        np.testing.assert_allclose(m.h_preco, self.fech, rtol=1e-12)
+        self.assertAlmostEqual(sum(m.h_div), np.nansum(self.div[1:]))
+        self.assertEqual(str(m.h_data[-1]), str(np.datetime64("2015-01-02") + self.n - 1))
+        self.assertLessEqual(len(fonte._buf["fechamento"]), 16)
+        with self.assertRaises(RuntimeError):
+            Simulacao(m).executar(1)
+
+    def test_impacto_e_fontes(self):
+        """O impacto desvia da série com reversão; .abm mapeado e arquivo longo dão a mesma série."""
+        m = MercadoHistorico(self.arq, k_impacto=0.05, reversao=0.2, subpassos=2)
+        m.adicionar_investidores(
+            [InvestidorFundamentalista(i, valor_intrinseco=90) for i in range(15)]
+        )
+        Simulacao(m).executar(200)
+        desvio = np.log(np.asarray(m.h_preco) / self.fech[:201])
+        self.assertGreater(np.abs(desvio).max(), 1e-4)
+        self.assertLess(np.abs(desvio).max(), 0.1)
+
+        abm = converter_abm(self.arq, os.path.join(self.tmp, "XPLG11.abm"))
+        self.assertEqual(CatalogoHistorico(self.tmp).tickers(), ["XPLG11"])
+        longo = os.path.join(self.tmp, "todos.txt")
+        with open(self.arq) as f, open(longo, "w") as g:
+            cab, *linhas = f.read().splitlines()
+            g.write("ticker," + cab + "\n")
+            for lin in linhas:
+                g.write("OUTRO," + lin + "\nXPLG11," + lin + "\n")
+        for fonte in (abm, {"caminho": longo, "ticker": "XPLG11", "bloco": 7}):
+            h = MercadoHistorico(fonte)
+            Simulacao(h).executar(self.n - 1)
+            np.testing.assert_allclose(h.h_preco, self.fech, rtol=1e-12)
+
+
+class TestRisco(unittest.TestCase):
+    def test_cascata_de_margem(self):
+        """Com alavancagem e choque, há vendidos, chamadas e liquidações; o livro fecha."""
+        choques = [0.0] * 100 + [-0.15]
+        m = criar_mercado(
+            choques=choques, risco={"alavancagem_max": 3.0, "margem_manutencao": 0.3}
+        )
+        Simulacao(m).executar(252)
+        s = m.series_microestrutura()
+        self.assertGreater(s["cortado"].sum(), 0.0)
+        self.assertGreater(s["risco_custo"].sum(), 0.0)
+        self.assertGreater(s["liquidado"][100:].sum(), 0.0)
+        self.assertLess(m.livro.pos.min(), 0.0)
+        self.assertAlmostEqual(m.livro.total_taxas, s["risco_custo"].sum())
+        # custo de risco não entra no custo de transação do painel
+        self.assertNotIn("custo_bps", painel_microestrutura(m.h_preco, s))
+        caixas = [inv.caixa for inv in m.investidores]
+        np.testing.assert_allclose(caixas, m.livro.caixa)
+
+    def test_limites_na_entrada(self):
+        """Sem venda a descoberto nem alavancagem, as ordens são cortadas a pos >= 0."""
+        m = criar_mercado(risco=MotorRisco(vendido=False, alavancagem_max=1.0))
+        menor = []
+        m.on_step_end(lambda w: menor.append(w.livro.pos.min()))
+        Simulacao(m).executar(150)
+        self.assertGreaterEqual(min(menor), -1e-9)
+        with self.assertRaises(ValueError):
+            MotorRisco(alavancagem_max=2.0, margem_inicial=0.1, margem_manutencao=0.3)
+
+
+class TestLote(unittest.TestCase):
+    def test_gerador_igual_ao_random(self):
+        """MersenneLote sorteia, por réplica, exatamente o que random.Random(seed) sortearia."""
+        import random
+
+        seeds = [0, 7, 2**40 + 3]
+        lote, refs = MersenneLote(seeds), [random.Random(s) for s in seeds]
+        for _ in range(40):  # atravessa várias torções do estado
+            u = lote.random(31)
+            np.testing.assert_array_equal(u.T, [[r.random() for _ in range(31)] for r in refs])
+            g = lote.gauss(0.0, 0.002)
+            np.testing.assert_array_equal(g, [r.gauss(0.0, 0.002) for r in refs])
+
+    def test_replicas_iguais_ao_motor_escalar(self):
+        """Cada réplica do lote reproduz bit a bit o MercadoSimples com a mesma seed."""
+        def mundo(seed):
+            m = criar_mercado(seed=seed, regra_preco="raiz", choques=[0.0] * 10 + [-0.05])
+            m.adicionar_investidor(InvestidorTendencia(300))  # janela 15 (soma em pares)
+            return m
+
+        seeds = [0, 1, 2, 3, 11]
+        lote = MercadoLote.replicar(mundo(0), seeds)
+        lote.executar(150)
+        P = lote.precos()
+        for i, s in enumerate(seeds):
+            m = mundo(s)
+            Simulacao(m).executar(150)
+            self.assertEqual(P[i].tolist(), m.h_preco)
+            self.assertEqual(lote.desequilibrios()[i].tolist(), m.h_deseq)
+            self.assertEqual(lote.caixa[i].tolist(), [inv.caixa for inv in m.investidores])
+            self.assertEqual(lote.pos[i].tolist(), [inv.pos for inv in m.investidores])
+        with self.assertRaises(ValueError):
+            MercadoLote.replicar(criar_mercado(livro=True), seeds)
+
+
+class TestMonitor(unittest.TestCase):
+    def test_metricas_http(self):
+        """O exportador publica o retrato do último ciclo em /metrics e se desliga."""
+        import time
+        import urllib.request
+
+        def ler(corpo):
+            return dict(
+                linha.split(" ") for linha in corpo.splitlines() if not linha.startswith("#")
+            )
+
+        mundo = criar_mercado()
+        with MonitorMetricas(mundo, intervalo=0.01) as mon:
+            Simulacao(mundo).executar(120)
+            url = "http://%s:%d/metrics" % mon.endereco
+            limite = time.monotonic() + 5
+            while time.monotonic() < limite:  # espera a thread publicar o último ciclo
+                corpo = urllib.request.urlopen(url, timeout=5).read().decode("utf-8")
+                if corpo and float(ler(corpo)["abm_ciclos_total"]) == 120.0:
+                    break
+                time.sleep(0.01)
+        valores = ler(corpo)
+        self.assertEqual(float(valores["abm_ciclos_total"]), 120.0)
+        self.assertEqual(float(valores["abm_preco"]), mundo.preco)
+        self.assertEqual(float(valores["abm_ordens_total"]), sum(mundo.h_n_ordens))
+        r = np.diff(np.log(mundo.h_preco[-51:]))
+        self.assertAlmostEqual(float(valores["abm_volatilidade"]), np.std(r, ddof=1), places=12)
+        self.assertIn("# TYPE abm_ciclos_total counter", corpo)
+        self.assertEqual(mundo._on_step_end, [])
+        self.assertEqual(ler(mon.texto())["abm_ciclos_total"], "120.0")
+
+
+class TestSensibilidade(unittest.TestCase):
+    LIMITES = {"k_impacto": (0.01, 0.1), "toler": (0.01, 0.05), "janela": (3, 10)}
+
+    def test_sobol_morris(self):
+        """Índices de Sobol e Morris saem no dict plano; a vol diária responde ao k_impacto."""
+        res = sobol(self.LIMITES, n=16, ciclos=60, processos=1)
+        self.assertEqual(res["n_avaliacoes"], 16 * (3 + 2))
+        for p in self.LIMITES:
+            self.assertTrue(np.isfinite(res[f"ST_vol_diaria_{p}"]))
+            self.assertGreaterEqual(res[f"ST_conf_curtose_{p}"], 0.0)
+        self.assertGreater(res["ST_vol_diaria_k_impacto"], res["ST_vol_diaria_toler"])
+
+        mor = morris(self.LIMITES, r=4, ciclos=60, processos=1)
+        self.assertGreater(mor["mu_estrela_vol_diaria_k_impacto"], 0.0)
+        tab = tabela_sensibilidade(mor, list(self.LIMITES))
+        self.assertEqual(tab.shape, (6, 3))
+        self.assertAlmostEqual(
+            tab.loc[("curtose", "janela"), "mu_estrela"], mor["mu_estrela_curtose_janela"]
+        )
+
+
+class TestEmulador(unittest.TestCase):
+    LIMITES = {"k_impacto": (0.01, 0.1), "toler": (0.01, 0.05)}
+
+    def test_gp_interpola(self):
+        """O GP reproduz uma função suave entre os pontos de treino."""
+        x = np.linspace(0.0, 1.0, 12)[:, None]
+        gp = ProcessoGaussiano().ajustar(x, np.sin(6 * x[:, 0]))
+        media, desvio = gp.prever(np.array([[0.33], [0.5]]))
+        np.testing.assert_allclose(media, np.sin(6 * np.array([0.33, 0.5])), atol=1e-3)
+        self.assertTrue((desvio < 0.01).all())
+
+    def test_calibrar_e_armazem(self):
+        """A calibração acha o alvo com poucas execuções e as reaproveita do armazém."""
+        tmp = tempfile.mkdtemp()
+        try:
+            armazem = ArmazemResultados(tmp)
+            em = Emulador(self.LIMITES, ciclos=120, processos=1, armazem=armazem)
+            alvo = dict(zip(em.saidas, em.simular([[0.05, 0.03]])[0]))
+            res = em.calibrar(alvo, max_simulacoes=25)
+            self.assertLessEqual(res["n_simulacoes"], 25)
+            self.assertLess(abs(res["saidas"]["vol_diaria"] / alvo["vol_diaria"] - 1), 0.05)
+
+            outro = Emulador(self.LIMITES, ciclos=120, processos=1, armazem=armazem)
+            self.assertEqual(outro.carregar_armazem(), len(em.X))
+            outro.simular(em.P[:3])
+            self.assertEqual((outro.n_simulacoes, outro.n_cache), (0, 3))
+            armazem.fechar()
+        finally:
+            shutil.rmtree(tmp, ignore_errors=True)
+
+    def test_sobol_com_emulador(self):
+        """Como avaliador do Sobol, o emulador simula uma fração dos pontos pedidos."""
+        em = Emulador(self.LIMITES, ciclos=120, processos=1, limiar=0.2)
+        res = sobol(self.LIMITES, n=64, avaliador=lambda X: em.avaliar(X, max_simulacoes=40))
+        self.assertLess(em.n_simulacoes, res["n_avaliacoes"] / 4)
+        self.assertGreater(res["ST_vol_diaria_k_impacto"], res["ST_vol_diaria_toler"])
+
+
+class TestGraficos(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp)
+
+    def test_decimar_preserva_extremos(self):
+        """Decimação min/max reduz pontos sem perder máximos e mínimos."""
+        y = np.random.default_rng(1).standard_normal(100_003).cumsum()
+        x, yd = decimar(y, n_max=1000)
+        self.assertLessEqual(yd.size, 1000)
+        self.assertTrue(np.all(np.diff(x) >= 0))
+        self.assertEqual(yd.max(), y.max())
+        self.assertEqual(yd.min(), y.min())
+        np.testing.assert_array_equal(y[x], yd)
+
+    def test_leque_envelope(self):
+        """Faixas de baixo pelo mínimo, de cima pelo máximo; média só na mediana."""
+        P = np.random.default_rng(3).standard_normal((30, 10_000)).cumsum(1)
+        for pct in ((10, 25, 75, 90), (5, 25, 50, 75, 95)):
+            q = np.percentile(P, pct, axis=0)
+            x, qd = _decimar_leque(q, n_max=500)
+            k = len(pct)
+            self.assertEqual(qd.shape, (k, x.size))
+            np.testing.assert_array_equal(qd[: k // 2].min(axis=1), q[: k // 2].min(axis=1))
+            np.testing.assert_array_equal(qd[k - k // 2 :].max(axis=1), q[k - k // 2 :].max(axis=1))
+
+    def test_lote_headless(self):
+        """Séries e leques são gravados em PNG por processos (sem pyplot)."""
+        P = 100 * np.exp(np.random.default_rng(2).normal(0, 0.01, (40, 5000)).cumsum(1))
+        tarefas = [
+            {"tipo": "serie", "arquivo": os.path.join(self.tmp, "s.png"), "y": P[0]},
+            {"tipo": "leque", "arquivo": os.path.join(self.tmp, "l.png"), "precos": P},
+        ]
+        arqs = renderizar_lote(tarefas, processos=2)
+        for a in arqs:
+            self.assertGreater(os.path.getsize(a), 0)
+
+
+if __name__ == "__main__":
+    unittest.main()